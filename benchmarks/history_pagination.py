@@ -0,0 +1,76 @@
+"""
+Latency of one history page for a single risk while `history_log_risks` grows.
+
+Each step appends rows spread over many risks, then times the first page and a deep `before_id` page of one
+risk, read through its change sets and with a plain scan of the table (`NOT INDEXED`), as it was before any index.
+
+    python -m benchmarks.history_pagination
+"""
+import logging
+import os
+import random
+import tempfile
+import timeit
+
+from src.db.db import Database
+
+STEPS = (10_000, 100_000, 1_000_000)
+RISKS = 1_000
+LIMIT = 50
+REPEAT = 5
+ACCOUNT_ID = 1
+RISK_ID = "TTD-{:04}"
+
+PAGE_NOT_INDEXED = (
+    "SELECT timestamp, updated_column_name, old_data, new_data, id FROM history_log_risks NOT INDEXED "
+    "WHERE risk_id = ? AND account_id = ? AND id < ? ORDER BY id DESC LIMIT ?"
+)
+
+
+def grow(db: Database, rows: int) -> None:
+    # one change set with a single entry per row, spread over many risks
+    last_id = db.cursor.execute("SELECT COALESCE(MAX(id), 0) FROM history_change_sets").fetchone()[0]
+    db.cursor.executemany(
+        "INSERT INTO history_change_sets (account_id, risk_id) VALUES (?, ?)",
+        ((ACCOUNT_ID, RISK_ID.format(random.randrange(RISKS))) for _ in range(rows)),
+    )
+    db.cursor.execute(
+        "INSERT INTO history_log_risks (change_set_id, account_id, risk_id, updated_column_name, old_data, new_data)"
+        " SELECT id, account_id, risk_id, 'название', 'old', 'new' FROM history_change_sets WHERE id > ?",
+        (last_id,),
+    )
+    db.connection.commit()
+
+
+def main() -> None:
+    path = os.path.join(tempfile.mkdtemp(), "history.db")
+    db = Database(path=path, logger=logging.getLogger("benchmark"))
+    risk_id = "TTD-0001"
+
+    print(f"{'rows':>10} {'first page, ms':>15} {'deep page, ms':>14} {'deep page no index, ms':>23}")
+    total = 0
+    for step in STEPS:
+        grow(db, step - total)
+        total = step
+
+        ids = [row[0] for row in db.cursor.execute(
+            "SELECT id FROM history_log_risks WHERE risk_id = ? ORDER BY id", (risk_id,)).fetchall()]
+        before_id = ids[len(ids) // 2]
+
+        first_ms = min(timeit.repeat(
+            lambda: db.get_risk_history_by_risk_id(auth_account_id=ACCOUNT_ID, risk_id=risk_id, limit=LIMIT),
+            number=1, repeat=REPEAT)) * 1000
+        deep_ms = min(timeit.repeat(
+            lambda: db.get_risk_history_by_risk_id(
+                auth_account_id=ACCOUNT_ID, risk_id=risk_id, limit=LIMIT, before_id=before_id),
+            number=1, repeat=REPEAT)) * 1000
+        scan_ms = min(timeit.repeat(
+            lambda: db.cursor.execute(PAGE_NOT_INDEXED, (risk_id, ACCOUNT_ID, before_id, LIMIT)).fetchall(),
+            number=1, repeat=REPEAT)) * 1000
+        print(f"{total:>10} {first_ms:>15.3f} {deep_ms:>14.3f} {scan_ms:>23.3f}")
+
+    db.close_connection()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Latency of a PATCH that changes every tracked field of a risk while `history_log_risks` grows.
+
+Times `Database.update_risks` with the change-set trigger and with the nine per-column triggers it replaced, each
+of which looked up the risk's previous history entry and up to two dictionary names on its own and added its entry
+to the per-risk (risk_id, account_id, id) index.
+
+    python -m benchmarks.patch_history
+"""
+import logging
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from src.api.request.risks import RequestRisk, RequestRiskUpdate
+from src.db.db import Database
+from src.db.migrations import (
+    ACCOUNT_SCOPED_TRACK_CHANGES_TRIGGERS,
+    TRACK_CHANGE_SETS_TRIGGER,
+    TRACK_CHANGES_TRIGGER_NAMES,
+)
+from src.internal.config.config import SQLitePragmas
+
+STEPS = (10_000, 100_000, 1_000_000)
+RISKS = 1_000
+PATCHES = 300
+BULK = 500
+ROUNDS = 2
+ACCOUNT_ID = 1
+RISK_ID = "TTD-{:04}"
+
+PER_RISK_HISTORY_INDEX = "CREATE INDEX idx_history_log_risks_risk_id ON history_log_risks (risk_id, account_id, id)"
+CHANGE_SET_HISTORY_INDEX = "CREATE INDEX idx_history_log_risks_change_set_id ON history_log_risks (change_set_id, id)"
+
+
+def seed(db: Database) -> None:
+    db.create_risks(
+        [
+            RequestRisk(id=RISK_ID.format(i), name=f"risk {i}", factor_id=1, type_id=1, method_id=1,
+                        probability_id=1, impact_id=1)
+            for i in range(RISKS)
+        ],
+        auth_account_id=ACCOUNT_ID,
+    )
+
+
+def grow(db: Database, rows: int) -> None:
+    # one change set with a single entry per row, spread over many risks
+    last_id = db.cursor.execute("SELECT COALESCE(MAX(id), 0) FROM history_change_sets").fetchone()[0]
+    db.cursor.executemany(
+        "INSERT INTO history_change_sets (account_id, risk_id) VALUES (?, ?)",
+        ((ACCOUNT_ID, RISK_ID.format(random.randrange(RISKS))) for _ in range(rows)),
+    )
+    db.cursor.execute(
+        "INSERT INTO history_log_risks (change_set_id, account_id, risk_id, updated_column_name, old_data, new_data)"
+        " SELECT id, account_id, risk_id, 'название', 'old', 'new' FROM history_change_sets WHERE id > ?",
+        (last_id,),
+    )
+    db.connection.commit()
+
+
+def use_capture(db: Database, per_column: bool) -> None:
+    """
+    Switch between the nine per-column triggers with the per-risk history index they chained through and the
+    change-set trigger with its change set index.
+    """
+    for name in (*TRACK_CHANGES_TRIGGER_NAMES, "track_risk_changes"):
+        db.cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+    db.cursor.execute("DROP INDEX IF EXISTS idx_history_log_risks_risk_id")
+    db.cursor.execute("DROP INDEX IF EXISTS idx_history_log_risks_change_set_id")
+    if per_column:
+        db.cursor.execute(PER_RISK_HISTORY_INDEX)
+        for trigger in ACCOUNT_SCOPED_TRACK_CHANGES_TRIGGERS:
+            db.cursor.execute(trigger)
+    else:
+        db.cursor.execute(CHANGE_SET_HISTORY_INDEX)
+        db.cursor.execute(TRACK_CHANGE_SETS_TRIGGER)
+    db.connection.commit()
+
+
+def patch(n: int, id_: str | None = None) -> RequestRiskUpdate:
+    # every field differs from the previous patch, so each one is recorded
+    return RequestRiskUpdate(
+        id=id_ or RISK_ID.format(random.randrange(RISKS)),
+        name=f"name {n}",
+        description=f"description {n}",
+        comment=f"comment {n}",
+        factor_id=1 + n % 2,
+        type_id=1 + n % 7,
+        method_id=1 + n % 5,
+        probability_id=1 + n % 5,
+        impact_id=1 + n % 5,
+        status_id=1 + n % 3,
+    )
+
+
+def patch_ms(db: Database) -> float:
+    timings = []
+    for n in range(PATCHES):
+        request_model = patch(n)
+        started = time.perf_counter()
+        db.update_risks(auth_account_id=ACCOUNT_ID, request_models=[request_model])
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def bulk_row_us(db: Database) -> float:
+    """
+    Per-risk cost inside one bulk PATCH, where the commit is amortized and the history capture dominates.
+    """
+    timings = []
+    for n in range(5):
+        request_models = [patch(n, RISK_ID.format(i)) for i in random.sample(range(RISKS), BULK)]
+        started = time.perf_counter()
+        db.update_risks(auth_account_id=ACCOUNT_ID, request_models=request_models)
+        timings.append(time.perf_counter() - started)
+    return min(timings) / BULK * 1_000_000
+
+
+def main() -> None:
+    path = os.path.join(tempfile.mkdtemp(), "patch_history.db")
+    db = Database(path=path, logger=logging.getLogger("benchmark"), pragmas=SQLitePragmas().model_dump())
+    seed(db)
+
+    print(
+        f"{'rows':>10} {'per-column triggers, ms':>24} {'change set, ms':>15}"
+        f" {'bulk per-column, us/risk':>25} {'bulk change set, us/risk':>25}"
+    )
+    total = 0
+    for step in STEPS:
+        grow(db, step - total)
+        total = step
+
+        # alternate the two paths so neither always runs on the larger table or the warmer cache
+        runs: dict[bool, list[tuple[float, float]]] = {True: [], False: []}
+        for _ in range(ROUNDS):
+            for per_column in (True, False):
+                use_capture(db, per_column=per_column)
+                runs[per_column].append((patch_ms(db), bulk_row_us(db)))
+        per_column_ms, bulk_per_column_us = (min(values) for values in zip(*runs[True]))
+        change_set_ms, bulk_change_set_us = (min(values) for values in zip(*runs[False]))
+        print(
+            f"{total:>10} {per_column_ms:>24.3f} {change_set_ms:>15.3f}"
+            f" {bulk_per_column_us:>25.1f} {bulk_change_set_us:>25.1f}"
+        )
+
+    db.close_connection()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Per-page cost of turning RiskDTO rows into ResponseRisk objects.
+
+Compares the original per-risk linear scan over dictionary lists and a lookup in id-indexed dictionaries built
+once per page with building risks from pre-joined `Database.get_risks_hydrated` rows, which the API serves.
+
+    python -m benchmarks.risk_hydration
+"""
+import random
+import timeit
+
+from src.api.response.risks import CommonObjFactory, CommonObjWithValueFactory, ResponseRisk, ResponseRiskFactory
+from src.internal.dto.common_object import CommonObjDTO, CommonObjWithValueDTO
+from src.internal.dto.risks import RiskDTO
+
+LIMITS = (50, 500, 1000)
+REPEAT = 20
+TIMESTAMP = "2024-01-01 00:00:00"
+
+factors = [CommonObjDTO(id=i, name=f"factor {i}") for i in range(1, 3)]
+types = [CommonObjDTO(id=i, name=f"type {i}") for i in range(1, 8)]
+methods = [CommonObjDTO(id=i, name=f"method {i}") for i in range(1, 6)]
+statuses = [CommonObjDTO(id=i, name=f"status {i}") for i in range(1, 4)]
+probabilities = [CommonObjWithValueDTO(id=i, name=f"probability {i}", value=i / 5) for i in range(1, 6)]
+impacts = [CommonObjWithValueDTO(id=i, name=f"impact {i}", value=i / 5) for i in range(1, 6)]
+
+
+def make_risks(count: int) -> list[RiskDTO]:
+    return [
+        RiskDTO(
+            id=f"TTD-{i:04}",
+            name=f"risk {i}",
+            description="description",
+            comment="comment",
+            factor_id=random.choice(factors).id,
+            type_id=random.choice(types).id,
+            method_id=random.choice(methods).id,
+            probability_id=random.choice(probabilities).id,
+            impact_id=random.choice(impacts).id,
+            status_id=random.choice(statuses).id,
+        )
+        for i in range(count)
+    ]
+
+
+def score(risk: RiskDTO) -> float | None:
+    if risk.probability_id is None or risk.impact_id is None:
+        return None
+    probability = next(item for item in probabilities if item.id == risk.probability_id)
+    impact = next(item for item in impacts if item.id == risk.impact_id)
+    return probability.value * impact.value
+
+
+def linear_scan(risks: list[RiskDTO]) -> list[ResponseRisk]:
+    def find(items, id_):
+        for item in items:
+            if item.id == id_:
+                return item
+
+    return [
+        ResponseRisk(
+            id=risk.id,
+            name=risk.name,
+            description=risk.description,
+            comment=risk.comment,
+            factor=CommonObjFactory.get_from_dto(find(factors, risk.factor_id)),
+            type=CommonObjFactory.get_from_dto(find(types, risk.type_id)),
+            method=CommonObjFactory.get_from_dto(find(methods, risk.method_id)),
+            probability=CommonObjWithValueFactory.get_from_dto(find(probabilities, risk.probability_id)),
+            impact=CommonObjWithValueFactory.get_from_dto(find(impacts, risk.impact_id)),
+            status=CommonObjFactory.get_from_dto(find(statuses, risk.status_id)),
+            score=score(risk),
+        )
+        for risk in risks
+    ]
+
+
+def indexed(risks: list[RiskDTO]) -> list[ResponseRisk]:
+    by_id = {
+        name: {dto.id: factory.get_from_dto(dto) for dto in dtos}
+        for name, dtos, factory in (
+            ("factors", factors, CommonObjFactory), ("types", types, CommonObjFactory),
+            ("methods", methods, CommonObjFactory), ("statuses", statuses, CommonObjFactory),
+            ("probabilities", probabilities, CommonObjWithValueFactory),
+            ("impacts", impacts, CommonObjWithValueFactory),
+        )
+    }
+    return [
+        ResponseRisk(
+            id=risk.id,
+            name=risk.name,
+            description=risk.description,
+            comment=risk.comment,
+            factor=by_id["factors"].get(risk.factor_id),
+            type=by_id["types"].get(risk.type_id),
+            method=by_id["methods"].get(risk.method_id),
+            probability=by_id["probabilities"].get(risk.probability_id),
+            impact=by_id["impacts"].get(risk.impact_id),
+            status=by_id["statuses"].get(risk.status_id),
+            score=score(risk),
+        )
+        for risk in risks
+    ]
+
+
+def to_hydrated_rows(risks: list[RiskDTO]) -> list[tuple]:
+    def columns(items, id_):
+        item = next(item for item in items if item.id == id_)
+        return (item.id, item.name, item.value) if isinstance(item, CommonObjWithValueDTO) else (item.id, item.name)
+
+    return [
+        (risk.id, risk.name, risk.description, risk.comment,
+         *columns(factors, risk.factor_id), *columns(types, risk.type_id), *columns(methods, risk.method_id),
+         *columns(probabilities, risk.probability_id), *columns(impacts, risk.impact_id),
+         *columns(statuses, risk.status_id), TIMESTAMP, score(risk), TIMESTAMP)
+        for risk in risks
+    ]
+
+
+def main() -> None:
+    print(f"{'limit':>6} {'linear scan, ms':>16} {'indexed, ms':>12} {'hydrated rows, ms':>18}")
+    for limit in LIMITS:
+        risks = make_risks(limit)
+        rows = to_hydrated_rows(risks)
+        assert linear_scan(risks) == indexed(risks) == ResponseRiskFactory.get_many_from_hydrated_tuples(rows)
+        linear_ms = min(timeit.repeat(lambda: linear_scan(risks), number=1, repeat=REPEAT)) * 1000
+        indexed_ms = min(timeit.repeat(lambda: indexed(risks), number=1, repeat=REPEAT)) * 1000
+        hydrated_ms = min(timeit.repeat(
+            lambda: ResponseRiskFactory.get_many_from_hydrated_tuples(rows), number=1, repeat=REPEAT)) * 1000
+        print(f"{limit:>6} {linear_ms:>16.2f} {indexed_ms:>12.2f} {hydrated_ms:>18.2f}")
+
+
+if __name__ == "__main__":
+    main()
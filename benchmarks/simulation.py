@@ -0,0 +1,45 @@
+"""
+Time of one Monte Carlo portfolio simulation as the portfolio grows.
+
+Risks get random probability / impact values from the seeded scales. One in a hundred carries an individual cost
+range and is simulated risk by risk, the rest are simulated per (probability, impact) group.
+
+    python -m benchmarks.simulation
+"""
+import random
+import timeit
+
+from src.internal.simulation.monte_carlo import SimulationParams, simulate
+
+STEPS = (1_000, 10_000, 100_000)
+TRIALS = 100_000
+RANGED_SHARE = 0.01
+REPEAT = 3
+SCALE = (0.2, 0.4, 0.6, 0.8, 1.0)
+
+
+def main() -> None:
+    params = SimulationParams(trials=TRIALS, percentiles=(50, 90, 95, 99), var_level=0.95)
+
+    print(f"{'risks':>8} {'grouped only, ms':>17} {f'{RANGED_SHARE:.0%} with cost ranges, ms':>26}")
+    for risks in STEPS:
+        pairs = [(random.choice(SCALE), random.choice(SCALE)) for _ in range(risks)]
+        groups = {}
+        for pair in pairs:
+            groups[pair] = groups.get(pair, 0) + 1
+        grouped = [(probability, impact, count) for (probability, impact), count in groups.items()]
+
+        ranged_count = int(risks * RANGED_SHARE)
+        mixed_groups = {}
+        for pair in pairs[ranged_count:]:
+            mixed_groups[pair] = mixed_groups.get(pair, 0) + 1
+        ranged = [(probability, 0.0, impact * 2) for probability, impact in pairs[:ranged_count]]
+        mixed = [(probability, impact, count) for (probability, impact), count in mixed_groups.items()]
+
+        grouped_ms = min(timeit.repeat(lambda: simulate(grouped, [], params, seed=1), number=1, repeat=REPEAT)) * 1000
+        mixed_ms = min(timeit.repeat(lambda: simulate(mixed, ranged, params, seed=1), number=1, repeat=REPEAT)) * 1000
+        print(f"{risks:>8} {grouped_ms:>17.1f} {mixed_ms:>26.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,22 +4,56 @@ from typing import Annotated
 from fastapi import Depends, HTTPException, Query
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from starlette import status
 from starlette.requests import Request
 
+from src.db.async_db import AsyncDatabase
 from src.db.db import Database
+from src.db.reference_data import ReferenceDataCache
+from src.db.risk_query import RiskFilters
+from src.db.risk_matrix import RiskMatrixCache
 from src.internal.config.config import Settings
+from src.internal.executor.executor import BoundedExecutor
+from src.internal.security.password_hasher import PasswordHasher
+from src.internal.security.token_cache import TokenCache
+from src.internal.simulation.monte_carlo import RiskSimulator
 from src.services.account import AccountService
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/sign-in/base")
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 def get_db(request: Request) -> Database:
     return request.state.db
 
 
+def get_async_db(request: Request) -> AsyncDatabase:
+    return request.state.async_db
+
+
+def get_executor(request: Request) -> BoundedExecutor:
+    return request.state.executor
+
+
+def get_password_hasher(request: Request) -> PasswordHasher:
+    return request.state.password_hasher
+
+
+def get_token_cache(request: Request) -> TokenCache:
+    return request.state.token_cache
+
+
+def get_reference_data(request: Request) -> ReferenceDataCache:
+    return request.state.reference_data
+
+
+def get_risk_matrix(request: Request) -> RiskMatrixCache:
+    return request.state.risk_matrix
+
+
+def get_simulator(request: Request) -> RiskSimulator:
+    return request.state.simulator
+
+
 def get_settings(request: Request) -> Settings:
     return request.state.settings
 
@@ -28,7 +62,12 @@ def get_logger(request: Request) -> logging.Logger:
     return request.state.logger
 
 
-def decode_token(token: str, settings: Settings) -> int:
+def decode_token(token: str, settings: Settings, token_cache: TokenCache | None = None) -> int:
+    if token_cache is not None:
+        cached_id = token_cache.get(token)
+        if cached_id is not None:
+            return cached_id
+
     try:
         payload = jwt.decode(
             token,
@@ -39,12 +78,17 @@ def decode_token(token: str, settings: Settings) -> int:
     except (JWTError, AttributeError, ValueError) as e:
         raise HTTPException(status_code=401, detail="Authorization failed!")
 
+    if token_cache is not None:
+        token_cache.put(token, id_, exp=payload.get("exp"))
     return id_
 
 
 async def get_auth_account_id_from_token(
-        token: Annotated[str, Depends(oauth2_scheme)], settings=Depends(get_settings)) -> int:
-    user = decode_token(token=token, settings=settings)
+        token: Annotated[str, Depends(oauth2_scheme)],
+        settings=Depends(get_settings),
+        token_cache=Depends(get_token_cache),
+) -> int:
+    user = decode_token(token=token, settings=settings, token_cache=token_cache)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -57,11 +101,12 @@ async def get_auth_account_id_from_token(
 def get_account_service(
         logger=Depends(get_logger),
         settings=Depends(get_settings),
-        db=Depends(get_db)
+        db=Depends(get_async_db),
+        password_hasher=Depends(get_password_hasher),
 ) -> AccountService:
     return AccountService(
         db=db,
-        pwd_context=pwd_context,
+        password_hasher=password_hasher,
         security=settings.security,
         oauth2_scheme=oauth2_scheme,
         logger=logger
@@ -76,3 +121,25 @@ class PagesPaginationParams:
     ) -> None:
         self.limit = limit
         self.offset = offset
+
+
+class RiskFilterParams:
+    def __init__(
+            self,
+            status_id: list[int] = Query([], description="статусы, несколько значений объединяются через ИЛИ"),
+            type_id: list[int] = Query([]),
+            factor_id: list[int] = Query([]),
+            method_id: list[int] = Query([]),
+            probability_id: list[int] = Query([]),
+            impact_id: list[int] = Query([]),
+            min_score: float | None = Query(None, ge=0, description="только риски с оценкой не ниже заданной"),
+    ) -> None:
+        self.filters = RiskFilters(
+            status_ids=tuple(status_id),
+            type_ids=tuple(type_id),
+            factor_ids=tuple(factor_id),
+            method_ids=tuple(method_id),
+            probability_ids=tuple(probability_id),
+            impact_ids=tuple(impact_id),
+            min_score=min_score,
+        )
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
 
 
 class RequestRisk(BaseModel):
@@ -62,3 +62,29 @@ class RequestRiskUpdate(BaseModel):
             if len(name) < 3 or len(name) > 260:
                 raise ValueError("Name must be between 3 and 260 characters long")
         return name
+
+
+class RequestCostRange(BaseModel):
+    risk_id: str = Field(...)
+    low: float = Field(..., ge=0)
+    high: float = Field(..., ge=0)
+
+    @model_validator(mode="after")
+    def validate_bounds(self):
+        if self.low > self.high:
+            raise ValueError("low must not exceed high")
+        return self
+
+
+class RequestRiskSimulation(BaseModel):
+    trials: int = Field(10_000, ge=1, le=1_000_000)
+    percentiles: list[float] = Field([50, 90, 95, 99], min_length=1, max_length=20)
+    var_level: float = Field(0.95, gt=0, lt=1, description="уровень доверия для VaR")
+    seed: int | None = Field(None, ge=0)
+    cost_ranges: list[RequestCostRange] = Field([], description="диапазоны стоимости вместо значения влияния")
+
+    @field_validator("percentiles")
+    def validate_percentiles(cls, percentiles):
+        if any(percentile < 0 or percentile > 100 for percentile in percentiles):
+            raise ValueError("Percentiles must be between 0 and 100")
+        return percentiles
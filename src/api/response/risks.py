@@ -1,12 +1,16 @@
 from datetime import datetime
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
+from src.db.reference_data import ReferenceData
+from src.db.risk_matrix import RiskMatrix
+from src.internal.simulation.monte_carlo import SimulationResult
 from src.internal.dto.common_object import CommonObjDTO, CommonObjWithValueDTO
-from src.internal.dto.risks import RiskDTO
 
 
 class CommonObj(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     id: int = Field(...)
     name: str = Field(...)
 
@@ -27,6 +31,10 @@ class CommonObjFactory:
     def get_many_from_tuples(cls, tuples: list[tuple]) -> list[CommonObj]:
         return [cls.get_from_tuple(tuple_) for tuple_ in tuples]
 
+    @classmethod
+    def get_many_from_dtos(cls, dtos: list[CommonObjDTO]) -> list[CommonObj]:
+        return [cls.get_from_dto(dto) for dto in dtos]
+
 
 class CommonObjWithValue(CommonObj):
     value: int | float = Field(...)
@@ -49,6 +57,10 @@ class CommonObjWithValueFactory:
     def get_many_from_tuples(cls, tuples: list[tuple]) -> list[CommonObjWithValue]:
         return [cls.get_from_tuple(tuple_) for tuple_ in tuples]
 
+    @classmethod
+    def get_many_from_dtos(cls, dtos: list[CommonObjWithValueDTO]) -> list[CommonObjWithValue]:
+        return [cls.get_from_dto(dto) for dto in dtos]
+
 
 class ResponseRisk(BaseModel):
     id: str = Field(...)
@@ -61,6 +73,7 @@ class ResponseRisk(BaseModel):
     probability: CommonObjWithValue | None = Field(None)
     impact: CommonObjWithValue | None = Field(None)
     status: CommonObj = Field(...)
+    score: float | None = Field(None, description="вероятность * влияние, null если одно из них не задано")
 
 
 class ResponseRiskFactory:
@@ -80,75 +93,45 @@ class ResponseRiskFactory:
         )
 
     @staticmethod
-    def get_from_tuple_with_dict(
-            risk: RiskDTO, factors: list[CommonObjDTO], types: list[CommonObjDTO], methods: list[CommonObjDTO],
-            statuses: list[CommonObjDTO], probabilities: list[CommonObjWithValueDTO],
-            impacts: list[CommonObjWithValueDTO]
-    ) -> ResponseRisk:
-        factor_ = None
-        type_ = None
-        method_ = None
-        status_ = None
-        probability_ = None
-        impact_ = None
-
-        for status in statuses:
-            if status.id == risk.status_id:
-                status_ = status
-                break
-
-        for probability in probabilities:
-            if risk.probability_id is None:
-                break
-            if probability.id == risk.probability_id:
-                probability_ = probability
-                break
-
-        for impact in impacts:
-            if risk.impact_id is None:
-                break
-            if impact.id == risk.impact_id:
-                impact_ = impact
-                break
-
-        for factor in factors:
-            if factor.id == risk.factor_id:
-                factor_ = factor
-                break
-
-        for type in types:
-            if type.id == risk.type_id:
-                type_ = type
-                break
-
-        for method in methods:
-            if method.id == risk.method_id:
-                method_ = method
-                break
+    def get_from_hydrated_tuple(tuple_: tuple, shared: dict[tuple, CommonObj] | None = None) -> ResponseRisk:
+        """
+        Build a risk from a `Database.get_risks_hydrated` row. Dictionary objects are reused through `shared`,
+        keyed by their (id, name[, value]) columns.
+        """
+        shared = {} if shared is None else shared
+
+        def common(columns: tuple) -> CommonObj:
+            obj = shared.get(columns)
+            if obj is None:
+                obj = shared[columns] = CommonObjFactory.get_from_tuple(columns)
+            return obj
+
+        def common_with_value(columns: tuple) -> CommonObjWithValue | None:
+            if columns[0] is None:
+                return None
+            obj = shared.get(columns)
+            if obj is None:
+                obj = shared[columns] = CommonObjWithValueFactory.get_from_tuple(columns)
+            return obj
 
         return ResponseRisk(
-            id=risk.id,
-            name=risk.name,
-            description=risk.description,
-            comment=risk.comment,
-            factor=CommonObjFactory.get_from_dto(factor_),
-            type=CommonObjFactory.get_from_dto(type_),
-            method=CommonObjFactory.get_from_dto(method_),
-            probability=CommonObjWithValueFactory.get_from_dto(probability_) if probability_ else None,
-            impact=CommonObjWithValueFactory.get_from_dto(impact_) if impact_ else None,
-            status=CommonObjFactory.get_from_dto(status_),
+            id=tuple_[0],
+            name=tuple_[1],
+            description=tuple_[2],
+            comment=tuple_[3],
+            factor=common(tuple_[4:6]),
+            type=common(tuple_[6:8]),
+            method=common(tuple_[8:10]),
+            probability=common_with_value(tuple_[10:13]),
+            impact=common_with_value(tuple_[13:16]),
+            status=common(tuple_[16:18]),
+            score=tuple_[19],
         )
 
     @classmethod
-    def get_many_from_tuples(
-            cls, risks: list[RiskDTO], factors: list[CommonObjDTO], types: list[CommonObjDTO],
-            methods: list[CommonObjDTO], statuses: list[CommonObjDTO], probabilities: list[CommonObjWithValueDTO],
-            impacts: list[CommonObjWithValueDTO]
-    ) -> list[ResponseRisk]:
-        return [
-            cls.get_from_tuple_with_dict(risk=risk, factors=factors, types=types, methods=methods, statuses=statuses,
-                                         probabilities=probabilities, impacts=impacts) for risk in risks
-        ]
+    def get_many_from_hydrated_tuples(cls, tuples: list[tuple]) -> list[ResponseRisk]:
+        shared: dict[tuple, CommonObj] = {}
+        return [cls.get_from_hydrated_tuple(tuple_, shared=shared) for tuple_ in tuples]
 
 
 class ResponseHistory(BaseModel):
@@ -175,12 +158,183 @@ class ResponseHistoryFactory:
 class ResponseRiskHistory(BaseModel):
     risk_created_at: int = Field(...)
     history: list[ResponseHistory] = Field([])
+    next_before_id: int | None = Field(
+        None, description='значение before_id для следующей страницы, если null, значит страница последняя')
 
 
 class ResponseRiskHistoryFactory:
     @staticmethod
-    def get_from_tuple(risk_created_at: int, history: list[tuple]) -> ResponseRiskHistory:
+    def get_from_tuple(risk_created_at: int, history: list[tuple], limit: int | None = None) -> ResponseRiskHistory:
         return ResponseRiskHistory(
             risk_created_at=risk_created_at,
-            history=ResponseHistoryFactory.get_many_from_tuples(history)
+            history=ResponseHistoryFactory.get_many_from_tuples(history),
+            next_before_id=history[-1][4] if limit and len(history) == limit else None,
         )
+
+
+class RiskExportFactory:
+    columns = [
+        "id", "name", "description", "comment",
+        "factor_id", "factor", "type_id", "type", "method_id", "method",
+        "probability_id", "probability", "probability_value",
+        "impact_id", "impact", "impact_value",
+        "status_id", "status", "created_at", "updated_at", "score",
+    ]
+
+    @staticmethod
+    def get_record_from_hydrated_tuple(tuple_: tuple) -> dict:
+        """
+        Flat export record of a `Database.get_risks_hydrated` row: dictionary ids next to their names, so the
+        export can be read as is and fed back to the bulk import.
+        """
+        return {
+            "id": tuple_[0],
+            "name": tuple_[1],
+            "description": tuple_[2],
+            "comment": tuple_[3],
+            "factor_id": tuple_[4],
+            "factor": tuple_[5],
+            "type_id": tuple_[6],
+            "type": tuple_[7],
+            "method_id": tuple_[8],
+            "method": tuple_[9],
+            "probability_id": tuple_[10],
+            "probability": tuple_[11],
+            "probability_value": tuple_[12],
+            "impact_id": tuple_[13],
+            "impact": tuple_[14],
+            "impact_value": tuple_[15],
+            "status_id": tuple_[16],
+            "status": tuple_[17],
+            "created_at": tuple_[18],
+            "updated_at": tuple_[20],
+            "score": tuple_[19],
+        }
+
+    @classmethod
+    def get_many_records_from_hydrated_tuples(cls, tuples: list[tuple]) -> list[dict]:
+        return [cls.get_record_from_hydrated_tuple(tuple_) for tuple_ in tuples]
+
+
+class ResponseRiskBulkRow(BaseModel):
+    line: int = Field(..., description="номер строки во входных данных")
+    id: str | None = Field(None)
+    created: bool = Field(...)
+    error: str | None = Field(None)
+
+
+class ResponseRiskBulk(BaseModel):
+    created: int = Field(...)
+    failed: int = Field(...)
+    rows: list[ResponseRiskBulkRow] = Field([])
+
+
+class ResponseRiskBulkFactory:
+    @staticmethod
+    def get_from_rows(rows: list[ResponseRiskBulkRow]) -> ResponseRiskBulk:
+        rows = sorted(rows, key=lambda row: row.line)
+        created = sum(row.created for row in rows)
+        return ResponseRiskBulk(created=created, failed=len(rows) - created, rows=rows)
+
+
+class CommonObjWithCount(CommonObj):
+    count: int = Field(...)
+
+
+class ResponseRiskMatrixCell(BaseModel):
+    probability: CommonObjWithValue | None = Field(None)
+    impact: CommonObjWithValue | None = Field(None)
+    count: int = Field(...)
+    risk_ids: list[str] | None = Field(None, description="идентификаторы рисков ячейки, если запрошены")
+
+
+class ResponseRiskMatrix(BaseModel):
+    total: int = Field(...)
+    cells: list[ResponseRiskMatrixCell] = Field([], description="только непустые ячейки")
+    by_status: list[CommonObjWithCount] = Field([])
+    by_type: list[CommonObjWithCount] = Field([])
+
+
+class ResponseRiskMatrixFactory:
+    @staticmethod
+    def get_from_matrix(matrix: RiskMatrix, reference_data: ReferenceData) -> ResponseRiskMatrix:
+        def with_value(dictionary: dict[int, CommonObjWithValueDTO], id_: int | None) -> CommonObjWithValue | None:
+            dto = dictionary.get(id_)
+            return CommonObjWithValueFactory.get_from_dto(dto) if dto is not None else None
+
+        def with_count(dictionary: dict[int, CommonObjDTO], counts: dict[int, int]) -> list[CommonObjWithCount]:
+            return [
+                CommonObjWithCount(id=id_, name=dictionary[id_].name if id_ in dictionary else "", count=count)
+                for id_, count in sorted(counts.items())
+            ]
+
+        return ResponseRiskMatrix(
+            total=matrix.total,
+            cells=[
+                ResponseRiskMatrixCell(
+                    probability=with_value(reference_data.probabilities, cell.probability_id),
+                    impact=with_value(reference_data.impacts, cell.impact_id),
+                    count=cell.count,
+                    risk_ids=list(cell.risk_ids) if cell.risk_ids is not None else None,
+                )
+                for cell in matrix.cells
+            ],
+            by_status=with_count(reference_data.statuses, matrix.by_status),
+            by_type=with_count(reference_data.types, matrix.by_type),
+        )
+
+
+class ResponsePercentile(BaseModel):
+    percentile: float = Field(...)
+    value: float = Field(...)
+
+
+class ResponseRiskSimulation(BaseModel):
+    trials: int = Field(...)
+    risks: int = Field(..., description="количество рисков с заданными вероятностью и влиянием")
+    mean: float = Field(...)
+    std: float = Field(...)
+    percentiles: list[ResponsePercentile] = Field([])
+    var: float = Field(..., description="суммарное влияние, не превышаемое с вероятностью var_level")
+    expected_shortfall: float = Field(..., description="среднее суммарное влияние за пределами VaR")
+
+
+class ResponseRiskSimulationFactory:
+    @staticmethod
+    def get_from_result(result: SimulationResult) -> ResponseRiskSimulation:
+        return ResponseRiskSimulation(
+            trials=result.trials,
+            risks=result.risks,
+            mean=result.mean,
+            std=result.std,
+            percentiles=[
+                ResponsePercentile(percentile=percentile, value=value) for percentile, value in result.percentiles
+            ],
+            var=result.var,
+            expected_shortfall=result.expected_shortfall,
+        )
+
+
+class ResponseRiskSearchHit(BaseModel):
+    risk: ResponseRisk = Field(...)
+    rank: float = Field(..., description="релевантность bm25, меньше - лучше")
+    snippet: str = Field(..., description="фрагмент текста с совпадениями в <mark></mark>")
+
+
+class ResponseRiskSearchHitFactory:
+    @staticmethod
+    def get_many_from_tuples(tuples: list[tuple]) -> list[ResponseRiskSearchHit]:
+        shared: dict[tuple, CommonObj] = {}
+        return [
+            ResponseRiskSearchHit(
+                risk=ResponseRiskFactory.get_from_hydrated_tuple(tuple_, shared=shared),
+                rank=tuple_[21],
+                snippet=tuple_[22] or "",
+            )
+            for tuple_ in tuples
+        ]
+
+
+class ResponseRiskBulkUpdate(BaseModel):
+    updated: list[ResponseRisk] = Field([])
+    not_found: list[str] = Field([], description="идентификаторы рисков, которых нет у пользователя")
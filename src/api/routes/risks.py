@@ -1,263 +1,422 @@
-import asyncio
-from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Callable, Any
+from typing import Literal
 
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from starlette import status
 
 from src.api.depends import (
     PagesPaginationParams,
+    RiskFilterParams,
+    get_async_db,
     get_auth_account_id_from_token,
-    get_db,
+    get_reference_data,
+    get_risk_matrix,
+    get_simulator,
 )
-from src.api.request.risks import RequestRisk, RequestRiskUpdate
+from src.api.request.risks import RequestRisk, RequestRiskSimulation, RequestRiskUpdate
 from src.api.response.empty import ResponseEmpty
 from src.api.response.risks import (
     CommonObj,
     CommonObjFactory,
     ResponseRisk,
     ResponseRiskFactory, CommonObjWithValueFactory, CommonObjWithValue, ResponseRiskHistory, ResponseRiskHistoryFactory,
+    ResponseRiskBulk,
+    ResponseRiskBulkFactory,
+    ResponseRiskBulkRow,
+    ResponseRiskBulkUpdate,
+    RiskExportFactory,
+    ResponseRiskMatrix,
+    ResponseRiskMatrixFactory,
+    ResponseRiskSimulation,
+    ResponseRiskSimulationFactory,
+    ResponseRiskSearchHit,
+    ResponseRiskSearchHitFactory,
 )
-from src.db.db import Database
-from src.internal.dto.common_object import CommonObjDTOFactory, CommonObjWithValueDTOFactory
-from src.internal.dto.risks import RiskDTOFactory
+from src.db.async_db import AsyncDatabase
+from src.db.reference_data import ReferenceData, ReferenceDataCache
+from src.db.risk_matrix import RiskMatrixCache
+from src.db.risk_query import RISK_SORT_KEYS, fts_query
+from src.internal.export.records import MEDIA_TYPES, iter_encoded
+from src.internal.ingest.records import iter_records
+from src.internal.pagination.cursor import decode_cursor, encode_cursor
+from src.internal.simulation.monte_carlo import RiskSimulator, SimulationParams
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+BULK_CHUNK_SIZE = 1_000
+BULK_UPDATE_MAX_ITEMS = 1_000
+EXPORT_CHUNK_SIZE = 1_000
+NEW_IDS_MAX_COUNT = 1_000
 
 router = APIRouter()
 
 
 @router.get("/types", response_model=list[CommonObj])
 async def get_risk_types(
-        db: Database = Depends(get_db),
+        reference_data: ReferenceDataCache = Depends(get_reference_data),
 ):
-    rows: list[tuple] = db.get_risk_types()
-    return CommonObjFactory.get_many_from_tuples(rows)
+    return CommonObjFactory.get_many_from_dtos(list(reference_data.data.types.values()))
 
 
 @router.get("/factors", response_model=list[CommonObj])
 async def get_risk_factors(
-        db: Database = Depends(get_db),
+        reference_data: ReferenceDataCache = Depends(get_reference_data),
 ):
-    rows: list[tuple] = db.get_risk_factors()
-    return CommonObjFactory.get_many_from_tuples(rows)
+    return CommonObjFactory.get_many_from_dtos(list(reference_data.data.factors.values()))
 
 
 @router.get("/management-methods", response_model=list[CommonObj])
 async def get_risk_management_methods(
-        db: Database = Depends(get_db),
+        reference_data: ReferenceDataCache = Depends(get_reference_data),
 ):
-    rows: list[tuple] = db.get_risk_management_methods()
-    return CommonObjFactory.get_many_from_tuples(rows)
+    return CommonObjFactory.get_many_from_dtos(list(reference_data.data.methods.values()))
 
 
 @router.get("/statuses", response_model=list[CommonObj])
 async def get_risk_statuses(
-        db: Database = Depends(get_db),
+        reference_data: ReferenceDataCache = Depends(get_reference_data),
 ):
-    rows: list[tuple] = db.get_risk_statuses()
-    return CommonObjFactory.get_many_from_tuples(rows)
+    return CommonObjFactory.get_many_from_dtos(list(reference_data.data.statuses.values()))
 
 
 @router.get("/probabilities", response_model=list[CommonObjWithValue])
 async def get_probabilities(
-        db: Database = Depends(get_db),
+        reference_data: ReferenceDataCache = Depends(get_reference_data),
 ):
-    rows: list[tuple] = db.get_risk_probabilities()
-    return CommonObjWithValueFactory.get_many_from_tuples(rows)
+    return CommonObjWithValueFactory.get_many_from_dtos(list(reference_data.data.probabilities.values()))
 
 
 @router.get("/impacts", response_model=list[CommonObjWithValue])
 async def get_risk_impacts(
-        db: Database = Depends(get_db),
+        reference_data: ReferenceDataCache = Depends(get_reference_data),
 ):
-    rows: list[tuple] = db.get_risk_impacts()
-    return CommonObjWithValueFactory.get_many_from_tuples(rows)
+    return CommonObjWithValueFactory.get_many_from_dtos(list(reference_data.data.impacts.values()))
 
 
 @router.post("", response_model=ResponseRisk)
 async def create_new_risk(
         request_model: RequestRisk,
-        db: Database = Depends(get_db),
+        db: AsyncDatabase = Depends(get_async_db),
         auth_account_id: int = Depends(get_auth_account_id_from_token),
 ):
-    exists = db.risk_id_exists(risk_id=request_model.id, auth_account_id=auth_account_id)
-    if exists:
+    rowid = await db.create_risk(request_model=request_model, auth_account_id=auth_account_id)
+    if rowid is None:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="Risk id is already exist",
         )
-    # db.create_risk(request_model=request_model, auth_account_id=auth_account_id)
-    # factor = db.get_risk_factor_by_id(request_model.factor_id)
-    # type = db.get_risk_type_by_id(request_model.type_id)
-    # method = db.get_risk_management_method_by_id(request_model.method_id)
-    # risk_status = db.get_risk_status_by_id(1)
-    # probability = db.get_risk_probability_by_id(request_model.probability_id)
-    # impact = db.get_risk_impact_by_id(request_model.impact_id)
-
-    tasks = []
-    tasks.append(asyncio.create_task(fetch_data_no_factory(db.get_risk_factor_by_id, request_model.factor_id)))
-    tasks.append(asyncio.create_task(fetch_data_no_factory(db.get_risk_type_by_id, request_model.type_id)))
-    tasks.append(asyncio.create_task(fetch_data_no_factory(db.get_risk_management_method_by_id, request_model.method_id)))
-    tasks.append(asyncio.create_task(fetch_data_no_factory(db.get_risk_status_by_id, 1)))
-    tasks.append(asyncio.create_task(fetch_data_no_factory(db.get_risk_probability_by_id, request_model.probability_id)))
-    tasks.append(asyncio.create_task(fetch_data_no_factory(db.get_risk_impact_by_id, request_model.impact_id)))
-    tasks.append(asyncio.create_task(fetch_data_no_factory(db.create_risk, request_model, auth_account_id)))
-
-    results: tuple = await asyncio.gather(*tasks, return_exceptions=True)
-    factor, type, method, risk_status, probability, impact, _ = results
-
-    new_risk = (
-        request_model.id,
-        request_model.name,
-        request_model.description,
-        request_model.comment,
-        factor,
-        type,
-        method,
-        probability,
-        impact,
-        risk_status
-    )
+    created_risk = await db.get_risk_hydrated_by_id(risk_id=request_model.id, auth_account_id=auth_account_id)
+    return ResponseRiskFactory.get_from_hydrated_tuple(created_risk)
+
 
-    return ResponseRiskFactory.get_from_tuple(new_risk)
+@router.post("/bulk", response_model=ResponseRiskBulk)
+async def create_risks_bulk(
+        request: Request,
+        db: AsyncDatabase = Depends(get_async_db),
+        auth_account_id: int = Depends(get_auth_account_id_from_token),
+        reference_data: ReferenceDataCache = Depends(get_reference_data),
+        format_: Literal["ndjson", "csv"] | None = Query(
+            None, alias="format", description="формат тела запроса, по умолчанию определяется по Content-Type"),
+):
+    if format_ is None:
+        format_ = "csv" if "csv" in request.headers.get("content-type", "") else "ndjson"
+
+    rows: list[ResponseRiskBulkRow] = []
+    pending: list[tuple[int, RequestRisk]] = []
+    seen_ids: set[str] = set()
+
+    async def flush() -> None:
+        existing_ids = set(await db.create_risks(
+            request_models=[request_model for _, request_model in pending], auth_account_id=auth_account_id))
+        for line, request_model in pending:
+            if request_model.id in existing_ids:
+                rows.append(ResponseRiskBulkRow(
+                    line=line, id=request_model.id, created=False, error="Risk id is already exist"))
+            else:
+                rows.append(ResponseRiskBulkRow(line=line, id=request_model.id, created=True))
+        pending.clear()
+
+    async for record in iter_records(request.stream(), format_):
+        if record.error is not None:
+            rows.append(ResponseRiskBulkRow(line=record.line, created=False, error=record.error))
+            continue
+
+        try:
+            request_model = RequestRisk.model_validate(record.data)
+        except ValidationError as e:
+            error = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+            rows.append(ResponseRiskBulkRow(line=record.line, id=_raw_id(record.data), created=False, error=error))
+            continue
+        except TypeError:
+            rows.append(ResponseRiskBulkRow(
+                line=record.line, id=_raw_id(record.data), created=False, error="Invalid row"))
+            continue
+
+        error = _check_references(request_model, reference_data.data)
+        if error is None and request_model.id in seen_ids:
+            error = "Duplicate risk id in the upload"
+        if error is not None:
+            rows.append(ResponseRiskBulkRow(line=record.line, id=request_model.id, created=False, error=error))
+            continue
+
+        seen_ids.add(request_model.id)
+        pending.append((record.line, request_model))
+        if len(pending) >= BULK_CHUNK_SIZE:
+            await flush()
+
+    if pending:
+        await flush()
+
+    return ResponseRiskBulkFactory.get_from_rows(rows)
+
+
+def _raw_id(data: dict) -> str | None:
+    id_ = data.get("id")
+    return str(id_) if id_ is not None else None
+
+
+def _check_references(request_model: RequestRisk, data: ReferenceData) -> str | None:
+    for field, dictionary in (
+            ("factor_id", data.factors),
+            ("type_id", data.types),
+            ("method_id", data.methods),
+            ("probability_id", data.probabilities),
+            ("impact_id", data.impacts),
+            ("status_id", data.statuses),
+    ):
+        if getattr(request_model, field) not in dictionary:
+            return f"{field}: unknown id {getattr(request_model, field)}"
+    return None
 
 
 @router.get("", response_model=list[ResponseRisk])
 async def get_risks(
-        db: Database = Depends(get_db),
+        response: Response,
+        db: AsyncDatabase = Depends(get_async_db),
         auth_account_id: int = Depends(get_auth_account_id_from_token),
         pagination_params: PagesPaginationParams = Depends(),
+        cursor: str | None = Query(None, description=f"значение заголовка {NEXT_CURSOR_HEADER} предыдущей страницы"),
+        filter_params: RiskFilterParams = Depends(),
+        sort: Literal[
+            "-created_at", "created_at", "-updated_at", "updated_at", "-name", "name", "-score", "score",
+        ] = Query("-created_at", description="поле сортировки, '-' - по убыванию"),
 ):
-    db_methods = [
-        db.get_risk_factors,
-        db.get_risk_types,
-        db.get_risk_management_methods,
-        db.get_risk_statuses,
-        db.get_risk_probabilities,
-        db.get_risk_impacts
-    ]
-    factory_methods = [CommonObjDTOFactory.get_many_from_tuples] * (len(db_methods) - 2)
-    factory_methods.append(CommonObjWithValueDTOFactory.get_many_from_tuples)
-    factory_methods.append(CommonObjWithValueDTOFactory.get_many_from_tuples)
-
-    tasks = [asyncio.create_task(fetch_data(method, factory)) for method, factory in zip(db_methods, factory_methods)]
-
-    tasks.append(
-        asyncio.create_task(
-            fetch_data(
-                db.get_risks,
-                RiskDTOFactory.get_many_from_tuples,
-                auth_account_id=auth_account_id,
-                limit=pagination_params.limit,
-                offset=pagination_params.offset
-            )
-        )
+    after = None
+    if cursor is not None:
+        try:
+            cursor_sort, *after = decode_cursor(cursor, size=3)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        if cursor_sort != sort:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor belongs to another sort")
+
+    rows = await db.get_risks_hydrated(
+        auth_account_id=auth_account_id,
+        limit=pagination_params.limit,
+        offset=pagination_params.offset,
+        after=after,
+        sort=sort,
+        filters=filter_params.filters,
+    )
+    if pagination_params.limit and len(rows) == pagination_params.limit:
+        last_row = rows[-1]
+        sort_key = RISK_SORT_KEYS[sort.lstrip("-")]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(sort, last_row[sort_key.row_index], last_row[0])
+
+    return ResponseRiskFactory.get_many_from_hydrated_tuples(rows)
+
+
+@router.get("/search", response_model=list[ResponseRiskSearchHit])
+async def search_risks(
+        response: Response,
+        q: str = Query(..., min_length=1, max_length=500, description="слова для поиска по названию, описанию и комментарию"),
+        db: AsyncDatabase = Depends(get_async_db),
+        auth_account_id: int = Depends(get_auth_account_id_from_token),
+        pagination_params: PagesPaginationParams = Depends(),
+        cursor: str | None = Query(None, description=f"значение заголовка {NEXT_CURSOR_HEADER} предыдущей страницы"),
+):
+    query = fts_query(q)
+    if query is None:
+        return []
+
+    after = None
+    if cursor is not None:
+        try:
+            after = decode_cursor(cursor, size=2)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        if isinstance(after[0], bool) or not isinstance(after[0], (int, float)):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    rows = await db.search_risks(
+        auth_account_id=auth_account_id,
+        query=query,
+        limit=pagination_params.limit,
+        offset=pagination_params.offset,
+        after=after,
     )
+    if pagination_params.limit and len(rows) == pagination_params.limit:
+        last_row = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last_row[21], last_row[0])
+
+    return ResponseRiskSearchHitFactory.get_many_from_tuples(rows)
+
+
+@router.get("/export")
+async def export_risks(
+        db: AsyncDatabase = Depends(get_async_db),
+        auth_account_id: int = Depends(get_auth_account_id_from_token),
+        format_: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+):
+    async def batches():
+        after = None
+        while True:
+            rows = await db.get_risks_hydrated(auth_account_id=auth_account_id, limit=EXPORT_CHUNK_SIZE, after=after)
+            yield RiskExportFactory.get_many_records_from_hydrated_tuples(rows)
+            if len(rows) < EXPORT_CHUNK_SIZE:
+                return
+            after = (rows[-1][18], rows[-1][0])
+
+    return StreamingResponse(
+        iter_encoded(batches(), format_, columns=RiskExportFactory.columns),
+        media_type=MEDIA_TYPES[format_],
+        headers={"Content-Disposition": f'attachment; filename="risks.{format_}"'},
+    )
+
+
+@router.get("/matrix", response_model=ResponseRiskMatrix)
+async def get_risk_matrix(
+        db: AsyncDatabase = Depends(get_async_db),
+        auth_account_id: int = Depends(get_auth_account_id_from_token),
+        reference_data: ReferenceDataCache = Depends(get_reference_data),
+        risk_matrix: RiskMatrixCache = Depends(get_risk_matrix),
+        with_ids: bool = Query(False, description="вернуть идентификаторы рисков в каждой ячейке"),
+):
+    matrix = await db.run(risk_matrix.get, auth_account_id, with_ids)
+    return ResponseRiskMatrixFactory.get_from_matrix(matrix, reference_data.data)
+
 
-    results: tuple = await asyncio.gather(*tasks)
+@router.post("/simulate", response_model=ResponseRiskSimulation)
+async def simulate_risks(
+        request_model: RequestRiskSimulation,
+        db: AsyncDatabase = Depends(get_async_db),
+        auth_account_id: int = Depends(get_auth_account_id_from_token),
+        simulator: RiskSimulator = Depends(get_simulator),
+):
+    risks = await db.get_risk_simulation_inputs(auth_account_id=auth_account_id)
 
-    factors, types, methods, statuses, probabilities, impacts, risks = results
+    cost_ranges = {cost_range.risk_id: (cost_range.low, cost_range.high) for cost_range in request_model.cost_ranges}
+    unknown_ids = cost_ranges.keys() - {risk[0] for risk in risks}
+    if unknown_ids:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Cost ranges reference unknown or unassessed risks: {', '.join(sorted(unknown_ids))}",
+        )
 
-    return ResponseRiskFactory.get_many_from_tuples(
-        risks=risks, factors=factors, types=types, methods=methods,
-        statuses=statuses, probabilities=probabilities, impacts=impacts)
+    result = await simulator.run(
+        risks=risks,
+        params=SimulationParams(
+            trials=request_model.trials,
+            percentiles=tuple(request_model.percentiles),
+            var_level=request_model.var_level,
+            seed=request_model.seed,
+        ),
+        cost_ranges=cost_ranges,
+    )
+    return ResponseRiskSimulationFactory.get_from_result(result)
 
 
 @router.get("/{risk_id}/history", response_model=ResponseRiskHistory)
 async def get_risk_history(
         risk_id: str,
-        db: Database = Depends(get_db),
+        db: AsyncDatabase = Depends(get_async_db),
         auth_account_id: int = Depends(get_auth_account_id_from_token),
         pagination_params: PagesPaginationParams = Depends(),
+        before_id: int | None = Query(None, ge=1, description="значение next_before_id предыдущей страницы"),
 ):
-    risk_exist = db.risk_id_exists(risk_id=risk_id, auth_account_id=auth_account_id)
+    risk_exist = await db.risk_id_exists(risk_id=risk_id, auth_account_id=auth_account_id)
     if not risk_exist:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Risk not found",
         )
 
-    risk_created_at: tuple[str] = db.get_risk_created_at_by_id(risk_id=risk_id, auth_account_id=auth_account_id)
+    risk_created_at: tuple[str] = await db.get_risk_created_at_by_id(risk_id=risk_id, auth_account_id=auth_account_id)
     risk_created_at_timestamp = int(datetime.strptime(risk_created_at[0], "%Y-%m-%d %H:%M:%S").timestamp())
 
-    history = db.get_risk_history_by_risk_id(
-        risk_id=risk_id, limit=pagination_params.limit, offset=pagination_params.offset)
-
-    return ResponseRiskHistoryFactory.get_from_tuple(risk_created_at=risk_created_at_timestamp, history=history)
+    history = await db.get_risk_history_by_risk_id(
+        auth_account_id=auth_account_id, risk_id=risk_id, limit=pagination_params.limit, offset=pagination_params.offset, before_id=before_id)
 
-
-async def fetch_data(db_method: Callable[..., Any], factory_method: Callable[[Any], Any], *args, **kwargs) -> Any:
-    with ThreadPoolExecutor() as executor:
-        future = executor.submit(db_method, *args, **kwargs)
-        data = future.result()
-        result = factory_method(data)
-    return result
-
-
-async def fetch_data_no_factory(db_method: Callable[..., Any], *args, **kwargs) -> Any:
-    with ThreadPoolExecutor() as executor:
-        future = executor.submit(db_method, *args, **kwargs)
-        data = future.result()
-    return data
+    return ResponseRiskHistoryFactory.get_from_tuple(
+        risk_created_at=risk_created_at_timestamp, history=history, limit=pagination_params.limit)
 
 
 @router.patch("", response_model=ResponseRisk)
 async def patch_risk(
         request_model: RequestRiskUpdate,
-        db: Database = Depends(get_db),
+        db: AsyncDatabase = Depends(get_async_db),
         auth_account_id: int = Depends(get_auth_account_id_from_token),
 ):
-    risk_exist = db.risk_id_exists(risk_id=request_model.id, auth_account_id=auth_account_id)
+    risk_exist = await db.risk_id_exists(risk_id=request_model.id, auth_account_id=auth_account_id)
     if not risk_exist:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Risk not found",
         )
-    db.update_risk_by_request_model(request_model=request_model, auth_account_id=auth_account_id)
-    updated_risk = db.get_risk_by_id(risk_id=request_model.id, auth_account_id=auth_account_id)
-    risk = RiskDTOFactory.from_tuple(updated_risk)
-
-    db_methods = [
-        db.get_risk_factors,
-        db.get_risk_types,
-        db.get_risk_management_methods,
-        db.get_risk_statuses,
-        db.get_risk_probabilities,
-        db.get_risk_impacts
-    ]
-    factory_methods = [CommonObjDTOFactory.get_many_from_tuples] * (len(db_methods) - 2)
-    factory_methods.append(CommonObjWithValueDTOFactory.get_many_from_tuples)
-    factory_methods.append(CommonObjWithValueDTOFactory.get_many_from_tuples)
-    tasks = [fetch_data(method, factory) for method, factory in zip(db_methods, factory_methods)]
-    results: tuple = await asyncio.gather(*tasks)
-
-    factors, types, methods, statuses, probabilities, impacts = results
-
-    return ResponseRiskFactory.get_from_tuple_with_dict(
-        risk=risk, factors=factors, types=types, methods=methods,
-        statuses=statuses, probabilities=probabilities, impacts=impacts)
+    await db.update_risk_by_request_model(request_model=request_model, auth_account_id=auth_account_id)
+    updated_risk = await db.get_risk_hydrated_by_id(risk_id=request_model.id, auth_account_id=auth_account_id)
+    return ResponseRiskFactory.get_from_hydrated_tuple(updated_risk)
+
+
+@router.patch("/bulk", response_model=ResponseRiskBulkUpdate)
+async def patch_risks_bulk(
+        request_models: list[RequestRiskUpdate],
+        db: AsyncDatabase = Depends(get_async_db),
+        auth_account_id: int = Depends(get_auth_account_id_from_token),
+):
+    if len(request_models) > BULK_UPDATE_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"At most {BULK_UPDATE_MAX_ITEMS} risks per request",
+        )
+    ids = [request_model.id for request_model in request_models]
+    if len(set(ids)) != len(ids):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Each risk id may appear only once",
+        )
+
+    not_found = await db.update_risks(auth_account_id=auth_account_id, request_models=request_models)
+    updated = await db.get_risks_hydrated_by_ids(auth_account_id=auth_account_id, risk_ids=ids)
+    return ResponseRiskBulkUpdate(
+        updated=ResponseRiskFactory.get_many_from_hydrated_tuples(updated),
+        not_found=not_found,
+    )
 
 
 @router.delete("/{risk_id}", response_model=ResponseEmpty)
 async def delete_risk(
         risk_id: str,
-        background_tasks: BackgroundTasks,
-        db: Database = Depends(get_db),
+        db: AsyncDatabase = Depends(get_async_db),
         auth_account_id: int = Depends(get_auth_account_id_from_token),
 ):
-    background_tasks.add_task(db.delete_risk, risk_id=risk_id, auth_account_id=auth_account_id)
+    await db.delete_risk(risk_id=risk_id, auth_account_id=auth_account_id)
     return ResponseEmpty()
 
 
 @router.get("/new-id", response_model=str)
 async def create_new_risk_id(
-        db: Database = Depends(get_db),
+        db: AsyncDatabase = Depends(get_async_db),
+        auth_account_id: int = Depends(get_auth_account_id_from_token),
+):
+    return (await db.reserve_risk_ids(auth_account_id=auth_account_id))[0]
+
+
+@router.get("/new-ids", response_model=list[str])
+async def create_new_risk_ids(
+        db: AsyncDatabase = Depends(get_async_db),
         auth_account_id: int = Depends(get_auth_account_id_from_token),
+        count: int = Query(..., ge=1, le=NEW_IDS_MAX_COUNT, description="сколько идущих подряд id зарезервировать"),
 ):
-    projectId = db.get_project_id_by_account_id(auth_account_id)
-    try:
-        last_id = int(db.get_last_risk_id(auth_account_id=auth_account_id)[-4::])
-    except TypeError:
-        last_id = 0
-    new_risk_id = f"{str(last_id + 1).zfill(4)}"
-    return f"{projectId}-{new_risk_id}"
+    return await db.reserve_risk_ids(auth_account_id=auth_account_id, count=count)
@@ -0,0 +1,60 @@
+import functools
+from typing import Any, Callable
+
+from src.db.db import Database
+from src.internal.executor.executor import BoundedExecutor
+
+
+class AsyncDatabase:
+    """
+    Awaitable facade over `Database` with the same method surface.
+
+    Every method call is shipped to a pool of DB threads, each of which owns one pooled SQLite
+    connection, so a slow query only occupies a DB thread instead of the event loop. Pass the
+    application's shared executor to run on it; otherwise a private one sized to the free connections is
+    created.
+    """
+
+    def __init__(self, db: Database, executor: BoundedExecutor | None = None) -> None:
+        self._db = db
+        self._owns_executor = executor is None
+        # the thread that opened the database keeps one pooled connection
+        self._executor = executor or BoundedExecutor(
+            max_workers=max(db.pool.size - 1, 1),
+            thread_name_prefix="db",
+        )
+        self._methods: dict[str, Callable[..., Any]] = {}
+
+    @property
+    def sync(self) -> Database:
+        return self._db
+
+    @property
+    def executor(self) -> BoundedExecutor:
+        return self._executor
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        return await self._executor.run(func, *args, **kwargs)
+
+    def close(self) -> None:
+        if self._owns_executor:
+            self._executor.shutdown(wait=True)
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        method = self._methods.get(name)
+        if method is not None:
+            return method
+
+        attr = getattr(self._db, name)
+        if not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def method(*args, **kwargs):
+            return await self.run(attr, *args, **kwargs)
+
+        self._methods[name] = method
+        return method
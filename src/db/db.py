@@ -1,11 +1,97 @@
 import logging
+import math
 import sqlite3
-from sqlite3 import Connection, connect
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
 
 from src.api.request.risks import RequestRisk, RequestRiskUpdate
+from src.db.group_commit import GroupCommitter
+from src.db.history_archive import (
+    COLD_HISTORY_SCAN_RISKS,
+    COLD_HISTORY_SQL,
+    COLD_HISTORY_THRESHOLD_SQL,
+    decode_history_batch,
+    encode_history_batch,
+)
+from src.db.migrations import Migrator
+from src.db.pool import ConnectionPool
+from src.db.risk_query import RISK_SORT_KEYS, RiskFilters, keyset_condition
+from src.db.scoring import SCORE_FROM_COLUMNS_SQL, SCORE_FROM_PARAMS_SQL, compute_scores
 
 db = None
 
+HYDRATED_RISK_COLUMNS = """
+        r.id, r.name, r.description, r.comment,
+        f.id, f.name,
+        t.id, t.name,
+        m.id, m.name,
+        p.id, p.name, p.value,
+        i.id, i.name, i.value,
+        s.id, s.name,
+        r.created_at,
+        r.score,
+        r.updated_at
+"""
+HYDRATED_RISK_FROM = """
+    FROM risks r
+    LEFT JOIN risk_factors f ON f.id = r.risk_factor_id
+    LEFT JOIN risk_types t ON t.id = r.risk_type_id
+    LEFT JOIN risk_management_methods m ON m.id = r.risk_management_method_id
+    LEFT JOIN probability p ON p.id = r.probability_id
+    LEFT JOIN impact i ON i.id = r.impact_id
+    LEFT JOIN risk_status s ON s.id = r.risk_status_id
+"""
+HYDRATED_RISK_SELECT = "SELECT" + HYDRATED_RISK_COLUMNS + HYDRATED_RISK_FROM
+# the words of a search only match the text columns of risks_fts, never its account_id
+SEARCH_TEXT_COLUMNS = "{name description comment}"
+
+# hot history entries of one risk, reached through its change sets
+HOT_HISTORY_SELECT = """
+    SELECT h.timestamp, h.updated_column_name, h.old_data, h.new_data, h.id
+    FROM history_change_sets c
+    JOIN history_log_risks h ON h.change_set_id = c.id
+    WHERE c.risk_id = ? AND c.account_id = ?
+"""
+PURGE_HISTORY_ENTRIES_SQL = """
+    DELETE FROM history_log_risks WHERE id IN (
+        SELECT h.id FROM history_change_sets c JOIN history_log_risks h ON h.change_set_id = c.id
+        WHERE c.risk_id = ? AND c.account_id = ? LIMIT ?
+    )
+"""
+# reserves the next `count` numbers of an account in one statement; returns the last of them and the project id
+RESERVE_RISK_IDS_SQL = """
+    INSERT INTO risk_id_sequences (account_id, last_value) VALUES (?, ?)
+    ON CONFLICT(account_id) DO UPDATE SET last_value = last_value + excluded.last_value
+    RETURNING last_value, (SELECT projectId FROM accounts WHERE id = account_id)
+"""
+# moves an account's sequence past a created "<projectId>-<number>" id, so reserved ids never collide with it;
+# numbers longer than 18 digits are ignored, the sequence and the ids reserved after it must fit a 64-bit integer
+ADVANCE_RISK_ID_SEQUENCE_SQL = """
+    INSERT INTO risk_id_sequences (account_id, last_value)
+    SELECT id, CAST(substr(?1, length(projectId) + 2) AS INTEGER) FROM accounts
+    WHERE id = ?2
+        AND substr(?1, 1, length(projectId) + 1) = projectId || '-'
+        AND length(?1) BETWEEN length(projectId) + 2 AND length(projectId) + 19
+        AND substr(?1, length(projectId) + 2) NOT GLOB '*[^0-9]*'
+    ON CONFLICT(account_id) DO UPDATE SET last_value = MAX(last_value, excluded.last_value)
+"""
+RISK_ID_DIGITS = 4
+PURGE_CHANGE_SETS_SQL = """
+    DELETE FROM history_change_sets WHERE id IN (
+        SELECT id FROM history_change_sets WHERE risk_id = ? AND account_id = ? LIMIT ?
+    )
+"""
+# history written before entries recorded their account and which no single account could claim; it is kept
+# until no account holds the risk id any more
+PURGE_UNATTRIBUTED_HISTORY_SQL = """
+    DELETE FROM history_log_risks WHERE id IN (
+        SELECT h.id FROM history_log_risks h
+        WHERE h.change_set_id IS NULL AND h.account_id IS NULL
+            AND NOT EXISTS (SELECT 1 FROM risks r WHERE r.id = h.risk_id)
+        LIMIT ?
+    )
+"""
+
 
 class Database:
     _instance = None
@@ -15,7 +101,18 @@ class Database:
             cls._instance = super(Database, cls).__new__(cls)
         return cls._instance
 
-    def __init__(self, path: str, logger: logging.Logger) -> None:
+    def __init__(
+            self,
+            path: str,
+            logger: logging.Logger,
+            pool_size: int = 12,
+            pool_timeout: float = 30.0,
+            pool_health_check_interval: float = 60.0,
+            pragmas: dict[str, str | int] | None = None,
+            group_commit: bool = False,
+            group_commit_window: float = 0.002,
+            group_commit_max_batch: int = 64,
+    ) -> None:
         self.path = path
         self.logger = logger
 
@@ -24,525 +121,728 @@ class Database:
 
         self.initialized = True
 
-        self._cursor = self.connection.cursor()
+        self._pool = ConnectionPool(
+            path=path,
+            logger=logger,
+            size=pool_size,
+            timeout=pool_timeout,
+            health_check_interval=pool_health_check_interval,
+            pragmas=pragmas,
+        )
+        self._reference_data_listeners: list[Callable[[], None]] = []
+        self._risks_listeners: list[Callable[[int], None]] = []
+        self._migrator = Migrator(logger=logger)
+        self._group_committer: GroupCommitter | None = None
+        self._cold_history_after_rowid = 0
 
         self.create_tables_and_fill_data()
-        self.logger.info("Database initialized")
+
+        self._group_committer = GroupCommitter(
+            transaction=self.transaction,
+            logger=logger,
+            window=group_commit_window,
+            max_batch=group_commit_max_batch,
+        ) if group_commit else None
+
+        self.logger.info(f"Database initialized, pragmas: {self.effective_pragmas()}")
 
     @property
-    def __cursor(self) -> sqlite3.Cursor:
-        cur = self._cursor
-        yield cur
+    def pool(self) -> ConnectionPool:
+        return self._pool
 
     @property
     def connection(self) -> sqlite3.Connection:
-        with connect(self.path, check_same_thread=False) as conn:
-            return conn
+        return self._pool.get().connection
 
     @property
     def cursor(self) -> sqlite3.Cursor:
-        cur = next(self.__cursor)
-        return cur
+        return self._pool.get().cursor
 
     def get_path(self):
         return self.path
 
-    def drop_tables_with_dynamic_data(self) -> None:
-        self.cursor.execute(
-            """
-            DROP TABLE IF EXISTS accounts; 
-            """
-        )
-        self.cursor.execute(
-            """
-            DROP TABLE IF EXISTS risks; 
-            """
-        )
-        self.cursor.execute(
-            """
-            DROP TABLE IF EXISTS history_log_risks; 
-            """
-        )
-        # self.connection.commit()
-
-    def create_tables_and_fill_data(self) -> None:
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Cursor]:
         """
-        Create the tables in the database if they don't exist already and fill them with data.
+        Unit of work on this thread's connection: commits on success, rolls back on any error.
+
+        The write lock is taken up front (`BEGIN IMMEDIATE`), so a unit never fails half-way on a lock upgrade.
+        Nested calls join the outermost unit.
         """
-        self.cursor.execute(
-            """
-            DROP TABLE IF EXISTS probability; 
-            """
-        )
-        self.cursor.execute(
-            """
-        CREATE TABLE IF NOT EXISTS probability (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            value FLOAT NOT NULL
-        )
+        pooled = self._pool.get()
+        if pooled.transaction_depth:
+            pooled.transaction_depth += 1
+            try:
+                yield pooled.cursor
+            finally:
+                pooled.transaction_depth -= 1
+            return
+
+        connection = pooled.connection
+        if connection.in_transaction:
+            connection.commit()
+        connection.execute("BEGIN IMMEDIATE")
+        pooled.transaction_depth = 1
+        try:
+            yield pooled.cursor
+        except BaseException:
+            connection.rollback()
+            raise
+        else:
+            connection.commit()
+        finally:
+            pooled.transaction_depth = 0
+
+    def run_in_transaction(self, work: Callable[[sqlite3.Cursor], Any]) -> Any:
         """
-        )
-        probabilities = [
-            (
-                1,
-                "Низкая",
-                0.2
-            ),
-            (
-                2,
-                "Ниже среднего",
-                0.4
-
-            ),
-            (
-                3,
-                "Средняя",
-                0.6
-            ),
-            (
-                4,
-                "Выше среднего",
-                0.8
-            ),
-            (
-                5,
-                "Высокая",
-                1
-            )
-        ]
-        self.cursor.executemany("INSERT INTO probability (id, name, value) VALUES (?, ?, ?)", probabilities)
+        Run a write unit of work atomically and return its result.
 
-        self.cursor.execute(
-            """
-            DROP TABLE IF EXISTS impact; 
-            """
-        )
-        self.cursor.execute(
-            """
-        CREATE TABLE IF NOT EXISTS impact (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            value FLOAT NOT NULL
-        )
+        With group commit enabled, units from concurrent callers are coalesced into shared commits; inside an
+        already open transaction the unit simply joins it.
         """
-        )
-        impacts = [
-            (
-                1,
-                "Незначительное",
-                0.2
-            ),
-            (
-                2,
-                "Минимальное",
-                0.4
-
-            ),
-            (
-                3,
-                "Среднее",
-                0.6
-            ),
-            (
-                4,
-                "Высокое",
-                0.8
-            ),
-            (
-                5,
-                "Критичное",
-                1
-            )
-        ]
-        self.cursor.executemany("INSERT INTO impact (id, name, value) VALUES (?, ?, ?)", impacts)
+        if self._group_committer is not None and not self._pool.get().transaction_depth:
+            return self._group_committer.submit(work)
 
-        self.cursor.execute(
-            """
-            DROP TABLE IF EXISTS risk_status; 
-            """
-        )
+        with self.transaction() as cursor:
+            return work(cursor)
 
-        self.cursor.execute(
-            """
-            DROP TABLE IF EXISTS risk_factors; 
-            """
-        )
-        self.cursor.execute(
-            """
-            DROP TABLE IF EXISTS risk_types; 
-            """
-        )
-        self.cursor.execute(
-            """
-            DROP TABLE IF EXISTS risk_management_methods; 
-            """
-        )
+    def effective_pragmas(self) -> dict[str, str | int]:
+        """
+        Values SQLite actually uses on this thread's connection for every configured pragma.
+        """
+        return {
+            name: self.cursor.execute(f"PRAGMA {name}").fetchone()[0]
+            for name in self._pool.pragmas
+        }
 
-        self.cursor.execute(
-            """
-        CREATE TABLE IF NOT EXISTS risk_status (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL
-            )
+    def add_reference_data_listener(self, listener: Callable[[], None]) -> None:
         """
-        )
-        risk_statuses = [
-            (
-                1,
-                "Открыто",
-            ),
-            (
-                2,
-                "Выполняется",
-            ),
-            (
-                3,
-                "Закрыто",
-            ),
-        ]
-        self.cursor.executemany("INSERT INTO risk_status (id, name) VALUES (?, ?)", risk_statuses)
+        Register a callback fired whenever a dictionary table (factors, types, methods, statuses,
+        probabilities, impacts) is rewritten.
+        """
+        self._reference_data_listeners.append(listener)
 
-        self.cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS accounts (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                email TEXT UNIQUE NOT NULL,
-                password TEXT NOT NULL,
-                name TEXT NOT NULL,
-                projectName TEXT NOT NULL,
-                projectId TEXT NOT NULL,
-                description TEXT
-            )
+    def notify_reference_data_changed(self) -> None:
+        for listener in self._reference_data_listeners:
+            listener()
+
+    def add_risks_listener(self, listener: Callable[[int], None]) -> None:
         """
-        )
-        self.cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS risks (
-                id string NOT NULL,
-                created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                name TEXT NOT NULL,
-                account_id INTEGER NOT NULL,
-                description TEXT,
-                comment TEXT,
-                risk_factor_id INTEGER NOT NULL,
-                risk_type_id INTEGER NOT NULL,
-                risk_management_method_id INTEGER NOT NULL,
-                risk_status_id INTEGER NOT NULL DEFAULT 1,
-                probability_id INTEGER,
-                impact_id INTEGER,
-                FOREIGN KEY (account_id) REFERENCES accounts(id),
-                FOREIGN KEY (risk_factor_id) REFERENCES risk_factors(id),
-                FOREIGN KEY (risk_type_id) REFERENCES risk_types(id),
-                FOREIGN KEY (risk_management_method_id) REFERENCES risk_management_methods(id),
-                FOREIGN KEY (risk_status_id) REFERENCES risk_status(id),
-                FOREIGN KEY (probability_id) REFERENCES probability(id),
-                FOREIGN KEY (impact_id) REFERENCES impact(id),
-                PRIMARY KEY (id, account_id)
-            )
+        Register a callback fired with the account id after risks of that account were created, updated or deleted.
         """
-        )
+        self._risks_listeners.append(listener)
 
-        self.cursor.execute(
-            """
-            CREATE TRIGGER IF NOT EXISTS track_name_changes
-            AFTER UPDATE OF name ON risks
-            FOR EACH ROW
-            BEGIN
-                INSERT INTO history_log_risks (risk_id, updated_column_name, old_data, new_data, timestamp, prev_history_id)
-                VALUES (OLD.id, 'название', OLD.name, NEW.name, CURRENT_TIMESTAMP, (SELECT id FROM history_log_risks WHERE risk_id = OLD.id ORDER BY id DESC LIMIT 1));
-            END;
-            """
-        )
+    def notify_risks_changed(self, auth_account_id: int) -> None:
+        for listener in self._risks_listeners:
+            listener(auth_account_id)
 
+    def drop_tables_with_dynamic_data(self) -> None:
         self.cursor.execute(
             """
-            CREATE TRIGGER IF NOT EXISTS track_description_changes
-            AFTER UPDATE OF description ON risks
-            FOR EACH ROW
-            BEGIN
-                INSERT INTO history_log_risks (risk_id, updated_column_name, old_data, new_data, timestamp, prev_history_id)
-                VALUES (OLD.id, 'описание', OLD.description, NEW.description, CURRENT_TIMESTAMP, (SELECT id FROM history_log_risks WHERE risk_id = OLD.id ORDER BY id DESC LIMIT 1));
-            END;
+            DROP TABLE IF EXISTS accounts; 
             """
         )
-
         self.cursor.execute(
             """
-            CREATE TRIGGER IF NOT EXISTS track_comment_changes
-            AFTER UPDATE OF comment ON risks
-            FOR EACH ROW
-            BEGIN
-                INSERT INTO history_log_risks (risk_id, updated_column_name, old_data, new_data, timestamp, prev_history_id)
-                VALUES (OLD.id, 'комментарий', OLD.comment, NEW.comment, CURRENT_TIMESTAMP, (SELECT id FROM history_log_risks WHERE risk_id = OLD.id ORDER BY id DESC LIMIT 1));
-            END;
+            DROP TABLE IF EXISTS risks; 
             """
         )
-
         self.cursor.execute(
             """
-            CREATE TRIGGER IF NOT EXISTS track_risk_factor_id_changes
-            AFTER UPDATE OF risk_factor_id ON risks
-            FOR EACH ROW
-            WHEN OLD.risk_factor_id != NEW.risk_factor_id
-            BEGIN
-                INSERT INTO history_log_risks (risk_id, updated_column_name, old_data, new_data, timestamp, prev_history_id)
-                VALUES (OLD.id, 'фактор', (SELECT name FROM risk_factors WHERE id = OLD.risk_factor_id), (SELECT name FROM risk_factors WHERE id = NEW.risk_factor_id), CURRENT_TIMESTAMP, (SELECT id FROM history_log_risks WHERE risk_id = OLD.id ORDER BY id DESC LIMIT 1));
-            END;
+            DROP TABLE IF EXISTS history_log_risks; 
             """
         )
         self.cursor.execute(
             """
-            CREATE TRIGGER IF NOT EXISTS track_risk_type_id_changes
-            AFTER UPDATE OF risk_type_id ON risks
-            FOR EACH ROW
-            WHEN OLD.risk_type_id != NEW.risk_type_id
-            BEGIN
-                INSERT INTO history_log_risks (risk_id, updated_column_name, old_data, new_data, timestamp, prev_history_id)
-                VALUES (OLD.id, 'вид риска', (SELECT name FROM risk_types WHERE id = OLD.risk_type_id), (SELECT name FROM risk_types WHERE id = NEW.risk_type_id), CURRENT_TIMESTAMP, (SELECT id FROM history_log_risks WHERE risk_id = OLD.id ORDER BY id DESC LIMIT 1));
-            END;
+            DROP TABLE IF EXISTS history_log_risks_archive;
             """
         )
         self.cursor.execute(
             """
-            CREATE TRIGGER IF NOT EXISTS track_risk_management_method_id_changes
-            AFTER UPDATE OF risk_management_method_id ON risks
-            FOR EACH ROW
-            WHEN OLD.risk_management_method_id != NEW.risk_management_method_id
-            BEGIN
-                INSERT INTO history_log_risks (risk_id, updated_column_name, old_data, new_data, timestamp, prev_history_id)
-                VALUES (OLD.id, 'метод управления', (SELECT name FROM risk_management_methods WHERE id = OLD.risk_management_method_id), (SELECT name FROM risk_management_methods WHERE id = NEW.risk_management_method_id), CURRENT_TIMESTAMP, (SELECT id FROM history_log_risks WHERE risk_id = OLD.id ORDER BY id DESC LIMIT 1));
-            END;
+            DROP TABLE IF EXISTS history_change_sets;
             """
         )
         self.cursor.execute(
             """
-            CREATE TRIGGER IF NOT EXISTS track_risk_status_id_changes
-            AFTER UPDATE OF risk_status_id ON risks
-            FOR EACH ROW
-            WHEN OLD.risk_status_id != NEW.risk_status_id
-            BEGIN
-                INSERT INTO history_log_risks (risk_id, updated_column_name, old_data, new_data, timestamp, prev_history_id)
-                VALUES (OLD.id, 'статус', (SELECT name FROM risk_status WHERE id = OLD.risk_status_id), (SELECT name FROM risk_status WHERE id = NEW.risk_status_id), CURRENT_TIMESTAMP, (SELECT id FROM history_log_risks WHERE risk_id = OLD.id ORDER BY id DESC LIMIT 1));
-            END;
+            DROP TABLE IF EXISTS risk_id_sequences;
             """
         )
         self.cursor.execute(
             """
-            CREATE TRIGGER IF NOT EXISTS track_probability_id_changes
-            AFTER UPDATE OF probability_id ON risks
-            FOR EACH ROW
-            WHEN OLD.probability_id != NEW.probability_id
-            BEGIN
-                INSERT INTO history_log_risks (risk_id, updated_column_name, old_data, new_data, timestamp, prev_history_id)
-                VALUES (OLD.id, 'вероятность', (SELECT name FROM probability WHERE id = OLD.probability_id), (SELECT name FROM probability WHERE id = NEW.probability_id), CURRENT_TIMESTAMP, (SELECT id FROM history_log_risks WHERE risk_id = OLD.id ORDER BY id DESC LIMIT 1));
-            END;
+            DROP TABLE IF EXISTS risk_revisions;
             """
         )
         self.cursor.execute(
             """
-            CREATE TRIGGER IF NOT EXISTS track_impact_id_changes
-            AFTER UPDATE OF impact_id ON risks
-            FOR EACH ROW
-            WHEN OLD.impact_id != NEW.impact_id
-            BEGIN
-                INSERT INTO history_log_risks (risk_id, updated_column_name, old_data, new_data, timestamp, prev_history_id)
-                VALUES (OLD.id, 'влияние', (SELECT name FROM impact WHERE id = OLD.impact_id), (SELECT name FROM impact WHERE id = NEW.impact_id), CURRENT_TIMESTAMP, (SELECT id FROM history_log_risks WHERE risk_id = OLD.id ORDER BY id DESC LIMIT 1));
-            END;
-
+            DROP TABLE IF EXISTS risks_fts;
             """
         )
-
         self.cursor.execute(
             """
-            CREATE TABLE IF NOT EXISTS history_log_risks (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                risk_id string NOT NULL,
-                prev_history_id INTEGER,
-                updated_column_name TEXT NOT NULL,
-                old_data TEXT,
-                new_data TEXT NOT NULL,
-                timestamp DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (risk_id) REFERENCES risks(id),
-                FOREIGN KEY (prev_history_id) REFERENCES history_log_risks(id)
-            )
+            DROP TABLE IF EXISTS schema_version; 
             """
         )
+        self.connection.commit()
 
-        self.cursor.execute(
-            """
-        CREATE TABLE IF NOT EXISTS risk_factors (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL
-        )
+    def create_tables_and_fill_data(self) -> None:
         """
-        )
+        Bring the schema up to date and make sure the dictionaries are seeded.
 
-        self.cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS risk_types (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL
-            )
-            """
-        )
+        Cheap when the database is already current: only `schema_version` is read.
+        """
+        applied = self._migrator.migrate(self.connection)
+        if applied:
+            self.notify_reference_data_changed()
+            self.recompute_scores()
 
-        self.cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS risk_management_methods (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL
+    def delete_risk(self, risk_id: str, auth_account_id: int) -> None:
+        """
+        Soft-delete a risk: it is tombstoned and hidden from every read at once, while the row and its history
+        are removed later in bounded batches by `purge_deleted_risks`.
+        """
+        self.run_in_transaction(lambda cursor: cursor.execute(
+            "UPDATE risks SET deleted_at = CURRENT_TIMESTAMP WHERE id = ? AND account_id = ? AND deleted_at IS NULL",
+            (risk_id, auth_account_id),
+        ))
+        self.notify_risks_changed(auth_account_id)
+
+    def purge_deleted_risks(self, batch_size: int = 500) -> int:
+        """
+        Hard-delete soft-deleted risks, oldest tombstone first, together with their hot and archived history,
+        removing at most `batch_size` history entries or change sets in one transaction. A risk whose history
+        does not fit is finished by the next call. The rest of the budget goes to unattributed legacy history
+        whose risk id no account holds any more.
+
+        Returns the number of removed rows; 0 means nothing is left to purge.
+        """
+        def work(cursor: sqlite3.Cursor) -> int:
+            tombstones = cursor.execute(
+                "SELECT id, account_id FROM risks WHERE deleted_at IS NOT NULL ORDER BY deleted_at LIMIT ?",
+                (batch_size,),
+            ).fetchall()
+
+            removed = 0
+            for risk_id, account_id in tombstones:
+                for statement in (PURGE_HISTORY_ENTRIES_SQL, PURGE_CHANGE_SETS_SQL):
+                    budget = batch_size - removed
+                    cursor.execute(statement, (risk_id, account_id, budget))
+                    removed += cursor.rowcount
+                    if cursor.rowcount == budget:
+                        return removed
+                cursor.execute(
+                    "DELETE FROM history_log_risks_archive WHERE risk_id = ? AND account_id = ?",
+                    (risk_id, account_id),
+                )
+                removed += cursor.rowcount
+                cursor.execute(
+                    "DELETE FROM risks WHERE id = ? AND account_id = ? AND deleted_at IS NOT NULL",
+                    (risk_id, account_id),
+                )
+                removed += cursor.rowcount
+                if removed >= batch_size:
+                    return removed
+
+            cursor.execute(PURGE_UNATTRIBUTED_HISTORY_SQL, (batch_size - removed,))
+            return removed + cursor.rowcount
+
+        return self.run_in_transaction(work)
+
+    @staticmethod
+    def _discard_deleted_risks(cursor: sqlite3.Cursor, auth_account_id: int, ids: list[str]) -> None:
+        """
+        Drop tombstones (and their history) standing in the way of re-creating risks with the same ids.
+        """
+        for start in range(0, len(ids), 500):
+            batch = ids[start:start + 500]
+            placeholders = ', '.join('?' * len(batch))
+            cursor.execute(
+                f"SELECT id FROM risks WHERE account_id = ? AND deleted_at IS NOT NULL AND id IN ({placeholders})",
+                (auth_account_id, *batch),
+            )
+            deleted = [row[0] for row in cursor.fetchall()]
+            if not deleted:
+                continue
+            cursor.executemany(
+                "DELETE FROM history_log_risks WHERE change_set_id IN ("
+                "SELECT id FROM history_change_sets WHERE risk_id = ? AND account_id = ?)",
+                [(id_, auth_account_id) for id_ in deleted],
+            )
+            cursor.executemany(
+                "DELETE FROM history_log_risks_archive WHERE risk_id = ? AND account_id = ?",
+                [(id_, auth_account_id) for id_ in deleted],
+            )
+            cursor.executemany(
+                "DELETE FROM history_change_sets WHERE risk_id = ? AND account_id = ?",
+                [(id_, auth_account_id) for id_ in deleted],
+            )
+            cursor.executemany(
+                "DELETE FROM risks WHERE id = ? AND account_id = ?",
+                [(id_, auth_account_id) for id_ in deleted],
             )
-            """
-        )
 
-        risk_factors = [
-            (
-                1,
-                "Внешний",
-            ),
-            (
-                2,
-                "Внутренний",
-            ),
-        ]
-        self.cursor.executemany("INSERT INTO risk_factors (id, name) VALUES (?, ?)", risk_factors)
-
-        risk_types = [
-            (
-                1,
-                "Технический",
-            ),
-            (
-                2,
-                "Финансовый",
-            ),
-            (
-                3,
-                "Страховой",
-            ),
-            (
-                4,
-                "Организационный",
-            ),
-            (
-                5,
-                "Рыночный",
-            ),
-            (
-                6,
-                "Юридический",
-            ),
-            (
-                7,
-                "Социальный",
-            ),
-        ]
-        self.cursor.executemany("INSERT INTO risk_types (id, name) VALUES (?, ?)", risk_types)
-
-        risk_management_methods = [
-            (
-                1,
-                "Уклонение",
-            ),
-            (
-                2,
-                "Принятие",
-            ),
-            (
-                3,
-                "Ограничение",
-            ),
-            (
-                4,
-                "Обеспечение",
-            ),
-            (
-                5,
-                "Передача",
-            ),
+    def reserve_risk_ids(self, auth_account_id: int, count: int = 1) -> list[str]:
+        """
+        Atomically reserve `count` consecutive risk ids "<projectId>-<number>" of the account. Reserved ids are
+        never handed out again, whether or not a risk is created with them.
+        """
+        last_value, project_id = self.run_in_transaction(
+            lambda cursor: cursor.execute(RESERVE_RISK_IDS_SQL, (auth_account_id, count)).fetchone())
+        return [
+            f"{project_id}-{str(value).zfill(RISK_ID_DIGITS)}"
+            for value in range(last_value - count + 1, last_value + 1)
         ]
-        self.cursor.executemany(
-            "INSERT INTO risk_management_methods (id, name) VALUES (?, ?)",
-            risk_management_methods,
-        )
 
-        # self.connection.commit()
+    def get_risks_hydrated(
+            self,
+            auth_account_id: int,
+            limit: int,
+            offset: int = 0,
+            after: tuple[Any, str] | None = None,
+            sort: str = "-created_at",
+            filters: RiskFilters | None = None,
+    ) -> list[tuple]:
+        """
+        Same page as `get_risks`, with every dictionary id resolved to its name (and value) in one statement.
 
-    def delete_risk(self, risk_id: str, auth_account_id: int) -> None:
-        self.cursor.execute(
-            "DELETE FROM risks WHERE id = ? AND account_id = ?",
-            (risk_id, auth_account_id),
-        )
-        self.cursor.execute(
-            f"DELETE FROM history_log_risks WHERE risk_id = '{risk_id}'",
+        `sort` is a key of `RISK_SORT_KEYS`, prefixed with "-" for descending; ties are broken by id. `after` is
+        the (sort value, id) of the last risk of the previous page; when given, the page starts right after it
+        through the matching (account_id, key, id) index and `offset` is ignored.
+        """
+        descending = sort.startswith("-")
+        key = RISK_SORT_KEYS[sort.lstrip("-")]
+
+        conditions = ["r.account_id = ?", "r.deleted_at IS NULL"]
+        params: list[Any] = [auth_account_id]
+        if filters is not None:
+            filter_conditions, filter_params = filters.compile()
+            conditions += filter_conditions
+            params += filter_params
+        if after is not None:
+            condition, condition_params = keyset_condition(key, descending, *after)
+            conditions.append(condition)
+            params += condition_params
+
+        query = (
+            HYDRATED_RISK_SELECT
+            + f" WHERE {' AND '.join(conditions)}"
+            + f" ORDER BY {key.column} {'DESC' if descending else 'ASC'}, r.id LIMIT ?"
         )
-        # self.connection.commit()
+        params.append(limit)
+        if after is None:
+            query += " OFFSET ?"
+            params.append(offset)
+
+        return self.cursor.execute(query, params).fetchall()
+
+    def search_risks(
+            self,
+            auth_account_id: int,
+            query: str,
+            limit: int,
+            offset: int = 0,
+            after: tuple[float, str] | None = None,
+    ) -> list[tuple]:
+        """
+        Risks of the account matching the FTS5 `query`, best match first (bm25, name weighs most). Each row is a
+        `get_risks_hydrated` row followed by its rank and a highlighted snippet. The account is part of the match,
+        so only its own hits are ranked.
+
+        `after` is the (rank, id) of the last hit of the previous page; when given `offset` is ignored.
+        """
+        text_query = f"{SEARCH_TEXT_COLUMNS} : ({query})"
+        conditions = ["r.account_id = ?", "r.deleted_at IS NULL"]
+        params: list[Any] = [f'account_id : "{int(auth_account_id)}" AND {text_query}', auth_account_id]
+        if after is not None:
+            rank, risk_id = after
+            conditions.append("(h.rank > ? OR (h.rank = ? AND r.id > ?))")
+            params += [rank, rank, risk_id]
+
+        sql = f"""
+            WITH hits AS (
+                SELECT rowid, bm25(risks_fts, 10.0, 5.0, 1.0, 0.0) AS rank
+                FROM risks_fts
+                WHERE risks_fts MATCH ?
+            )
+            SELECT {HYDRATED_RISK_COLUMNS}, h.rank, r.rowid
+            {HYDRATED_RISK_FROM}
+            JOIN hits h ON h.rowid = r.rowid
+            WHERE {' AND '.join(conditions)}
+            ORDER BY h.rank, r.id
+            LIMIT ?
+        """
+        params.append(limit)
+        if after is None:
+            sql += " OFFSET ?"
+            params.append(offset)
+
+        rows = self.cursor.execute(sql, params).fetchall()
+        if not rows:
+            return rows
+
+        # snippets are built for the page only, not for every match
+        rowids = [row[-1] for row in rows]
+        snippets = dict(self.cursor.execute(
+            f"""
+            SELECT rowid, snippet(risks_fts, -1, '<mark>', '</mark>', '…', 16)
+            FROM risks_fts
+            WHERE risks_fts MATCH ? AND rowid IN ({', '.join('?' * len(rowids))})
+            """,
+            (text_query, *rowids),
+        ).fetchall())
+        return [(*row[:-1], snippets.get(row[-1])) for row in rows]
 
-    def get_project_id_by_account_id(self, auth_account_id: int) -> str:
-        return self.cursor.execute("SELECT projectId FROM accounts WHERE id = ?", (auth_account_id,)).fetchone()[0]
+    def rebuild_search_index(self) -> None:
+        """
+        Rebuild `risks_fts` from `risks`, e.g. after a VACUUM renumbered the rowids it is keyed on.
+        """
+        self.run_in_transaction(lambda cursor: cursor.execute("INSERT INTO risks_fts(risks_fts) VALUES ('rebuild')"))
 
-    def get_last_risk_id(self, auth_account_id: int) -> int:
-        id_ = self.cursor.execute(
-            "SELECT MAX(id) FROM risks WHERE account_id = ?",
+    def get_risk_matrix(self, auth_account_id: int, with_ids: bool = False) -> list[tuple]:
+        """
+        Risk count per (probability_id, impact_id) cell, plus a JSON array of the risk ids when `with_ids`.
+        Risks without a probability or impact come back in a cell with a NULL coordinate.
+        """
+        ids_column = ", json_group_array(id)" if with_ids else ""
+        return self.cursor.execute(
+            f"""
+            SELECT probability_id, impact_id, COUNT(*){ids_column}
+            FROM risks
+            WHERE account_id = ? AND deleted_at IS NULL
+            GROUP BY probability_id, impact_id
+            """,
             (auth_account_id,),
-        ).fetchone()[0]
-        if id_ is None:
-            return 0
-        return id_
+        ).fetchall()
+
+    def get_risks_revision(self, auth_account_id: int) -> int:
+        """
+        Counter bumped in the same transaction as every risk write that can change the risk matrix.
+        """
+        row = self.cursor.execute(
+            "SELECT revision FROM risk_revisions WHERE account_id = ?", (auth_account_id,)).fetchone()
+        return row[0] if row else 0
+
+    def get_risk_simulation_inputs(self, auth_account_id: int) -> list[tuple]:
+        """
+        (id, probability value, impact value) of every risk of the account that has both assessed.
+        """
+        return self.cursor.execute(
+            """
+            SELECT r.id, p.value, i.value
+            FROM risks r
+            JOIN probability p ON p.id = r.probability_id
+            JOIN impact i ON i.id = r.impact_id
+            WHERE r.account_id = ? AND r.deleted_at IS NULL
+            """,
+            (auth_account_id,),
+        ).fetchall()
 
-    def get_risks(self, auth_account_id: int, limit: int, offset: int) -> list[tuple]:
+    def get_risk_counts_by_status(self, auth_account_id: int) -> list[tuple]:
         return self.cursor.execute(
-            "SELECT id, name, description, comment, risk_factor_id, risk_type_id, risk_management_method_id, probability_id, impact_id, risk_status_id FROM risks WHERE account_id = ? ORDER BY created_at DESC LIMIT ? OFFSET ?",
-            (auth_account_id, limit, offset),
+            "SELECT risk_status_id, COUNT(*) FROM risks WHERE account_id = ? AND deleted_at IS NULL GROUP BY risk_status_id",
+            (auth_account_id,),
         ).fetchall()
 
-    def get_risk_by_id(self, auth_account_id: int, risk_id: str) -> tuple:
+    def get_risk_counts_by_type(self, auth_account_id: int) -> list[tuple]:
         return self.cursor.execute(
-            "SELECT id, name, description, comment, risk_factor_id, risk_type_id, risk_management_method_id, probability_id, impact_id, risk_status_id FROM risks WHERE account_id = ? AND id = ?",
+            "SELECT risk_type_id, COUNT(*) FROM risks WHERE account_id = ? AND deleted_at IS NULL GROUP BY risk_type_id",
+            (auth_account_id,),
+        ).fetchall()
+
+    def get_risk_hydrated_by_id(self, auth_account_id: int, risk_id: str) -> tuple | None:
+        return self.cursor.execute(
+            HYDRATED_RISK_SELECT + " WHERE r.account_id = ? AND r.id = ? AND r.deleted_at IS NULL",
             (auth_account_id, risk_id),
         ).fetchone()
 
+    def get_risks_hydrated_by_ids(self, auth_account_id: int, risk_ids: list[str]) -> list[tuple]:
+        """
+        Hydrated rows of the given risks, in the order of `risk_ids`; unknown ids are left out.
+        """
+        rows: dict[str, tuple] = {}
+        for start in range(0, len(risk_ids), 500):
+            batch = risk_ids[start:start + 500]
+            for row in self.cursor.execute(
+                    HYDRATED_RISK_SELECT + f" WHERE r.account_id = ? AND r.deleted_at IS NULL"
+                    f" AND r.id IN ({', '.join('?' * len(batch))})",
+                    (auth_account_id, *batch),
+            ).fetchall():
+                rows[row[0]] = row
+        return [rows[risk_id] for risk_id in risk_ids if risk_id in rows]
+
     def get_risk_created_at_by_id(self, auth_account_id: int, risk_id: str) -> tuple:
         return self.cursor.execute(
-            "SELECT created_at FROM risks WHERE account_id = ? AND id = ?",
+            "SELECT created_at FROM risks WHERE account_id = ? AND id = ? AND deleted_at IS NULL",
             (auth_account_id, risk_id),
         ).fetchone()
 
-    def get_risk_history_by_risk_id(self, risk_id: str, limit: int, offset: int) -> list[tuple]:
-        return self.cursor.execute(
-            "SELECT timestamp, updated_column_name, old_data, new_data FROM history_log_risks WHERE risk_id = ? ORDER BY id DESC LIMIT ? OFFSET ?",
-            (risk_id, limit, offset),
+    def get_risk_history_by_risk_id(
+            self, auth_account_id: int, risk_id: str, limit: int, offset: int = 0, before_id: int | None = None,
+    ) -> list[tuple]:
+        """
+        Newest-first history of a risk, read through its change sets. With `before_id` the page starts below that
+        history id and `offset` is ignored.
+
+        Archived entries are always older than the hot ones, so a page that runs out of hot entries continues
+        into the archive.
+        """
+        if before_id is None:
+            history = self.cursor.execute(
+                HOT_HISTORY_SELECT + " ORDER BY c.id DESC, h.id DESC LIMIT ? OFFSET ?",
+                (risk_id, auth_account_id, limit, offset),
+            ).fetchall()
+        else:
+            history = self.cursor.execute(
+                HOT_HISTORY_SELECT + " AND c.id <= ? AND h.id < ? ORDER BY c.id DESC, h.id DESC LIMIT ?",
+                (risk_id, auth_account_id, self._change_set_id_of(before_id), before_id, limit),
+            ).fetchall()
+        if len(history) == limit:
+            return history
+
+        skip = 0
+        if before_id is None and not history and offset:
+            skip = offset - self.cursor.execute(
+                "SELECT COUNT(*) FROM history_change_sets AS c JOIN history_log_risks AS h ON h.change_set_id = c.id"
+                " WHERE c.risk_id = ? AND c.account_id = ?",
+                (risk_id, auth_account_id),
+            ).fetchone()[0]
+        return history + self._get_archived_history(
+            auth_account_id=auth_account_id, risk_id=risk_id, limit=limit - len(history), skip=skip,
+            before_id=before_id,
+        )
+
+    def _change_set_id_of(self, history_id: int) -> int:
+        row = self.cursor.execute("SELECT change_set_id FROM history_log_risks WHERE id = ?", (history_id,)).fetchone()
+        # an archived (or unknown) entry is older than every hot one
+        return row[0] if row is not None and row[0] is not None else 0
+
+    def _get_archived_history(
+            self, auth_account_id: int, risk_id: str, limit: int, skip: int = 0, before_id: int | None = None,
+    ) -> list[tuple]:
+        """
+        Newest-first archived history below `before_id`, skipping the newest `skip` entries. Batches that are
+        skipped as a whole or lie past the page are never decompressed.
+        """
+        conditions = ["risk_id = ?", "account_id = ?"]
+        params: list[Any] = [risk_id, auth_account_id]
+        if before_id is not None:
+            conditions.append("min_history_id < ?")
+            params.append(before_id)
+        batches = self.cursor.execute(
+            f"SELECT id, row_count FROM history_log_risks_archive WHERE {' AND '.join(conditions)}"
+            f" ORDER BY max_history_id DESC",
+            params,
         ).fetchall()
 
+        history: list[tuple] = []
+        for batch_id, row_count in batches:
+            if len(history) >= limit:
+                break
+            if skip >= row_count:
+                skip -= row_count
+                continue
+            payload = self.cursor.execute(
+                "SELECT payload FROM history_log_risks_archive WHERE id = ?", (batch_id,)).fetchone()[0]
+            entries = [
+                entry[:5] for entry in reversed(decode_history_batch(payload))
+                if before_id is None or entry[4] < before_id
+            ]
+            history.extend(entries[skip:skip + limit - len(history)])
+            skip = 0
+        return history
+
+    def archive_history(
+            self,
+            batch_size: int = 1000,
+            max_age_days: int | None = 90,
+            keep_rows: int = 200,
+            chunk_rows: int = 256,
+    ) -> int:
+        """
+        Move up to `batch_size` cold history entries into the compressed archive. An entry is cold when it is
+        older than `max_age_days` or not among the newest `keep_rows` of its risk.
+
+        Cold entries are found by `_find_cold_history` with plain reads; the write transaction only moves the
+        chosen ids. Entries are appended to the risk's newest archive batch until it holds `chunk_rows`, then new
+        batches are started. Returns the number of moved entries; 0 means a full pass found nothing cold.
+        """
+        ids = self._find_cold_history(limit=batch_size, max_age_days=max_age_days, keep_rows=keep_rows)
+        if not ids:
+            return 0
+
+        def work(cursor: sqlite3.Cursor) -> int:
+            # entries purged since they were found are simply gone
+            rows: list[tuple] = []
+            for start in range(0, len(ids), 500):
+                batch = ids[start:start + 500]
+                cursor.execute(
+                    "SELECT account_id, risk_id, timestamp, updated_column_name, old_data, new_data, id,"
+                    f" prev_history_id FROM history_log_risks WHERE id IN ({', '.join('?' * len(batch))})",
+                    batch,
+                )
+                rows.extend(cursor.fetchall())
+            rows.sort(key=lambda row: row[6])
+
+            by_risk: dict[tuple[int, str], list[tuple]] = {}
+            for row in rows:
+                by_risk.setdefault((row[0], row[1]), []).append(row[2:])
+
+            for (account_id, risk_id), entries in by_risk.items():
+                last = cursor.execute(
+                    "SELECT id, row_count, payload FROM history_log_risks_archive"
+                    " WHERE risk_id = ? AND account_id = ? ORDER BY max_history_id DESC LIMIT 1",
+                    (risk_id, account_id),
+                ).fetchone()
+                if last is not None and last[1] < chunk_rows:
+                    merged = decode_history_batch(last[2]) + entries[:chunk_rows - last[1]]
+                    entries = entries[chunk_rows - last[1]:]
+                    cursor.execute(
+                        "UPDATE history_log_risks_archive SET max_history_id = ?, row_count = ?, payload = ?"
+                        " WHERE id = ?",
+                        (merged[-1][4], len(merged), encode_history_batch(merged), last[0]),
+                    )
+
+                chunks = [entries[start:start + chunk_rows] for start in range(0, len(entries), chunk_rows)]
+                cursor.executemany(
+                    "INSERT INTO history_log_risks_archive"
+                    " (account_id, risk_id, min_history_id, max_history_id, row_count, payload)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    [
+                        (account_id, risk_id, chunk[0][4], chunk[-1][4], len(chunk), encode_history_batch(chunk))
+                        for chunk in chunks
+                    ],
+                )
+
+            cursor.executemany("DELETE FROM history_log_risks WHERE id = ?", [(row[6],) for row in rows])
+            return len(rows)
+
+        return self.run_in_transaction(work)
+
+    def _find_cold_history(self, limit: int, max_age_days: int | None, keep_rows: int) -> list[int]:
+        """
+        Ids of up to `limit` cold history entries, looked up risk by risk through the change set index and
+        resuming after the risk where the previous call stopped. Every risk gives its oldest cold entries first,
+        so archived ids always stay below the risk's hot ones. Only reads, no write lock is taken.
+        """
+        age = f"-{max_age_days} days" if max_age_days is not None else None
+        ids: list[int] = []
+        while len(ids) < limit:
+            risks = self.cursor.execute(
+                "SELECT rowid, id, account_id FROM risks WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                (self._cold_history_after_rowid, COLD_HISTORY_SCAN_RISKS),
+            ).fetchall()
+            if not risks:
+                self._cold_history_after_rowid = 0
+                break
+
+            for rowid, risk_id, account_id in risks:
+                threshold = self.cursor.execute(
+                    COLD_HISTORY_THRESHOLD_SQL, (risk_id, account_id, keep_rows - 1)).fetchone() if keep_rows else None
+                budget = limit - len(ids)
+                cold = [row[0] for row in self.cursor.execute(
+                    COLD_HISTORY_SQL,
+                    (risk_id, account_id, threshold[0] if threshold else None, age, budget + 1),
+                ).fetchall()]
+                ids.extend(cold[:budget])
+                if len(cold) > budget:
+                    # the rest of this risk goes with the next call
+                    return ids
+                self._cold_history_after_rowid = rowid
+                if len(ids) == limit:
+                    return ids
+        return ids
+
     def update_risk_by_request_model(self, auth_account_id: int, request_model: RequestRiskUpdate) -> None:
-        attributes = {
-            'name': request_model.name,
-            'description': request_model.description,
-            'comment': request_model.comment,
-            'risk_factor_id': request_model.factor_id,
-            'risk_type_id': request_model.type_id,
-            'risk_management_method_id': request_model.method_id,
-            'probability_id': request_model.probability_id,
-            'impact_id': request_model.impact_id,
-            'risk_status_id': request_model.status_id
-        }
+        self.update_risks(auth_account_id=auth_account_id, request_models=[request_model])
 
-        query = "UPDATE risks SET "
-        _params = []
+    def update_risks(self, auth_account_id: int, request_models: list[RequestRiskUpdate]) -> list[str]:
+        """
+        Apply many partial updates in one transaction. Updates that change the same set of columns share one
+        `executemany`, so the history triggers fire per row as usual. Each risk id may appear once.
 
-        for attr, value in attributes.items():
-            if value is not None:
-                query += f"{attr} = ?, "
-                _params.append(value)
+        Returns the ids that do not exist for the account; those are skipped.
+        """
+        groups: dict[tuple[str, ...], list[tuple]] = {}
+        for request_model in request_models:
+            attributes = {
+                'name': request_model.name,
+                'description': request_model.description,
+                'comment': request_model.comment,
+                'risk_factor_id': request_model.factor_id,
+                'risk_type_id': request_model.type_id,
+                'risk_management_method_id': request_model.method_id,
+                'probability_id': request_model.probability_id,
+                'impact_id': request_model.impact_id,
+                'risk_status_id': request_model.status_id
+            }
+            columns = tuple(attr for attr, value in attributes.items() if value is not None)
+            groups.setdefault(columns, []).append(
+                (*(attributes[column] for column in columns), auth_account_id, request_model.id))
+
+        def work(cursor: sqlite3.Cursor) -> list[str]:
+            ids = [request_model.id for request_model in request_models]
+            existing = self._existing_risk_ids(cursor, auth_account_id, ids)
+
+            for columns, rows in groups.items():
+                rows = [row for row in rows if row[-1] in existing]
+                if not rows:
+                    continue
+                assignments = "".join(f"{column} = ?, " for column in columns)
+                cursor.executemany(
+                    f"UPDATE risks SET {assignments}updated_at = CURRENT_TIMESTAMP WHERE account_id = ? AND id = ?",
+                    rows,
+                )
+                if "probability_id" in columns or "impact_id" in columns:
+                    cursor.executemany(
+                        f"UPDATE risks SET score = {SCORE_FROM_COLUMNS_SQL} WHERE account_id = ? AND id = ?",
+                        [row[-2:] for row in rows],
+                    )
+            return [id_ for id_ in ids if id_ not in existing]
+
+        missing_ids = self.run_in_transaction(work)
+        self.notify_risks_changed(auth_account_id)
+        return missing_ids
+
+    @staticmethod
+    def _existing_risk_ids(cursor: sqlite3.Cursor, auth_account_id: int, ids: list[str]) -> set[str]:
+        existing: set[str] = set()
+        for start in range(0, len(ids), 500):
+            batch = ids[start:start + 500]
+            cursor.execute(
+                f"SELECT id FROM risks WHERE account_id = ? AND deleted_at IS NULL"
+                f" AND id IN ({', '.join('?' * len(batch))})",
+                (auth_account_id, *batch),
+            )
+            existing.update(row[0] for row in cursor.fetchall())
+        return existing
+
+    def recompute_scores(self, chunk_size: int = 10_000) -> int:
+        """
+        Recompute the exposure score of every risk from the current probability and impact scales, vectorized
+        with NumPy, and write back only the scores that changed. Returns the number of updated risks.
+        """
+        probability_values = {row[0]: row[2] for row in self.get_risk_probabilities()}
+        impact_values = {row[0]: row[2] for row in self.get_risk_impacts()}
+        rows = self.cursor.execute("SELECT rowid, probability_id, impact_id, score FROM risks").fetchall()
+        if not rows:
+            return 0
+
+        rowids, probability_ids, impact_ids, old_scores = zip(*rows)
+        scores = compute_scores(list(probability_ids), list(impact_ids), probability_values, impact_values)
+
+        changes = []
+        for rowid, old_score, score in zip(rowids, old_scores, scores.tolist()):
+            score = None if math.isnan(score) else score
+            if score != old_score:
+                changes.append((score, rowid))
 
-        query = query.rstrip(', ')  # remove trailing comma and space
-        query += " WHERE account_id = ? AND id = ?"
-        _params += [auth_account_id, request_model.id]
+        for start in range(0, len(changes), chunk_size):
+            chunk = changes[start:start + chunk_size]
+            self.run_in_transaction(lambda cursor: cursor.executemany(
+                "UPDATE risks SET score = ? WHERE rowid = ?", chunk))
 
-        self.cursor.execute(query, tuple(_params))
-        # self.connection.commit()
+        if changes:
+            self.logger.info(f"Recomputed {len(changes)} risk scores")
+        return len(changes)
 
     def get_risk_types(self) -> list[tuple]:
         return self.cursor.execute("SELECT * FROM risk_types").fetchall()
@@ -608,34 +908,95 @@ class Database:
 
     def risk_id_exists(self, risk_id: str, auth_account_id: int) -> bool:
         self.cursor.execute(
-            "SELECT id FROM risks WHERE id = ? AND account_id = ?",
+            "SELECT id FROM risks WHERE id = ? AND account_id = ? AND deleted_at IS NULL",
             (risk_id, auth_account_id),
         )
         return self.cursor.fetchone() is not None
 
-    def create_risk(self, request_model: RequestRisk, auth_account_id: int) -> tuple:
-        self.cursor.execute(
-            """
-            INSERT INTO risks (
-                id, account_id, name, comment, risk_factor_id, risk_type_id, risk_management_method_id, probability_id, impact_id, description, risk_status_id
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                request_model.id,
-                auth_account_id,
-                request_model.name,
-                request_model.comment,
-                request_model.factor_id,
-                request_model.type_id,
-                request_model.method_id,
-                request_model.probability_id,
-                request_model.impact_id,
-                request_model.description,
-                request_model.status_id
-            ),
-        )
-        # self.connection.commit()
-        return self.cursor.lastrowid
+    def create_risk(self, request_model: RequestRisk, auth_account_id: int) -> int | None:
+        """
+        Insert a risk and return its rowid, or None when the account already has a risk with this id.
+        """
+        def work(cursor: sqlite3.Cursor) -> int | None:
+            self._discard_deleted_risks(cursor, auth_account_id, [request_model.id])
+            cursor.execute(
+                f"""
+                INSERT INTO risks (
+                    id, account_id, name, comment, risk_factor_id, risk_type_id, risk_management_method_id, probability_id, impact_id, description, risk_status_id, score
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, {SCORE_FROM_PARAMS_SQL})
+                ON CONFLICT(id, account_id) DO NOTHING
+                """,
+                (
+                    request_model.id,
+                    auth_account_id,
+                    request_model.name,
+                    request_model.comment,
+                    request_model.factor_id,
+                    request_model.type_id,
+                    request_model.method_id,
+                    request_model.probability_id,
+                    request_model.impact_id,
+                    request_model.description,
+                    request_model.status_id,
+                    request_model.probability_id,
+                    request_model.impact_id,
+                ),
+            )
+            if not cursor.rowcount:
+                return None
+            rowid = cursor.lastrowid
+            cursor.execute(ADVANCE_RISK_ID_SEQUENCE_SQL, (request_model.id, auth_account_id))
+            return rowid
+
+        rowid = self.run_in_transaction(work)
+        if rowid is not None:
+            self.notify_risks_changed(auth_account_id)
+        return rowid
+
+    def create_risks(self, request_models: list[RequestRisk], auth_account_id: int) -> list[str]:
+        """
+        Insert a chunk of risks in one transaction with a single `executemany`.
+
+        Risks whose id already exists for the account are left untouched; their ids are returned.
+        """
+        def work(cursor: sqlite3.Cursor) -> list[str]:
+            ids = [request_model.id for request_model in request_models]
+            existing = self._existing_risk_ids(cursor, auth_account_id, ids)
+            self._discard_deleted_risks(cursor, auth_account_id, [id_ for id_ in ids if id_ not in existing])
+
+            cursor.executemany(
+                f"""
+                INSERT INTO risks (
+                    id, account_id, name, comment, risk_factor_id, risk_type_id, risk_management_method_id, probability_id, impact_id, description, risk_status_id, score
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, {SCORE_FROM_PARAMS_SQL})
+                """,
+                [
+                    (
+                        request_model.id,
+                        auth_account_id,
+                        request_model.name,
+                        request_model.comment,
+                        request_model.factor_id,
+                        request_model.type_id,
+                        request_model.method_id,
+                        request_model.probability_id,
+                        request_model.impact_id,
+                        request_model.description,
+                        request_model.status_id,
+                        request_model.probability_id,
+                        request_model.impact_id,
+                    )
+                    for request_model in request_models
+                    if request_model.id not in existing
+                ],
+            )
+            cursor.executemany(
+                ADVANCE_RISK_ID_SEQUENCE_SQL, [(id_, auth_account_id) for id_ in ids if id_ not in existing])
+            return [id_ for id_ in ids if id_ in existing]
+
+        existing_ids = self.run_in_transaction(work)
+        self.notify_risks_changed(auth_account_id)
+        return existing_ids
 
     def create_account(
             self,
@@ -662,24 +1023,24 @@ class Database:
         if project_name is None or project_name == "":
             raise ValueError("Project name cannot be None or empty")
 
-        try:
-            self.cursor.execute(
+        def work(cursor: sqlite3.Cursor) -> int:
+            cursor.execute(
                 """
                 INSERT INTO accounts (email, password, name, projectName, projectId, description)
                 VALUES (?, ?, ?, ?, ?, ?)
             """,
                 (email, password, name, project_name, project_id, description),
             )
-            # # self.connection.commit()
-            return self.cursor.lastrowid
+            return cursor.lastrowid
+
+        try:
+            return self.run_in_transaction(work)
 
         except sqlite3.Error as e:
             self.logger.error(f"Error creating account: {e}")
-            self.connection.rollback()
             raise RuntimeError(f"Error creating account: {e}") from e
         except Exception as e:
             self.logger.error(f"Unexpected error creating account: {e}")
-            self.connection.rollback()
             raise RuntimeError(f"Unexpected error creating account: {e}") from e
 
     def update_account(
@@ -709,38 +1070,37 @@ class Database:
         values = [value for value in updates.values() if value is not None]
         values.append(account_id)
 
-        self.cursor.execute(sql, values)
-        # self.connection.commit()
+        self.run_in_transaction(lambda cursor: cursor.execute(sql, values))
 
     def update_account_password(self, account_id: int, password: str) -> None:
-        self.cursor.execute(
+        self.run_in_transaction(lambda cursor: cursor.execute(
             """
             UPDATE accounts
             SET password = ?
             WHERE id = ?
         """,
             (password, account_id),
-        )
-        # self.connection.commit()
+        ))
 
     def update_password(self, account_id: int, new_password: str) -> None:
-        self.cursor.execute(
+        self.run_in_transaction(lambda cursor: cursor.execute(
             """
             UPDATE accounts
             SET password = ?
             WHERE id = ?
         """,
             (new_password, account_id),
-        )
-        # self.connection.commit()
+        ))
 
     def close_connection(self) -> None:
-        if self.connection is None:
+        if self._pool is None:
             self.logger.error("Database connection has already been closed or never existed.")
             raise RuntimeError("Database connection has already been closed or never existed.")
 
         try:
-            self.connection.close()
+            if self._group_committer is not None:
+                self._group_committer.close()
+            self._pool.close()
         except Exception as e:
             self.logger.error(f"Unexpected error closing database connection: {e}")
             raise RuntimeError(f"Unexpected error closing database connection: {e}") from e
@@ -0,0 +1,107 @@
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import AbstractContextManager
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+Work = Callable[[sqlite3.Cursor], Any]
+
+
+@dataclass
+class _Job:
+    work: Work
+    future: Future = field(default_factory=Future)
+
+
+class GroupCommitter:
+    """
+    Coalesces write units of work from concurrent callers into shared commits.
+
+    A single writer thread takes the first pending unit, keeps collecting units for up to `window` seconds (or
+    until `max_batch` are queued), runs each one inside its own savepoint and commits them all at once. A failing
+    unit is rolled back to its savepoint and only its caller sees the error; callers are released only after the
+    commit that contains their writes succeeded.
+    """
+
+    def __init__(
+            self,
+            transaction: Callable[[], AbstractContextManager[sqlite3.Cursor]],
+            logger: logging.Logger,
+            window: float = 0.002,
+            max_batch: int = 64,
+    ) -> None:
+        self._transaction = transaction
+        self.logger = logger
+        self.window = window
+        self.max_batch = max_batch
+
+        self._queue: queue.Queue[_Job | None] = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="db-group-commit", daemon=True)
+        self._thread.start()
+
+    @property
+    def thread(self) -> threading.Thread:
+        return self._thread
+
+    def submit(self, work: Work) -> Any:
+        if not self._thread.is_alive():
+            raise RuntimeError("Group committer is stopped")
+        job = _Job(work=work)
+        self._queue.put(job)
+        return job.future.result()
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            job = self._queue.get()
+            if job is None:
+                break
+
+            batch = [job]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                try:
+                    job = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if job is None:
+                    stopping = True
+                    break
+                batch.append(job)
+
+            self._commit(batch)
+
+    def _commit(self, batch: list[_Job]) -> None:
+        outcomes: list[tuple[_Job, Any, BaseException | None]] = []
+        try:
+            with self._transaction() as cursor:
+                for job in batch:
+                    cursor.execute("SAVEPOINT unit_of_work")
+                    try:
+                        result = job.work(cursor)
+                    except Exception as e:
+                        cursor.execute("ROLLBACK TO unit_of_work")
+                        cursor.execute("RELEASE unit_of_work")
+                        outcomes.append((job, None, e))
+                    else:
+                        cursor.execute("RELEASE unit_of_work")
+                        outcomes.append((job, result, None))
+        except Exception as e:
+            self.logger.error(f"Group commit of {len(batch)} units failed: {e}")
+            for job in batch:
+                job.future.set_exception(e)
+            return
+
+        for job, result, error in outcomes:
+            if error is None:
+                job.future.set_result(result)
+            else:
+                job.future.set_exception(error)
@@ -0,0 +1,32 @@
+import json
+import zlib
+
+# id of the `keep_rows`-th newest entry of a risk, through its change sets; older entries are cold
+COLD_HISTORY_THRESHOLD_SQL = """
+    SELECT h.id FROM history_change_sets c JOIN history_log_risks h ON h.change_set_id = c.id
+    WHERE c.risk_id = ? AND c.account_id = ?
+    ORDER BY c.id DESC, h.id DESC LIMIT 1 OFFSET ?
+"""
+# cold entries of a risk, oldest first: below the threshold id or older than the age modifier
+COLD_HISTORY_SQL = """
+    SELECT h.id FROM history_change_sets c JOIN history_log_risks h ON h.change_set_id = c.id
+    WHERE c.risk_id = ? AND c.account_id = ? AND (h.id < ? OR h.timestamp < datetime('now', ?))
+    ORDER BY c.id, h.id LIMIT ?
+"""
+# risks looked at per read while searching for cold history
+COLD_HISTORY_SCAN_RISKS = 500
+
+COMPRESSION_LEVEL = 6
+
+
+def encode_history_batch(entries: list[tuple]) -> bytes:
+    """
+    Compress history entries `(timestamp, updated_column_name, old_data, new_data, id, prev_history_id)` of one
+    risk, oldest first, into an archive payload.
+    """
+    return zlib.compress(
+        json.dumps(entries, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), COMPRESSION_LEVEL)
+
+
+def decode_history_batch(payload: bytes) -> list[tuple]:
+    return [tuple(entry) for entry in json.loads(zlib.decompress(payload).decode("utf-8"))]
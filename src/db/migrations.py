@@ -0,0 +1,806 @@
+import logging
+import re
+import sqlite3
+from dataclasses import dataclass, field
+
+
+@dataclass(frozen=True)
+class Seed:
+    """
+    Reference rows kept in sync with an upsert, so re-running a seed never duplicates or drops rows.
+    """
+    table: str
+    columns: tuple[str, ...]
+    rows: tuple[tuple, ...]
+
+    @property
+    def statement(self) -> str:
+        placeholders = ", ".join("?" for _ in self.columns)
+        updates = ", ".join(f"{column} = excluded.{column}" for column in self.columns if column != "id")
+        return (
+            f"INSERT INTO {self.table} ({', '.join(self.columns)}) VALUES ({placeholders}) "
+            f"ON CONFLICT(id) DO UPDATE SET {updates}"
+        )
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    statements: tuple[str, ...] = ()
+    seeds: tuple[Seed, ...] = field(default_factory=tuple)
+
+
+DICTIONARY_SEEDS = (
+    Seed(
+        table="probability",
+        columns=("id", "name", "value"),
+        rows=(
+            (1, "Низкая", 0.2),
+            (2, "Ниже среднего", 0.4),
+            (3, "Средняя", 0.6),
+            (4, "Выше среднего", 0.8),
+            (5, "Высокая", 1),
+        ),
+    ),
+    Seed(
+        table="impact",
+        columns=("id", "name", "value"),
+        rows=(
+            (1, "Незначительное", 0.2),
+            (2, "Минимальное", 0.4),
+            (3, "Среднее", 0.6),
+            (4, "Высокое", 0.8),
+            (5, "Критичное", 1),
+        ),
+    ),
+    Seed(
+        table="risk_status",
+        columns=("id", "name"),
+        rows=(
+            (1, "Открыто"),
+            (2, "Выполняется"),
+            (3, "Закрыто"),
+        ),
+    ),
+    Seed(
+        table="risk_factors",
+        columns=("id", "name"),
+        rows=(
+            (1, "Внешний"),
+            (2, "Внутренний"),
+        ),
+    ),
+    Seed(
+        table="risk_types",
+        columns=("id", "name"),
+        rows=(
+            (1, "Технический"),
+            (2, "Финансовый"),
+            (3, "Страховой"),
+            (4, "Организационный"),
+            (5, "Рыночный"),
+            (6, "Юридический"),
+            (7, "Социальный"),
+        ),
+    ),
+    Seed(
+        table="risk_management_methods",
+        columns=("id", "name"),
+        rows=(
+            (1, "Уклонение"),
+            (2, "Принятие"),
+            (3, "Ограничение"),
+            (4, "Обеспечение"),
+            (5, "Передача"),
+        ),
+    ),
+)
+
+TRACK_CHANGES_TRIGGERS = (
+    """
+        CREATE TRIGGER IF NOT EXISTS track_name_changes
+        AFTER UPDATE OF name ON risks
+        FOR EACH ROW
+        BEGIN
+            INSERT INTO history_log_risks (risk_id, updated_column_name, old_data, new_data, timestamp, prev_history_id)
+            VALUES (OLD.id, 'название', OLD.name, NEW.name, CURRENT_TIMESTAMP, (SELECT id FROM history_log_risks WHERE risk_id = OLD.id ORDER BY id DESC LIMIT 1));
+        END;
+    """,
+    """
+        CREATE TRIGGER IF NOT EXISTS track_description_changes
+        AFTER UPDATE OF description ON risks
+        FOR EACH ROW
+        BEGIN
+            INSERT INTO history_log_risks (risk_id, updated_column_name, old_data, new_data, timestamp, prev_history_id)
+            VALUES (OLD.id, 'описание', OLD.description, NEW.description, CURRENT_TIMESTAMP, (SELECT id FROM history_log_risks WHERE risk_id = OLD.id ORDER BY id DESC LIMIT 1));
+        END;
+    """,
+    """
+        CREATE TRIGGER IF NOT EXISTS track_comment_changes
+        AFTER UPDATE OF comment ON risks
+        FOR EACH ROW
+        BEGIN
+            INSERT INTO history_log_risks (risk_id, updated_column_name, old_data, new_data, timestamp, prev_history_id)
+            VALUES (OLD.id, 'комментарий', OLD.comment, NEW.comment, CURRENT_TIMESTAMP, (SELECT id FROM history_log_risks WHERE risk_id = OLD.id ORDER BY id DESC LIMIT 1));
+        END;
+    """,
+    """
+        CREATE TRIGGER IF NOT EXISTS track_risk_factor_id_changes
+        AFTER UPDATE OF risk_factor_id ON risks
+        FOR EACH ROW
+        WHEN OLD.risk_factor_id != NEW.risk_factor_id
+        BEGIN
+            INSERT INTO history_log_risks (risk_id, updated_column_name, old_data, new_data, timestamp, prev_history_id)
+            VALUES (OLD.id, 'фактор', (SELECT name FROM risk_factors WHERE id = OLD.risk_factor_id), (SELECT name FROM risk_factors WHERE id = NEW.risk_factor_id), CURRENT_TIMESTAMP, (SELECT id FROM history_log_risks WHERE risk_id = OLD.id ORDER BY id DESC LIMIT 1));
+        END;
+    """,
+    """
+        CREATE TRIGGER IF NOT EXISTS track_risk_type_id_changes
+        AFTER UPDATE OF risk_type_id ON risks
+        FOR EACH ROW
+        WHEN OLD.risk_type_id != NEW.risk_type_id
+        BEGIN
+            INSERT INTO history_log_risks (risk_id, updated_column_name, old_data, new_data, timestamp, prev_history_id)
+            VALUES (OLD.id, 'вид риска', (SELECT name FROM risk_types WHERE id = OLD.risk_type_id), (SELECT name FROM risk_types WHERE id = NEW.risk_type_id), CURRENT_TIMESTAMP, (SELECT id FROM history_log_risks WHERE risk_id = OLD.id ORDER BY id DESC LIMIT 1));
+        END;
+    """,
+    """
+        CREATE TRIGGER IF NOT EXISTS track_risk_management_method_id_changes
+        AFTER UPDATE OF risk_management_method_id ON risks
+        FOR EACH ROW
+        WHEN OLD.risk_management_method_id != NEW.risk_management_method_id
+        BEGIN
+            INSERT INTO history_log_risks (risk_id, updated_column_name, old_data, new_data, timestamp, prev_history_id)
+            VALUES (OLD.id, 'метод управления', (SELECT name FROM risk_management_methods WHERE id = OLD.risk_management_method_id), (SELECT name FROM risk_management_methods WHERE id = NEW.risk_management_method_id), CURRENT_TIMESTAMP, (SELECT id FROM history_log_risks WHERE risk_id = OLD.id ORDER BY id DESC LIMIT 1));
+        END;
+    """,
+    """
+        CREATE TRIGGER IF NOT EXISTS track_risk_status_id_changes
+        AFTER UPDATE OF risk_status_id ON risks
+        FOR EACH ROW
+        WHEN OLD.risk_status_id != NEW.risk_status_id
+        BEGIN
+            INSERT INTO history_log_risks (risk_id, updated_column_name, old_data, new_data, timestamp, prev_history_id)
+            VALUES (OLD.id, 'статус', (SELECT name FROM risk_status WHERE id = OLD.risk_status_id), (SELECT name FROM risk_status WHERE id = NEW.risk_status_id), CURRENT_TIMESTAMP, (SELECT id FROM history_log_risks WHERE risk_id = OLD.id ORDER BY id DESC LIMIT 1));
+        END;
+    """,
+    """
+        CREATE TRIGGER IF NOT EXISTS track_probability_id_changes
+        AFTER UPDATE OF probability_id ON risks
+        FOR EACH ROW
+        WHEN OLD.probability_id != NEW.probability_id
+        BEGIN
+            INSERT INTO history_log_risks (risk_id, updated_column_name, old_data, new_data, timestamp, prev_history_id)
+            VALUES (OLD.id, 'вероятность', (SELECT name FROM probability WHERE id = OLD.probability_id), (SELECT name FROM probability WHERE id = NEW.probability_id), CURRENT_TIMESTAMP, (SELECT id FROM history_log_risks WHERE risk_id = OLD.id ORDER BY id DESC LIMIT 1));
+        END;
+    """,
+    """
+        CREATE TRIGGER IF NOT EXISTS track_impact_id_changes
+        AFTER UPDATE OF impact_id ON risks
+        FOR EACH ROW
+        WHEN OLD.impact_id != NEW.impact_id
+        BEGIN
+            INSERT INTO history_log_risks (risk_id, updated_column_name, old_data, new_data, timestamp, prev_history_id)
+            VALUES (OLD.id, 'влияние', (SELECT name FROM impact WHERE id = OLD.impact_id), (SELECT name FROM impact WHERE id = NEW.impact_id), CURRENT_TIMESTAMP, (SELECT id FROM history_log_risks WHERE risk_id = OLD.id ORDER BY id DESC LIMIT 1));
+        END;
+    """,
+)
+
+
+def _scoped_to_account(trigger: str) -> str:
+    """
+    Variant of a change-tracking trigger that records the risk's account, so risks sharing an id in different
+    accounts keep separate history chains.
+    """
+    return (
+        trigger
+        .replace("INSERT INTO history_log_risks (risk_id,", "INSERT INTO history_log_risks (account_id, risk_id,")
+        .replace("VALUES (OLD.id,", "VALUES (OLD.account_id, OLD.id,")
+        .replace(
+            "WHERE risk_id = OLD.id ORDER BY",
+            "WHERE risk_id = OLD.id AND account_id = OLD.account_id ORDER BY",
+        )
+    )
+
+
+TRACK_CHANGES_TRIGGER_NAMES = tuple(
+    re.search(r"CREATE TRIGGER IF NOT EXISTS (\w+)", trigger).group(1) for trigger in TRACK_CHANGES_TRIGGERS
+)
+ACCOUNT_SCOPED_TRACK_CHANGES_TRIGGERS = tuple(_scoped_to_account(trigger) for trigger in TRACK_CHANGES_TRIGGERS)
+
+# one change set per updated risk row: a parent row in history_change_sets chained through risks.last_change_set_id,
+# plus one history_log_risks row per changed column
+TRACK_CHANGE_SETS_TRIGGER = """
+    CREATE TRIGGER IF NOT EXISTS track_risk_changes
+    AFTER UPDATE OF name, description, comment, risk_factor_id, risk_type_id, risk_management_method_id,
+                    risk_status_id, probability_id, impact_id ON risks
+    FOR EACH ROW
+    WHEN OLD.name IS NOT NEW.name
+        OR OLD.description IS NOT NEW.description
+        OR OLD.comment IS NOT NEW.comment
+        OR OLD.risk_factor_id != NEW.risk_factor_id
+        OR OLD.risk_type_id != NEW.risk_type_id
+        OR OLD.risk_management_method_id != NEW.risk_management_method_id
+        OR OLD.risk_status_id != NEW.risk_status_id
+        OR OLD.probability_id != NEW.probability_id
+        OR OLD.impact_id != NEW.impact_id
+    BEGIN
+        INSERT INTO history_change_sets (account_id, risk_id, prev_change_set_id, timestamp)
+        VALUES (OLD.account_id, OLD.id, OLD.last_change_set_id, CURRENT_TIMESTAMP);
+        UPDATE risks SET last_change_set_id = last_insert_rowid() WHERE rowid = NEW.rowid;
+        INSERT INTO history_log_risks (change_set_id, account_id, risk_id, updated_column_name, old_data, new_data, timestamp)
+        SELECT (SELECT last_change_set_id FROM risks WHERE rowid = NEW.rowid), OLD.account_id, OLD.id, column_name, old_data, new_data, CURRENT_TIMESTAMP
+        FROM (
+            SELECT 'название' AS column_name, OLD.name AS old_data, NEW.name AS new_data WHERE OLD.name IS NOT NEW.name
+            UNION ALL
+            SELECT 'описание', OLD.description, NEW.description WHERE OLD.description IS NOT NEW.description
+            UNION ALL
+            SELECT 'комментарий', OLD.comment, NEW.comment WHERE OLD.comment IS NOT NEW.comment
+            UNION ALL
+            SELECT 'фактор', (SELECT name FROM risk_factors WHERE id = OLD.risk_factor_id), (SELECT name FROM risk_factors WHERE id = NEW.risk_factor_id) WHERE OLD.risk_factor_id != NEW.risk_factor_id
+            UNION ALL
+            SELECT 'вид риска', (SELECT name FROM risk_types WHERE id = OLD.risk_type_id), (SELECT name FROM risk_types WHERE id = NEW.risk_type_id) WHERE OLD.risk_type_id != NEW.risk_type_id
+            UNION ALL
+            SELECT 'метод управления', (SELECT name FROM risk_management_methods WHERE id = OLD.risk_management_method_id), (SELECT name FROM risk_management_methods WHERE id = NEW.risk_management_method_id) WHERE OLD.risk_management_method_id != NEW.risk_management_method_id
+            UNION ALL
+            SELECT 'статус', (SELECT name FROM risk_status WHERE id = OLD.risk_status_id), (SELECT name FROM risk_status WHERE id = NEW.risk_status_id) WHERE OLD.risk_status_id != NEW.risk_status_id
+            UNION ALL
+            SELECT 'вероятность', (SELECT name FROM probability WHERE id = OLD.probability_id), (SELECT name FROM probability WHERE id = NEW.probability_id) WHERE OLD.probability_id != NEW.probability_id
+            UNION ALL
+            SELECT 'влияние', (SELECT name FROM impact WHERE id = OLD.impact_id), (SELECT name FROM impact WHERE id = NEW.impact_id) WHERE OLD.impact_id != NEW.impact_id
+        );
+    END;
+"""
+
+# listing, matrix and breakdown indexes only ever serve live rows once risks can be tombstoned
+LIVE_RISK_INDEXES = (
+    ("idx_risks_account_created_at", "account_id, created_at DESC, id"),
+    ("idx_risks_account_matrix", "account_id, probability_id, impact_id, id"),
+    ("idx_risks_account_status_created_at", "account_id, risk_status_id, created_at DESC, id"),
+    ("idx_risks_account_type_created_at", "account_id, risk_type_id, created_at DESC, id"),
+    ("idx_risks_account_score", "account_id, score DESC, id"),
+    ("idx_risks_account_updated_at", "account_id, updated_at DESC, id"),
+    ("idx_risks_account_name", "account_id, name, id"),
+)
+
+MIGRATIONS: tuple[Migration, ...] = (
+    Migration(
+        version=1,
+        description="base schema and dictionaries",
+        statements=(
+            """
+            CREATE TABLE IF NOT EXISTS probability (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                value FLOAT NOT NULL
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS impact (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                value FLOAT NOT NULL
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS risk_status (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS risk_factors (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS risk_types (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS risk_management_methods (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS accounts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                email TEXT UNIQUE NOT NULL,
+                password TEXT NOT NULL,
+                name TEXT NOT NULL,
+                projectName TEXT NOT NULL,
+                projectId TEXT NOT NULL,
+                description TEXT
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS risks (
+                id string NOT NULL,
+                created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                name TEXT NOT NULL,
+                account_id INTEGER NOT NULL,
+                description TEXT,
+                comment TEXT,
+                risk_factor_id INTEGER NOT NULL,
+                risk_type_id INTEGER NOT NULL,
+                risk_management_method_id INTEGER NOT NULL,
+                risk_status_id INTEGER NOT NULL DEFAULT 1,
+                probability_id INTEGER,
+                impact_id INTEGER,
+                FOREIGN KEY (account_id) REFERENCES accounts(id),
+                FOREIGN KEY (risk_factor_id) REFERENCES risk_factors(id),
+                FOREIGN KEY (risk_type_id) REFERENCES risk_types(id),
+                FOREIGN KEY (risk_management_method_id) REFERENCES risk_management_methods(id),
+                FOREIGN KEY (risk_status_id) REFERENCES risk_status(id),
+                FOREIGN KEY (probability_id) REFERENCES probability(id),
+                FOREIGN KEY (impact_id) REFERENCES impact(id),
+                PRIMARY KEY (id, account_id)
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS history_log_risks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                risk_id string NOT NULL,
+                prev_history_id INTEGER,
+                updated_column_name TEXT NOT NULL,
+                old_data TEXT,
+                new_data TEXT NOT NULL,
+                timestamp DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (risk_id) REFERENCES risks(id),
+                FOREIGN KEY (prev_history_id) REFERENCES history_log_risks(id)
+            )
+            """,
+            *TRACK_CHANGES_TRIGGERS,
+        ),
+        seeds=DICTIONARY_SEEDS,
+    ),
+    Migration(
+        version=2,
+        description="keyset index for risk listing",
+        statements=(
+            """
+            CREATE INDEX IF NOT EXISTS idx_risks_account_created_at ON risks (account_id, created_at DESC, id)
+            """,
+        ),
+    ),
+    Migration(
+        version=3,
+        description="index for risk history lookups",
+        statements=(
+            """
+            CREATE INDEX IF NOT EXISTS idx_history_log_risks_risk_id ON history_log_risks (risk_id, id)
+            """,
+        ),
+    ),
+    Migration(
+        version=4,
+        description="covering indexes for the risk matrix aggregates",
+        statements=(
+            """
+            CREATE INDEX IF NOT EXISTS idx_risks_account_matrix ON risks (account_id, probability_id, impact_id, id)
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_risks_account_status ON risks (account_id, risk_status_id)
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_risks_account_type ON risks (account_id, risk_type_id)
+            """,
+        ),
+    ),
+    Migration(
+        version=5,
+        description="persisted risk exposure score",
+        statements=(
+            # filled by Database.recompute_scores, which runs after every applied migration
+            """
+            ALTER TABLE risks ADD COLUMN score REAL
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_risks_account_score ON risks (account_id, score DESC, id)
+            """,
+        ),
+    ),
+    Migration(
+        version=6,
+        description="indexes for filtered and sorted risk listings",
+        statements=(
+            """
+            CREATE INDEX IF NOT EXISTS idx_risks_account_updated_at ON risks (account_id, updated_at DESC, id)
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_risks_account_name ON risks (account_id, name, id)
+            """,
+            # the status and type breakdown indexes grow the default listing order, so filtered listings
+            # read their page straight off the index
+            """
+            DROP INDEX IF EXISTS idx_risks_account_status
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_risks_account_status_created_at
+            ON risks (account_id, risk_status_id, created_at DESC, id)
+            """,
+            """
+            DROP INDEX IF EXISTS idx_risks_account_type
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_risks_account_type_created_at
+            ON risks (account_id, risk_type_id, created_at DESC, id)
+            """,
+        ),
+    ),
+    Migration(
+        version=7,
+        description="full-text search over risk name, description and comment",
+        statements=(
+            # external content index keyed on risks.rowid; Database.rebuild_search_index re-syncs it if the
+            # rowids ever change (VACUUM may renumber them, risks has no INTEGER PRIMARY KEY)
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS risks_fts USING fts5(
+                name, description, comment,
+                content='risks', content_rowid='rowid', tokenize='unicode61 remove_diacritics 2'
+            )
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS risks_fts_insert
+            AFTER INSERT ON risks
+            BEGIN
+                INSERT INTO risks_fts (rowid, name, description, comment)
+                VALUES (NEW.rowid, NEW.name, NEW.description, NEW.comment);
+            END;
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS risks_fts_delete
+            AFTER DELETE ON risks
+            BEGIN
+                INSERT INTO risks_fts (risks_fts, rowid, name, description, comment)
+                VALUES ('delete', OLD.rowid, OLD.name, OLD.description, OLD.comment);
+            END;
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS risks_fts_update
+            AFTER UPDATE OF name, description, comment ON risks
+            BEGIN
+                INSERT INTO risks_fts (risks_fts, rowid, name, description, comment)
+                VALUES ('delete', OLD.rowid, OLD.name, OLD.description, OLD.comment);
+                INSERT INTO risks_fts (rowid, name, description, comment)
+                VALUES (NEW.rowid, NEW.name, NEW.description, NEW.comment);
+            END;
+            """,
+            """
+            INSERT INTO risks_fts (risks_fts) VALUES ('rebuild')
+            """,
+        ),
+    ),
+    Migration(
+        version=8,
+        description="soft-deleted risks and account-scoped history",
+        statements=(
+            """
+            ALTER TABLE risks ADD COLUMN deleted_at DATETIME
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_risks_deleted_at ON risks (deleted_at) WHERE deleted_at IS NOT NULL
+            """,
+            *(f"DROP INDEX IF EXISTS {name}" for name, _ in LIVE_RISK_INDEXES),
+            *(
+                f"CREATE INDEX IF NOT EXISTS {name} ON risks ({columns}) WHERE deleted_at IS NULL"
+                for name, columns in LIVE_RISK_INDEXES
+            ),
+            """
+            ALTER TABLE history_log_risks ADD COLUMN account_id INTEGER
+            """,
+            # history written before this version did not record the account; attribute it only when a single
+            # account holds that risk id, ambiguous entries stay unattributed and are never shown to anyone
+            # (Database.purge_deleted_risks drops them once no account holds the risk id any more)
+            """
+            UPDATE history_log_risks
+            SET account_id = (
+                SELECT MIN(account_id) FROM risks WHERE risks.id = history_log_risks.risk_id
+                HAVING COUNT(DISTINCT account_id) = 1
+            )
+            """,
+            """
+            DROP INDEX IF EXISTS idx_history_log_risks_risk_id
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_history_log_risks_risk_id ON history_log_risks (risk_id, account_id, id)
+            """,
+            *(f"DROP TRIGGER IF EXISTS {name}" for name in TRACK_CHANGES_TRIGGER_NAMES),
+            *ACCOUNT_SCOPED_TRACK_CHANGES_TRIGGERS,
+        ),
+    ),
+    Migration(
+        version=9,
+        description="compressed archive tier for cold risk history",
+        statements=(
+            # one row per batch of consecutive history entries of a risk; archived ids are always below the
+            # risk's remaining hot ids, so a page reads the hot table first and continues here
+            """
+            CREATE TABLE IF NOT EXISTS history_log_risks_archive (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                account_id INTEGER NOT NULL,
+                risk_id string NOT NULL,
+                min_history_id INTEGER NOT NULL,
+                max_history_id INTEGER NOT NULL,
+                row_count INTEGER NOT NULL,
+                payload BLOB NOT NULL
+            )
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_history_log_risks_archive_risk_id
+            ON history_log_risks_archive (risk_id, account_id, max_history_id)
+            """,
+        ),
+    ),
+    Migration(
+        version=10,
+        description="change-set history capture",
+        statements=(
+            """
+            CREATE TABLE IF NOT EXISTS history_change_sets (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                account_id INTEGER NOT NULL,
+                risk_id string NOT NULL,
+                prev_change_set_id INTEGER,
+                timestamp DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (prev_change_set_id) REFERENCES history_change_sets(id)
+            )
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_history_change_sets_risk_id ON history_change_sets (risk_id, account_id, id)
+            """,
+            # history_log_risks keeps one row per changed column; prev_history_id is only set on entries written
+            # before change sets, the chain now lives on the parent rows
+            """
+            ALTER TABLE history_log_risks ADD COLUMN change_set_id INTEGER REFERENCES history_change_sets(id)
+            """,
+            """
+            ALTER TABLE risks ADD COLUMN last_change_set_id INTEGER
+            """,
+            # the per-column triggers stamped all entries of one update with the same timestamp; updates of a risk
+            # within the same second end up in one change set
+            """
+            INSERT INTO history_change_sets (account_id, risk_id, timestamp)
+            SELECT account_id, risk_id, timestamp FROM history_log_risks
+            WHERE account_id IS NOT NULL
+            GROUP BY account_id, risk_id, timestamp
+            ORDER BY MIN(id)
+            """,
+            """
+            UPDATE history_log_risks
+            SET change_set_id = (
+                SELECT id FROM history_change_sets AS c
+                WHERE c.risk_id = history_log_risks.risk_id
+                    AND c.account_id = history_log_risks.account_id
+                    AND c.timestamp = history_log_risks.timestamp
+            )
+            WHERE account_id IS NOT NULL
+            """,
+            """
+            UPDATE history_change_sets
+            SET prev_change_set_id = (
+                SELECT MAX(id) FROM history_change_sets AS p
+                WHERE p.risk_id = history_change_sets.risk_id
+                    AND p.account_id = history_change_sets.account_id
+                    AND p.id < history_change_sets.id
+            )
+            """,
+            """
+            UPDATE risks
+            SET last_change_set_id = (
+                SELECT MAX(id) FROM history_change_sets AS c WHERE c.risk_id = risks.id AND c.account_id = risks.account_id
+            )
+            """,
+            # entries of a risk are reached through its change sets; ids of both grow together, so an update now
+            # adds one entry to a random place of a per-risk index instead of one per changed column
+            """
+            DROP INDEX IF EXISTS idx_history_log_risks_risk_id
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_history_log_risks_change_set_id ON history_log_risks (change_set_id, id)
+            """,
+            *(f"DROP TRIGGER IF EXISTS {name}" for name in TRACK_CHANGES_TRIGGER_NAMES),
+            TRACK_CHANGE_SETS_TRIGGER,
+        ),
+    ),
+    Migration(
+        version=11,
+        description="per-account risk id sequence",
+        statements=(
+            """
+            CREATE TABLE IF NOT EXISTS risk_id_sequences (
+                account_id INTEGER PRIMARY KEY,
+                last_value INTEGER NOT NULL DEFAULT 0,
+                FOREIGN KEY (account_id) REFERENCES accounts(id)
+            )
+            """,
+            # start past the highest "<projectId>-<number>" id an account ever used, soft-deleted ones included;
+            # numbers longer than 18 digits would push the sequence past a 64-bit integer and are ignored
+            """
+            INSERT INTO risk_id_sequences (account_id, last_value)
+            SELECT r.account_id, MAX(CAST(substr(r.id, length(a.projectId) + 2) AS INTEGER))
+            FROM risks AS r
+            JOIN accounts AS a ON a.id = r.account_id
+            WHERE substr(r.id, 1, length(a.projectId) + 1) = a.projectId || '-'
+                AND length(r.id) BETWEEN length(a.projectId) + 2 AND length(a.projectId) + 19
+                AND substr(r.id, length(a.projectId) + 2) NOT GLOB '*[^0-9]*'
+            GROUP BY r.account_id
+            """,
+        ),
+    ),
+    Migration(
+        version=12,
+        description="per-account risk revision",
+        statements=(
+            # bumped by triggers in the transaction of every write that can change the risk matrix, so caches of
+            # any process can tell whether what they hold is current
+            """
+            CREATE TABLE IF NOT EXISTS risk_revisions (
+                account_id INTEGER PRIMARY KEY,
+                revision INTEGER NOT NULL DEFAULT 0,
+                FOREIGN KEY (account_id) REFERENCES accounts(id)
+            )
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS risk_revision_insert
+            AFTER INSERT ON risks
+            BEGIN
+                INSERT INTO risk_revisions (account_id, revision) VALUES (NEW.account_id, 1)
+                ON CONFLICT (account_id) DO UPDATE SET revision = revision + 1;
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS risk_revision_update
+            AFTER UPDATE OF id, risk_type_id, risk_status_id, probability_id, impact_id, deleted_at ON risks
+            FOR EACH ROW
+            WHEN OLD.id IS NOT NEW.id
+                OR OLD.risk_type_id IS NOT NEW.risk_type_id
+                OR OLD.risk_status_id IS NOT NEW.risk_status_id
+                OR OLD.probability_id IS NOT NEW.probability_id
+                OR OLD.impact_id IS NOT NEW.impact_id
+                OR OLD.deleted_at IS NOT NEW.deleted_at
+            BEGIN
+                INSERT INTO risk_revisions (account_id, revision) VALUES (NEW.account_id, 1)
+                ON CONFLICT (account_id) DO UPDATE SET revision = revision + 1;
+            END
+            """,
+            # purging an already soft-deleted risk changes nothing a reader can see
+            """
+            CREATE TRIGGER IF NOT EXISTS risk_revision_delete
+            AFTER DELETE ON risks
+            FOR EACH ROW
+            WHEN OLD.deleted_at IS NULL
+            BEGIN
+                INSERT INTO risk_revisions (account_id, revision) VALUES (OLD.account_id, 1)
+                ON CONFLICT (account_id) DO UPDATE SET revision = revision + 1;
+            END
+            """,
+        ),
+    ),
+    Migration(
+        version=13,
+        description="account-scoped full-text search",
+        statements=(
+            # account_id is indexed too, so a search matches "account_id : <id>" together with the words and only
+            # ranks the account's own hits instead of every match in the database
+            "DROP TRIGGER IF EXISTS risks_fts_insert",
+            "DROP TRIGGER IF EXISTS risks_fts_delete",
+            "DROP TRIGGER IF EXISTS risks_fts_update",
+            "DROP TABLE IF EXISTS risks_fts",
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS risks_fts USING fts5(
+                name, description, comment, account_id,
+                content='risks', content_rowid='rowid', tokenize='unicode61 remove_diacritics 2'
+            )
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS risks_fts_insert
+            AFTER INSERT ON risks
+            BEGIN
+                INSERT INTO risks_fts (rowid, name, description, comment, account_id)
+                VALUES (NEW.rowid, NEW.name, NEW.description, NEW.comment, NEW.account_id);
+            END;
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS risks_fts_delete
+            AFTER DELETE ON risks
+            BEGIN
+                INSERT INTO risks_fts (risks_fts, rowid, name, description, comment, account_id)
+                VALUES ('delete', OLD.rowid, OLD.name, OLD.description, OLD.comment, OLD.account_id);
+            END;
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS risks_fts_update
+            AFTER UPDATE OF name, description, comment, account_id ON risks
+            BEGIN
+                INSERT INTO risks_fts (risks_fts, rowid, name, description, comment, account_id)
+                VALUES ('delete', OLD.rowid, OLD.name, OLD.description, OLD.comment, OLD.account_id);
+                INSERT INTO risks_fts (rowid, name, description, comment, account_id)
+                VALUES (NEW.rowid, NEW.name, NEW.description, NEW.comment, NEW.account_id);
+            END;
+            """,
+            """
+            INSERT INTO risks_fts (risks_fts) VALUES ('rebuild')
+            """,
+        ),
+    ),
+)
+
+
+class Migrator:
+    """
+    Brings a database up to the latest schema version.
+
+    Applied versions are recorded in `schema_version`. When the database is already current, `migrate` costs a
+    single indexed read. Otherwise pending migrations run inside one `BEGIN IMMEDIATE` transaction, whose write
+    lock makes concurrently booting workers wait and then find the work already done.
+    """
+
+    def __init__(self, logger: logging.Logger, migrations: tuple[Migration, ...] = MIGRATIONS) -> None:
+        self.logger = logger
+        self.migrations = tuple(sorted(migrations, key=lambda migration: migration.version))
+
+    @property
+    def latest_version(self) -> int:
+        return self.migrations[-1].version if self.migrations else 0
+
+    def current_version(self, connection: sqlite3.Connection) -> int:
+        try:
+            version = connection.execute("SELECT MAX(version) FROM schema_version").fetchone()[0]
+        except sqlite3.OperationalError:
+            return 0
+        return version or 0
+
+    def migrate(self, connection: sqlite3.Connection) -> list[int]:
+        """
+        Apply pending migrations and return the versions applied by this call.
+        """
+        if self.current_version(connection) >= self.latest_version:
+            return []
+
+        if connection.in_transaction:
+            connection.commit()
+
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    version INTEGER PRIMARY KEY,
+                    description TEXT NOT NULL,
+                    applied_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+                )
+                """
+            )
+            current = self.current_version(connection)
+            applied = []
+            for migration in self.migrations:
+                if migration.version <= current:
+                    continue
+                self._apply(connection, migration)
+                applied.append(migration.version)
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+
+        for version in applied:
+            self.logger.info(f"Applied schema migration {version}")
+        return applied
+
+    @staticmethod
+    def _apply(connection: sqlite3.Connection, migration: Migration) -> None:
+        for statement in migration.statements:
+            connection.execute(statement)
+        for seed in migration.seeds:
+            connection.executemany(seed.statement, seed.rows)
+        connection.execute(
+            "INSERT INTO schema_version (version, description) VALUES (?, ?)",
+            (migration.version, migration.description),
+        )
@@ -0,0 +1,152 @@
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from sqlite3 import connect
+
+
+class PoolTimeoutError(RuntimeError):
+    pass
+
+
+@dataclass
+class PooledConnection:
+    connection: sqlite3.Connection
+    cursor: sqlite3.Cursor
+    checked_at: float = field(default_factory=time.monotonic)
+    transaction_depth: int = 0
+
+
+class ConnectionPool:
+    """
+    Bounded pool of SQLite connections with per-thread affinity.
+
+    Every thread gets its own connection on first use and keeps it for its lifetime, so worker threads never
+    share a cursor. Connections owned by threads that have exited are reclaimed for new threads. When all
+    `size` connections are owned by live threads, a new thread waits up to `timeout` seconds for one to free up.
+    """
+
+    def __init__(
+            self,
+            path: str,
+            logger: logging.Logger,
+            size: int = 8,
+            timeout: float = 30.0,
+            health_check_interval: float = 60.0,
+            pragmas: dict[str, str | int] | None = None,
+    ) -> None:
+        self.path = path
+        self.logger = logger
+        self.size = size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self.pragmas = pragmas or {}
+
+        self._local = threading.local()
+        self._condition = threading.Condition()
+        self._owned: dict[threading.Thread, PooledConnection] = {}
+        self._idle: list[PooledConnection] = []
+        self._closed = False
+
+    def get(self) -> PooledConnection:
+        pooled: PooledConnection | None = getattr(self._local, "pooled", None)
+        if pooled is None:
+            pooled = self._checkout()
+            self._local.pooled = pooled
+        elif time.monotonic() - pooled.checked_at > self.health_check_interval:
+            pooled = self._ensure_healthy(pooled)
+            self._local.pooled = pooled
+        return pooled
+
+    def release(self) -> None:
+        """
+        Return the current thread's connection to the pool before the thread exits.
+        """
+        pooled: PooledConnection | None = getattr(self._local, "pooled", None)
+        if pooled is None:
+            return
+        self._local.pooled = None
+        with self._condition:
+            self._owned.pop(threading.current_thread(), None)
+            self._idle.append(pooled)
+            self._condition.notify()
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            for pooled in [*self._owned.values(), *self._idle]:
+                try:
+                    pooled.connection.close()
+                except sqlite3.Error as e:
+                    self.logger.error(f"Error closing pooled connection: {e}")
+            self._owned.clear()
+            self._idle.clear()
+            self._condition.notify_all()
+
+    def stats(self) -> dict[str, int]:
+        with self._condition:
+            return {"size": self.size, "in_use": len(self._owned), "idle": len(self._idle)}
+
+    def _checkout(self) -> PooledConnection:
+        thread = threading.current_thread()
+        deadline = time.monotonic() + self.timeout
+
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Connection pool is closed")
+
+                self._reclaim_dead_threads()
+
+                if self._idle:
+                    pooled = self._idle.pop()
+                    break
+
+                if len(self._owned) < self.size:
+                    pooled = self._connect()
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeoutError(
+                        f"Timed out after {self.timeout}s waiting for a database connection "
+                        f"(pool size {self.size})"
+                    )
+                self._condition.wait(timeout=remaining)
+
+            self._owned[thread] = pooled
+
+        return self._ensure_healthy(pooled)
+
+    def _reclaim_dead_threads(self) -> None:
+        for thread in [thread for thread in self._owned if not thread.is_alive()]:
+            pooled = self._owned.pop(thread)
+            if pooled.connection.in_transaction:
+                pooled.connection.rollback()
+            self._idle.append(pooled)
+
+    def _ensure_healthy(self, pooled: PooledConnection) -> PooledConnection:
+        try:
+            pooled.connection.execute("SELECT 1").fetchone()
+        except sqlite3.Error as e:
+            self.logger.warning(f"Replacing unhealthy database connection: {e}")
+            try:
+                pooled.connection.close()
+            except sqlite3.Error:
+                pass
+            fresh = self._connect()
+            with self._condition:
+                thread = threading.current_thread()
+                if thread in self._owned:
+                    self._owned[thread] = fresh
+            return fresh
+
+        pooled.checked_at = time.monotonic()
+        return pooled
+
+    def _connect(self) -> PooledConnection:
+        conn = connect(self.path, check_same_thread=False, timeout=self.timeout)
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return PooledConnection(connection=conn, cursor=conn.cursor())
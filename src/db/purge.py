@@ -0,0 +1,72 @@
+import logging
+import threading
+from typing import Callable
+
+
+class PurgeWorker:
+    """
+    Background thread that moves rows out of the hot tables: hard-deletes soft-deleted risks, archives cold
+    history.
+
+    Every `interval` seconds it calls `purge(batch_size)` until a call removes nothing. Each call is one short
+    write transaction, and the worker sleeps `pause` seconds between calls, so purging a large register never
+    holds the write lock for long and request writes interleave with it. After each round `release` is called,
+    so the pooled connection the thread took is returned while it sleeps.
+    """
+
+    def __init__(
+            self,
+            purge: Callable[[int], int],
+            logger: logging.Logger,
+            batch_size: int = 500,
+            interval: float = 5.0,
+            pause: float = 0.05,
+            name: str = "deleted risks",
+            release: Callable[[], None] | None = None,
+    ) -> None:
+        self._purge = purge
+        self._release = release
+        self.logger = logger
+        self.name = name
+        self.batch_size = batch_size
+        self.interval = interval
+        self.pause = pause
+
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="db-purge", daemon=True)
+        self._thread.start()
+
+    @property
+    def thread(self) -> threading.Thread:
+        return self._thread
+
+    def drain(self) -> int:
+        """
+        Purge batches until nothing is left or the worker is stopped. Returns the number of removed rows.
+        """
+        total = 0
+        while not self._stopped.is_set():
+            try:
+                removed = self._purge(self.batch_size)
+            except Exception as e:
+                self.logger.error(f"Purge of {self.name} failed: {e}")
+                break
+            if not removed:
+                break
+            total += removed
+            self._stopped.wait(self.pause)
+        return total
+
+    def close(self) -> None:
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            try:
+                removed = self.drain()
+            finally:
+                if self._release is not None:
+                    self._release()
+            if removed:
+                self.logger.info(f"Purged {removed} rows of {self.name}")
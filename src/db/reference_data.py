@@ -0,0 +1,66 @@
+import logging
+import threading
+from dataclasses import dataclass
+
+from src.db.db import Database
+from src.internal.dto.common_object import (
+    CommonObjDTO,
+    CommonObjDTOFactory,
+    CommonObjWithValueDTO,
+    CommonObjWithValueDTOFactory,
+)
+
+
+@dataclass(frozen=True)
+class ReferenceData:
+    factors: dict[int, CommonObjDTO]
+    types: dict[int, CommonObjDTO]
+    methods: dict[int, CommonObjDTO]
+    statuses: dict[int, CommonObjDTO]
+    probabilities: dict[int, CommonObjWithValueDTO]
+    impacts: dict[int, CommonObjWithValueDTO]
+
+
+class ReferenceDataCache:
+    """
+    Process-wide snapshot of the risk dictionaries (factors, types, methods, statuses, probabilities, impacts).
+
+    The snapshot is loaded once and replaced as a whole, so readers never see a half-updated set. It is dropped
+    whenever the database reports that a dictionary table changed and reloaded on the next read.
+    """
+
+    def __init__(self, db: Database, logger: logging.Logger) -> None:
+        self.db = db
+        self.logger = logger
+        self._lock = threading.Lock()
+        self._data: ReferenceData | None = None
+        db.add_reference_data_listener(self.invalidate)
+
+    @property
+    def data(self) -> ReferenceData:
+        data = self._data
+        if data is None:
+            data = self.load()
+        return data
+
+    def load(self) -> ReferenceData:
+        with self._lock:
+            self._data = ReferenceData(
+                factors=self._by_id(CommonObjDTOFactory.get_many_from_tuples(self.db.get_risk_factors())),
+                types=self._by_id(CommonObjDTOFactory.get_many_from_tuples(self.db.get_risk_types())),
+                methods=self._by_id(CommonObjDTOFactory.get_many_from_tuples(self.db.get_risk_management_methods())),
+                statuses=self._by_id(CommonObjDTOFactory.get_many_from_tuples(self.db.get_risk_statuses())),
+                probabilities=self._by_id(
+                    CommonObjWithValueDTOFactory.get_many_from_tuples(self.db.get_risk_probabilities())),
+                impacts=self._by_id(CommonObjWithValueDTOFactory.get_many_from_tuples(self.db.get_risk_impacts())),
+            )
+            self.logger.info("Reference data loaded")
+            return self._data
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._data = None
+
+    @staticmethod
+    def _by_id(dtos: list) -> dict:
+        return {dto.id: dto for dto in dtos}
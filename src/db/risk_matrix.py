@@ -0,0 +1,79 @@
+import json
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from src.db.db import Database
+
+
+@dataclass(frozen=True)
+class RiskMatrixCell:
+    probability_id: int | None
+    impact_id: int | None
+    count: int
+    risk_ids: tuple[str, ...] | None = None
+
+
+@dataclass(frozen=True)
+class RiskMatrix:
+    cells: tuple[RiskMatrixCell, ...]
+    by_status: dict[int, int]
+    by_type: dict[int, int]
+
+    @property
+    def total(self) -> int:
+        return sum(self.by_status.values())
+
+
+class RiskMatrixCache:
+    """
+    Per-account cache of the probability x impact matrix and the status / type breakdowns.
+
+    Every entry remembers the account's risk revision it was loaded at. The revision lives in the database and is
+    bumped in the transaction of each risk write, so one indexed read tells whether an entry is still current,
+    whichever worker made the write. At most `max_size` matrices are kept, least recently used first out.
+    """
+
+    def __init__(self, db: Database, logger: logging.Logger, max_size: int = 1_024) -> None:
+        self.db = db
+        self.logger = logger
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple[int, bool], tuple[int, RiskMatrix]] = OrderedDict()
+
+    def get(self, auth_account_id: int, with_ids: bool = False) -> RiskMatrix:
+        key = (auth_account_id, with_ids)
+        revision = self.db.get_risks_revision(auth_account_id=auth_account_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == revision:
+                self._entries.move_to_end(key)
+                return entry[1]
+
+        # read after the revision: a write in between leaves a newer revision, and the entry is reloaded next time
+        matrix = self.load(auth_account_id, with_ids)
+
+        with self._lock:
+            if self.max_size > 0:
+                self._entries[key] = (revision, matrix)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+        return matrix
+
+    def load(self, auth_account_id: int, with_ids: bool = False) -> RiskMatrix:
+        cells = tuple(
+            RiskMatrixCell(
+                probability_id=row[0],
+                impact_id=row[1],
+                count=row[2],
+                risk_ids=tuple(json.loads(row[3])) if with_ids else None,
+            )
+            for row in self.db.get_risk_matrix(auth_account_id=auth_account_id, with_ids=with_ids)
+        )
+        return RiskMatrix(
+            cells=cells,
+            by_status=dict(self.db.get_risk_counts_by_status(auth_account_id=auth_account_id)),
+            by_type=dict(self.db.get_risk_counts_by_type(auth_account_id=auth_account_id)),
+        )
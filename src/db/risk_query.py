@@ -0,0 +1,90 @@
+import re
+from dataclasses import dataclass, fields
+from typing import Any
+
+
+@dataclass(frozen=True)
+class RiskSortKey:
+    column: str
+    row_index: int  # position of the column in a HYDRATED_RISK_SELECT row
+    nullable: bool = False
+
+
+RISK_SORT_KEYS = {
+    "created_at": RiskSortKey(column="r.created_at", row_index=18),
+    "updated_at": RiskSortKey(column="r.updated_at", row_index=20),
+    "name": RiskSortKey(column="r.name", row_index=1),
+    "score": RiskSortKey(column="r.score", row_index=19, nullable=True),
+}
+
+
+@dataclass(frozen=True)
+class RiskFilters:
+    """
+    Filters of a risk listing. Every id field matches any of its ids (empty means no filter), fields are
+    combined with AND.
+    """
+    status_ids: tuple[int, ...] = ()
+    type_ids: tuple[int, ...] = ()
+    factor_ids: tuple[int, ...] = ()
+    method_ids: tuple[int, ...] = ()
+    probability_ids: tuple[int, ...] = ()
+    impact_ids: tuple[int, ...] = ()
+    min_score: float | None = None
+
+    def compile(self) -> tuple[list[str], list[Any]]:
+        conditions: list[str] = []
+        params: list[Any] = []
+        for field in fields(self):
+            column = _FILTER_COLUMNS.get(field.name)
+            ids = getattr(self, field.name)
+            if column is None or not ids:
+                continue
+            conditions.append(f"{column} IN ({', '.join('?' * len(ids))})")
+            params += ids
+
+        if self.min_score is not None:
+            conditions.append("r.score >= ?")
+            params.append(self.min_score)
+        return conditions, params
+
+
+_FILTER_COLUMNS = {
+    "status_ids": "r.risk_status_id",
+    "type_ids": "r.risk_type_id",
+    "factor_ids": "r.risk_factor_id",
+    "method_ids": "r.risk_management_method_id",
+    "probability_ids": "r.probability_id",
+    "impact_ids": "r.impact_id",
+}
+
+
+def keyset_condition(key: RiskSortKey, descending: bool, value: Any, risk_id: str) -> tuple[str, list]:
+    """
+    Rows strictly after (value, risk_id) in `ORDER BY key [DESC], r.id`. SQLite sorts NULLs first ascending
+    and last descending.
+    """
+    column = key.column
+    if value is None:
+        if descending:
+            return f"({column} IS NULL AND r.id > ?)", [risk_id]
+        return f"(({column} IS NULL AND r.id > ?) OR {column} IS NOT NULL)", [risk_id]
+
+    if descending:
+        condition = f"{column} <= ? AND ({column} < ? OR r.id > ?)"
+    else:
+        condition = f"{column} >= ? AND ({column} > ? OR r.id > ?)"
+    if key.nullable and descending:
+        condition = f"(({condition}) OR {column} IS NULL)"
+    return condition, [value, value, risk_id]
+
+
+def fts_query(text: str) -> str | None:
+    """
+    Turn free user input into a safe FTS5 query: every word becomes a quoted prefix term, terms are AND-ed.
+    None if the input has no words.
+    """
+    terms = re.findall(r"\w+", text)
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
@@ -0,0 +1,33 @@
+import numpy as np
+
+# exposure score of the current row, for UPDATE statements on `risks`
+SCORE_FROM_COLUMNS_SQL = (
+    "(SELECT value FROM probability WHERE id = risks.probability_id)"
+    " * (SELECT value FROM impact WHERE id = risks.impact_id)"
+)
+# exposure score for bound (probability_id, impact_id) parameters, for INSERT statements
+SCORE_FROM_PARAMS_SQL = "(SELECT value FROM probability WHERE id = ?) * (SELECT value FROM impact WHERE id = ?)"
+
+
+def compute_scores(
+        probability_ids: list[int | None],
+        impact_ids: list[int | None],
+        probability_values: dict[int, float],
+        impact_values: dict[int, float],
+) -> np.ndarray:
+    """
+    Vectorized `probability.value * impact.value` for many risks at once. NaN where either id is missing or
+    unknown.
+    """
+    return _lookup(probability_values, probability_ids) * _lookup(impact_values, impact_ids)
+
+
+def _lookup(values: dict[int, float], ids: list[int | None]) -> np.ndarray:
+    # dense id -> value table, the extra last slot (NaN) absorbs missing and unknown ids
+    table = np.full(max(values, default=0) + 2, np.nan)
+    table[list(values)] = list(values.values())
+
+    raw = np.array(ids, dtype=float)
+    missing = np.isnan(raw) | (raw < 0) | (raw >= len(table) - 1)
+    index = np.where(missing, len(table) - 1, np.nan_to_num(raw)).astype(np.intp)
+    return table[index]
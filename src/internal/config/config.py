@@ -1,8 +1,12 @@
 import os
+from typing import Literal
 
-from pydantic import BaseModel
+from pydantic import BaseModel, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+# background threads started in the app lifespan: deleted risk purge, cold history archive
+PURGE_WORKERS = 2
+
 
 class Server(BaseModel):
     title: str = "Risk Management API"
@@ -16,14 +20,55 @@ class Server(BaseModel):
     env: str = "local"
 
 
+class SQLitePragmas(BaseModel):
+    journal_mode: Literal["wal", "delete", "truncate", "persist", "memory", "off"] = "wal"
+    synchronous: Literal["off", "normal", "full", "extra"] = "normal"
+    mmap_size: int = 256 * 1024 * 1024  # bytes
+    cache_size: int = -64_000  # negative is KiB, positive is pages
+    temp_store: Literal["default", "file", "memory"] = "memory"
+    busy_timeout: int = 5_000  # milliseconds
+
+
 class DB(BaseModel):
     path: str
+    pool_size: int = 12  # at least Settings.required_pool_size
+    pool_timeout: float = 30.0  # seconds to wait for a free connection
+    pool_health_check_interval: float = 60.0  # seconds between liveness probes of an idle connection
+    pragmas: SQLitePragmas = SQLitePragmas()
+    group_commit: bool = False  # coalesce concurrent write transactions into shared commits
+    group_commit_window: float = 0.002  # seconds a batch stays open for more writes
+    group_commit_max_batch: int = 64
+    purge_batch_size: int = 500  # rows of deleted risks and their history removed per purge transaction
+    purge_interval: float = 5.0  # seconds between scans for deleted risks
+    purge_pause: float = 0.05  # seconds between purge transactions, lets other writers take the lock
+
+
+class Executor(BaseModel):
+    max_workers: int = 8  # each worker keeps its own pooled connection, counted in Settings.required_pool_size
+
+
+class History(BaseModel):
+    hot_max_age_days: int | None = 90  # older entries move to the compressed archive, None keeps them by age
+    hot_max_rows: int = 200  # newest entries per risk kept in the hot table
+    archive_chunk_rows: int = 256  # history entries compressed together into one archive row
+    archive_batch_size: int = 1000  # entries archived per transaction
+    archive_interval: float = 60.0  # seconds between scans for cold history
+    archive_pause: float = 0.05  # seconds between archive transactions
+
+
+class Simulation(BaseModel):
+    max_workers: int = 2  # processes running Monte Carlo simulations
+    cache_size: int = 256  # simulation results kept, keyed by risk set and parameters
 
 
 class Security(BaseModel):
     secret_key: str
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 60 * 24 * 7  # 7 days
+    password_hash_workers: int = 2  # processes dedicated to bcrypt
+    password_hash_max_concurrency: int = 8  # hash/verify calls in flight, the rest wait in line
+    token_cache_size: int = 10_000  # verified tokens kept in memory, 0 disables the cache
+    token_cache_ttl: float = 300.0  # seconds, never beyond the token's own exp
 
 
 class Settings(BaseSettings):
@@ -36,3 +81,25 @@ class Settings(BaseSettings):
     server: Server
     db: DB
     security: Security
+    executor: Executor = Executor()
+    simulation: Simulation = Simulation()
+    history: History = History()
+
+    @property
+    def required_pool_size(self) -> int:
+        """
+        Connections held at the same time. A pooled connection stays with the thread that took it, so the pool
+        has to cover every executor worker, the main thread (it opens the database), the group commit writer and
+        the purge workers (deleted risks, cold history) while they run.
+        """
+        return self.executor.max_workers + 1 + int(self.db.group_commit) + PURGE_WORKERS
+
+    @model_validator(mode="after")
+    def check_pool_size(self) -> "Settings":
+        if self.db.pool_size < self.required_pool_size:
+            raise ValueError(
+                f"db.pool_size={self.db.pool_size} is too small: {self.required_pool_size} threads keep a database"
+                f" connection (executor.max_workers={self.executor.max_workers}, the main thread"
+                f"{', the group commit writer' if self.db.group_commit else ''}, {PURGE_WORKERS} purge workers)"
+            )
+        return self
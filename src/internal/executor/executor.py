@@ -0,0 +1,88 @@
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable
+
+
+@dataclass(frozen=True)
+class ExecutorStats:
+    max_workers: int
+    queued: int
+    active: int
+    completed: int
+    avg_wait_ms: float
+    max_wait_ms: float
+    avg_run_ms: float
+    max_run_ms: float
+
+
+class BoundedExecutor(ThreadPoolExecutor):
+    """
+    Application-lifetime thread pool with a fixed number of workers.
+
+    Tracks how many calls are waiting for a worker (queue depth) and how long they wait and run, so
+    saturation of the blocking side of the app is visible.
+    """
+
+    def __init__(self, max_workers: int, thread_name_prefix: str = "") -> None:
+        super().__init__(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+        self.max_workers = max_workers
+        self._metrics_lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
+        self._completed = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._run_total = 0.0
+        self._run_max = 0.0
+
+    def submit(self, fn: Callable[..., Any], /, *args, **kwargs) -> Future:
+        submitted_at = time.perf_counter()
+
+        def timed() -> Any:
+            started_at = time.perf_counter()
+            waited = started_at - submitted_at
+            with self._metrics_lock:
+                self._queued -= 1
+                self._active += 1
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                ran = time.perf_counter() - started_at
+                with self._metrics_lock:
+                    self._active -= 1
+                    self._completed += 1
+                    self._run_total += ran
+                    self._run_max = max(self._run_max, ran)
+
+        with self._metrics_lock:
+            self._queued += 1
+        try:
+            return super().submit(timed)
+        except RuntimeError:
+            with self._metrics_lock:
+                self._queued -= 1
+            raise
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self, functools.partial(fn, *args, **kwargs))
+
+    def stats(self) -> ExecutorStats:
+        with self._metrics_lock:
+            completed = self._completed or 1
+            return ExecutorStats(
+                max_workers=self.max_workers,
+                queued=self._queued,
+                active=self._active,
+                completed=self._completed,
+                avg_wait_ms=self._wait_total / completed * 1000,
+                max_wait_ms=self._wait_max * 1000,
+                avg_run_ms=self._run_total / completed * 1000,
+                max_run_ms=self._run_max * 1000,
+            )
@@ -0,0 +1,36 @@
+import csv
+import io
+import json
+from typing import Any, AsyncIterable, AsyncIterator
+
+from src.internal.ingest.records import RecordFormat
+
+MEDIA_TYPES: dict[RecordFormat, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+async def iter_encoded(
+        batches: AsyncIterable[list[dict[str, Any]]], format_: RecordFormat, columns: list[str],
+) -> AsyncIterator[str]:
+    """
+    Encode batches of records as NDJSON or CSV (header row first), one text chunk per batch.
+    """
+    if format_ == "csv":
+        yield _encode_csv([dict(zip(columns, columns))], columns)
+
+    async for batch in batches:
+        if not batch:
+            continue
+        if format_ == "csv":
+            yield _encode_csv(batch, columns)
+        else:
+            yield "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in batch)
+
+
+def _encode_csv(batch: list[dict[str, Any]], columns: list[str]) -> str:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, lineterminator="\n")
+    writer.writerows(batch)
+    return buffer.getvalue()
@@ -0,0 +1,136 @@
+import codecs
+import csv
+import json
+from dataclasses import dataclass
+from typing import Any, AsyncIterable, AsyncIterator, Iterator, Literal
+
+RecordFormat = Literal["ndjson", "csv"]
+
+# longest line, and longest CSV record spanning several lines, kept in memory while parsing
+MAX_RECORD_LENGTH = 65_536
+
+
+@dataclass(frozen=True)
+class Record:
+    line: int
+    data: dict[str, Any] | None = None
+    error: str | None = None
+
+
+async def iter_lines(chunks: AsyncIterable[bytes], max_length: int = MAX_RECORD_LENGTH) -> AsyncIterator[str | None]:
+    """
+    Split a stream of UTF-8 byte chunks into lines without buffering the whole body.
+
+    A line longer than `max_length` characters is yielded as None; the rest of it is dropped as it arrives, up to
+    the next newline.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    tail = ""
+    skipping = False
+    async for chunk in chunks:
+        *lines, tail = (tail + decoder.decode(chunk)).split("\n")
+        for line in lines:
+            if skipping:
+                skipping = False
+            elif len(line) > max_length:
+                yield None
+            else:
+                yield line.rstrip("\r")
+        if skipping:
+            tail = ""
+        elif len(tail) > max_length:
+            yield None
+            skipping, tail = True, ""
+    tail += decoder.decode(b"", final=True)
+    if tail and not skipping:
+        yield tail.rstrip("\r") if len(tail) <= max_length else None
+
+
+async def iter_records(
+        chunks: AsyncIterable[bytes], format_: RecordFormat, max_length: int = MAX_RECORD_LENGTH,
+) -> AsyncIterator[Record]:
+    """
+    Parse an NDJSON or CSV (with a header row) body into one `Record` per row as the body arrives.
+
+    Rows that cannot be parsed are yielded with `error` set instead of stopping the stream. Blank lines are
+    skipped, empty CSV cells are omitted so that field defaults apply. A line or CSV record longer than
+    `max_length` characters fails and parsing resumes on the next line.
+    """
+    if format_ == "ndjson":
+        parse = _iter_ndjson
+    else:
+        parse = _iter_csv
+    async for record in parse(iter_lines(chunks, max_length), max_length):
+        yield record
+
+
+async def _iter_ndjson(lines: AsyncIterator[str | None], max_length: int) -> AsyncIterator[Record]:
+    line_no = 0
+    async for line in lines:
+        line_no += 1
+        if line is None:
+            yield Record(line=line_no, error=f"Line longer than {max_length} characters")
+            continue
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError as e:
+            yield Record(line=line_no, error=f"Invalid JSON: {e}")
+            continue
+        if not isinstance(data, dict):
+            yield Record(line=line_no, error="Row must be a JSON object")
+            continue
+        yield Record(line=line_no, data=data)
+
+
+async def _iter_csv(lines: AsyncIterator[str | None], max_length: int) -> AsyncIterator[Record]:
+    header: list[str] | None = None
+    line_no = 0
+    pending: list[tuple[int, str]] = []
+
+    async for line in lines:
+        line_no += 1
+        backlog: list[tuple[int, str | None]] = [(line_no, line)]
+        while backlog:
+            number, text = backlog.pop(0)
+            if text is None or sum(len(part) for _, part in pending) + len(text) > max_length:
+                if not pending:
+                    yield Record(line=number, error=f"Invalid CSV: line longer than {max_length} characters")
+                    continue
+                # most likely a stray quote opened a cell that never closes: the record fails on its first
+                # line and the lines it swallowed are read again
+                yield Record(line=pending[0][0], error=f"Invalid CSV: record longer than {max_length} characters")
+                backlog[:0] = [*pending[1:], (number, text)]
+                pending = []
+                continue
+
+            if not pending and not text.strip():
+                continue
+            pending.append((number, text))
+            # a quoted cell may span several lines, the record ends once the quotes are balanced
+            if sum(part.count('"') for _, part in pending) % 2:
+                continue
+
+            record_line = pending[0][0]
+            text, pending = "\n".join(part for _, part in pending), []
+            try:
+                cells = next(_csv_rows(text))
+            except (csv.Error, StopIteration) as e:
+                yield Record(line=record_line, error=f"Invalid CSV: {e}")
+                continue
+
+            if header is None:
+                header = [cell.strip() for cell in cells]
+                continue
+            if len(cells) != len(header):
+                yield Record(line=record_line, error=f"Expected {len(header)} cells, got {len(cells)}")
+                continue
+            yield Record(line=record_line, data={key: value for key, value in zip(header, cells) if value != ""})
+
+    if pending:
+        yield Record(line=pending[0][0], error="Invalid CSV: unterminated quoted cell")
+
+
+def _csv_rows(text: str) -> Iterator[list[str]]:
+    return csv.reader([text], strict=True)
@@ -0,0 +1,30 @@
+import base64
+import json
+
+
+def encode_cursor(*values: str | int | float | None) -> str:
+    """
+    Pack the sort key of the last row of a page into an opaque, URL-safe token.
+    """
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str, size: int) -> tuple:
+    """
+    Unpack a token produced by `encode_cursor`. Raises ValueError if it is malformed, has the wrong arity, holds
+    anything but strings, numbers and nulls, or its last value (the row id) is not a string.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Malformed cursor") from e
+
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Malformed cursor")
+    if not all(value is None or isinstance(value, (str, int, float)) for value in values):
+        raise ValueError("Malformed cursor")
+    if not isinstance(values[-1], str):
+        raise ValueError("Malformed cursor")
+    return tuple(values)
@@ -0,0 +1,96 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+from passlib.context import CryptContext
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+def hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def verify_password(password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(password, hashed_password)
+
+
+@dataclass(frozen=True)
+class PasswordHasherStats:
+    max_workers: int
+    max_concurrency: int
+    waiting: int
+    running: int
+    completed: int
+    avg_queue_ms: float
+    max_queue_ms: float
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt hashing and verification in a dedicated process pool.
+
+    bcrypt is deliberately slow and holds the GIL, so it is kept off the event loop and off the DB threads.
+    At most `max_concurrency` operations are in flight; further callers wait (asynchronously) for a slot, and
+    the time spent waiting is recorded.
+    """
+
+    def __init__(self, max_workers: int = 2, max_concurrency: int = 8) -> None:
+        self.max_workers = max_workers
+        self.max_concurrency = max_concurrency
+        self._executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._metrics_lock = threading.Lock()
+        self._waiting = 0
+        self._running = 0
+        self._completed = 0
+        self._queue_total = 0.0
+        self._queue_max = 0.0
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, password, hashed_password)
+
+    def stats(self) -> PasswordHasherStats:
+        with self._metrics_lock:
+            completed = self._completed or 1
+            return PasswordHasherStats(
+                max_workers=self.max_workers,
+                max_concurrency=self.max_concurrency,
+                waiting=self._waiting,
+                running=self._running,
+                completed=self._completed,
+                avg_queue_ms=self._queue_total / completed * 1000,
+                max_queue_ms=self._queue_max * 1000,
+            )
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    async def _run(self, func, *args):
+        queued_at = time.perf_counter()
+        with self._metrics_lock:
+            self._waiting += 1
+
+        async with self._semaphore:
+            waited = time.perf_counter() - queued_at
+            with self._metrics_lock:
+                self._waiting -= 1
+                self._running += 1
+                self._queue_total += waited
+                self._queue_max = max(self._queue_max, waited)
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._executor, func, *args)
+            finally:
+                with self._metrics_lock:
+                    self._running -= 1
+                    self._completed += 1
@@ -0,0 +1,65 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class _Entry:
+    account_id: int
+    expires_at: float
+
+
+class TokenCache:
+    """
+    LRU cache of already verified access tokens.
+
+    Entries are keyed by a SHA-256 of the token, so raw tokens are never kept in memory, and live for at most
+    `ttl` seconds and never past the token's own `exp`. The least recently used entry is evicted once
+    `max_size` is reached. A hit only skips the signature check: like the tokens themselves, it stays valid until
+    `exp` whatever happens to the account.
+    """
+
+    def __init__(self, max_size: int = 10_000, ttl: float = 300.0) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+
+    def get(self, token: str) -> int | None:
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry.account_id
+
+    def put(self, token: str, account_id: int, exp: float | None) -> None:
+        if self.max_size <= 0:
+            return
+        expires_at = time.time() + self.ttl
+        if exp is not None:
+            expires_at = min(expires_at, exp)
+
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = _Entry(account_id=account_id, expires_at=expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
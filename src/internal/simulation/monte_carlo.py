@@ -0,0 +1,156 @@
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+
+# upper bound of random draws held in memory at once for risks with individual cost ranges
+_BLOCK_ELEMENTS = 4_000_000
+
+
+@dataclass(frozen=True)
+class SimulationParams:
+    trials: int
+    percentiles: tuple[float, ...]
+    var_level: float
+    seed: int | None = None
+
+
+@dataclass(frozen=True)
+class SimulationResult:
+    trials: int
+    risks: int
+    mean: float
+    std: float
+    percentiles: tuple[tuple[float, float], ...]
+    var: float
+    expected_shortfall: float
+
+
+def simulate(
+        groups: list[tuple[float, float, int]],
+        ranged: list[tuple[float, float, float]],
+        params: SimulationParams,
+        seed: int,
+) -> SimulationResult:
+    """
+    Distribution of the total impact of a risk portfolio over `params.trials` trials.
+
+    `groups` are (probability, impact, count) of risks sharing both values: how many of them occur in a trial
+    is one binomial draw, so the cost does not grow with the number of risks. `ranged` are (probability, low,
+    high) of risks with their own cost range: each occurs independently and costs uniform(low, high).
+    """
+    rng = np.random.default_rng(seed)
+    totals = np.zeros(params.trials)
+
+    for probability, impact, count in groups:
+        totals += rng.binomial(count, probability, size=params.trials) * impact
+
+    if ranged:
+        probabilities, lows, highs = (np.asarray(column, dtype=np.float32) for column in zip(*ranged))
+        # one uniform draw u per risk and trial: the risk occurs when u < p, and then u / p is itself
+        # uniform(0, 1), so the cost is low + u * (high - low) / p
+        spreads = (highs - lows) / probabilities
+        block = max(1, _BLOCK_ELEMENTS // len(ranged))
+        for start in range(0, params.trials, block):
+            size = min(block, params.trials - start)
+            draws = rng.random((size, len(ranged)), dtype=np.float32)
+            occurred = draws < probabilities
+            draws *= occurred
+            totals[start:start + size] += draws @ spreads + occurred.astype(np.float32) @ lows
+
+    var = float(np.quantile(totals, params.var_level))
+    return SimulationResult(
+        trials=params.trials,
+        risks=sum(count for _, _, count in groups) + len(ranged),
+        mean=float(totals.mean()),
+        std=float(totals.std()),
+        percentiles=tuple(zip(params.percentiles, np.percentile(totals, params.percentiles).tolist())),
+        var=var,
+        expected_shortfall=float(totals[totals >= var].mean()),
+    )
+
+
+class RiskSimulator:
+    """
+    Runs Monte Carlo portfolio simulations in a dedicated process pool.
+
+    Results are cached (LRU, `cache_size` entries) under a fingerprint of the risk set and the parameters.
+    Without an explicit seed the fingerprint seeds the generator, so the same portfolio always yields the same
+    answer whether or not it came from the cache.
+    """
+
+    def __init__(self, max_workers: int = 2, cache_size: int = 256) -> None:
+        self.max_workers = max_workers
+        self.cache_size = cache_size
+        self._executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        self._lock = threading.Lock()
+        self._cache: OrderedDict[str, SimulationResult] = OrderedDict()
+
+    async def run(
+            self,
+            risks: list[tuple[str, float, float]],
+            params: SimulationParams,
+            cost_ranges: dict[str, tuple[float, float]] | None = None,
+    ) -> SimulationResult:
+        """
+        `risks` are (id, probability value, impact value); `cost_ranges` replace the impact value of some of
+        them with a (low, high) cost range.
+        """
+        cost_ranges = cost_ranges or {}
+        fingerprint = self.fingerprint(risks, params, cost_ranges)
+        with self._lock:
+            result = self._cache.get(fingerprint)
+            if result is not None:
+                self._cache.move_to_end(fingerprint)
+                return result
+
+        groups: Counter[tuple[float, float]] = Counter()
+        ranged = []
+        for risk_id, probability, impact in sorted(risks):
+            if risk_id in cost_ranges:
+                ranged.append((probability, *cost_ranges[risk_id]))
+            else:
+                groups[(probability, impact)] += 1
+
+        seed = params.seed if params.seed is not None else int(fingerprint[:16], 16)
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(
+            self._executor,
+            simulate,
+            [(probability, impact, count) for (probability, impact), count in sorted(groups.items())],
+            ranged,
+            params,
+            seed,
+        )
+
+        with self._lock:
+            if self.cache_size > 0:
+                self._cache[fingerprint] = result
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return result
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    @staticmethod
+    def fingerprint(
+            risks: list[tuple[str, float, float]],
+            params: SimulationParams,
+            cost_ranges: dict[str, tuple[float, float]],
+    ) -> str:
+        digest = hashlib.sha256()
+        for risk in sorted(risks):
+            digest.update(json.dumps(risk).encode())
+        digest.update(json.dumps(sorted(cost_ranges.items())).encode())
+        digest.update(json.dumps([params.trials, params.percentiles, params.var_level, params.seed]).encode())
+        return digest.hexdigest()
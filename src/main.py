@@ -1,21 +1,102 @@
+import functools
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
 from src.api.routes.routers import router as account_router
+from src.db.async_db import AsyncDatabase
 from src.db.db import Database
+from src.db.purge import PurgeWorker
+from src.db.reference_data import ReferenceDataCache
+from src.db.risk_matrix import RiskMatrixCache
 from src.internal.config.config import Settings
+from src.internal.executor.executor import BoundedExecutor
 from src.internal.log.log import logger as _logger
+from src.internal.security.password_hasher import PasswordHasher
+from src.internal.security.token_cache import TokenCache
+from src.internal.simulation.monte_carlo import RiskSimulator
 
 logger = _logger
 
 settings = Settings()
 
-db = Database(path=settings.db.path, logger=logger)
+db = Database(
+    path=settings.db.path,
+    logger=logger,
+    pool_size=settings.db.pool_size,
+    pool_timeout=settings.db.pool_timeout,
+    pool_health_check_interval=settings.db.pool_health_check_interval,
+    pragmas=settings.db.pragmas.model_dump(),
+    group_commit=settings.db.group_commit,
+    group_commit_window=settings.db.group_commit_window,
+    group_commit_max_batch=settings.db.group_commit_max_batch,
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    executor = BoundedExecutor(max_workers=settings.executor.max_workers, thread_name_prefix="db")
+    app.state.executor = executor
+    app.state.async_db = AsyncDatabase(db=db, executor=executor)
+    app.state.reference_data = ReferenceDataCache(db=db, logger=logger)
+    app.state.risk_matrix = RiskMatrixCache(db=db, logger=logger)
+    password_hasher = PasswordHasher(
+        max_workers=settings.security.password_hash_workers,
+        max_concurrency=settings.security.password_hash_max_concurrency,
+    )
+    app.state.password_hasher = password_hasher
+    simulator = RiskSimulator(
+        max_workers=settings.simulation.max_workers,
+        cache_size=settings.simulation.cache_size,
+    )
+    app.state.simulator = simulator
+    app.state.token_cache = TokenCache(
+        max_size=settings.security.token_cache_size,
+        ttl=settings.security.token_cache_ttl,
+    )
+    purge_worker = PurgeWorker(
+        purge=db.purge_deleted_risks,
+        logger=logger,
+        batch_size=settings.db.purge_batch_size,
+        interval=settings.db.purge_interval,
+        pause=settings.db.purge_pause,
+        release=db.pool.release,
+    )
+    history_archiver = PurgeWorker(
+        purge=functools.partial(
+            db.archive_history,
+            max_age_days=settings.history.hot_max_age_days,
+            keep_rows=settings.history.hot_max_rows,
+            chunk_rows=settings.history.archive_chunk_rows,
+        ),
+        logger=logger,
+        batch_size=settings.history.archive_batch_size,
+        interval=settings.history.archive_interval,
+        pause=settings.history.archive_pause,
+        name="cold risk history",
+        release=db.pool.release,
+    )
+    await app.state.async_db.run(app.state.reference_data.load)
+
+    yield
+
+    purge_worker.close()
+    history_archiver.close()
+
+    executor.shutdown(wait=True)
+    logger.info(f"Executor stopped: {executor.stats()}")
+    password_hasher.close()
+    logger.info(f"Password hasher stopped: {password_hasher.stats()}")
+    simulator.close()
+    db.close_connection()
+
 
 app = FastAPI(
     title=settings.server.title,
     docs_url=settings.server.docs_url,
-    openapi_url=settings.server.openapi_url
+    openapi_url=settings.server.openapi_url,
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -23,7 +104,8 @@ app.add_middleware(
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
-    allow_headers=["*"]
+    allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 
@@ -37,6 +119,13 @@ async def http_middleware(request: Request, call_next):
     )
 
     request.state.db = db
+    request.state.async_db = app.state.async_db
+    request.state.executor = app.state.executor
+    request.state.reference_data = app.state.reference_data
+    request.state.risk_matrix = app.state.risk_matrix
+    request.state.password_hasher = app.state.password_hasher
+    request.state.token_cache = app.state.token_cache
+    request.state.simulator = app.state.simulator
     request.state.settings = settings
     request.state.logger = logger
 
@@ -4,7 +4,6 @@ from dataclasses import dataclass
 
 from fastapi import HTTPException
 from jose import jwt
-from passlib.context import CryptContext
 from starlette import status
 
 from src.api.request.account import (
@@ -13,8 +12,9 @@ from src.api.request.account import (
     RequestSignUp,
 )
 from src.api.response.account import ResponseAccount, ResponseSignUp, Token
-from src.db.db import Database
+from src.db.async_db import AsyncDatabase
 from src.internal.config.config import Security
+from src.internal.security.password_hasher import PasswordHasher
 
 
 @dataclass
@@ -31,31 +31,31 @@ class User:
 class AccountService:
     def __init__(
             self,
-            db: Database,
-            pwd_context: CryptContext,
+            db: AsyncDatabase,
+            password_hasher: PasswordHasher,
             security: Security,
             logger: logging.Logger,
             oauth2_scheme,
     ) -> None:
         self.database = db
-        self.pwd_context = pwd_context
+        self.password_hasher = password_hasher
         self.access_token_expire_minutes = security.access_token_expire_minutes
         self.secret_key = security.secret_key
         self.algorithm = security.algorithm
         self.oauth2_scheme = oauth2_scheme
         self.logger = logger
 
-    def get_account_from_db(self, email: str):
+    async def get_account_from_db(self, email: str):
 
-        account = self.database.fetch_account_by_email(email)
+        account = await self.database.fetch_account_by_email(email)
         if account:
             return ResponseAccount(**account)
 
-    def hash_password(self, password: str) -> str:
-        return self.pwd_context.hash(password)
+    async def hash_password(self, password: str) -> str:
+        return await self.password_hasher.hash(password)
 
-    def verify(self, *, password: str, user_hashed_password: str) -> bool:
-        if not self.pwd_context.verify(password, user_hashed_password):
+    async def verify(self, *, password: str, user_hashed_password: str) -> bool:
+        if not await self.password_hasher.verify(password, user_hashed_password):
             return False
 
         return True
@@ -71,7 +71,7 @@ class AccountService:
     async def sign_in(self, email: str, password: str) -> Token:
         user = await self.get_user_by_email(email=email)
 
-        if not self.verify(password=password, user_hashed_password=user.password):
+        if not await self.verify(password=password, user_hashed_password=user.password):
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
 
         access_token_expires = datetime.timedelta(minutes=self.access_token_expire_minutes)
@@ -80,15 +80,15 @@ class AccountService:
 
     async def sign_up(self, account_in_db: RequestSignUp) -> ResponseSignUp:
 
-        email_already_registered = self.database.fetch_account_by_email(email=account_in_db.email)
+        email_already_registered = await self.database.fetch_account_by_email(email=account_in_db.email)
         if email_already_registered:
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
                 detail="Login is already registered in the system!",
             )
 
-        hashed_password = self.hash_password(account_in_db.password)
-        account_id = self.database.create_account(
+        hashed_password = await self.hash_password(account_in_db.password)
+        account_id = await self.database.create_account(
             name=account_in_db.name,
             email=account_in_db.email,
             project_name=account_in_db.projectName,
@@ -114,17 +114,17 @@ class AccountService:
 
     async def update_account(self, request_model: RequestPatchAccount, auth_account_id: int) -> ResponseAccount:
         if request_model.email is not None:
-            email_already_registered = self.database.fetch_account_by_email(email=request_model.email)
+            email_already_registered = await self.database.fetch_account_by_email(email=request_model.email)
 
             if email_already_registered:
-                email_by_id = self.database.fetch_email_by_id(auth_account_id)
+                email_by_id = await self.database.fetch_email_by_id(auth_account_id)
                 if email_by_id[0] != request_model.email:
                     raise HTTPException(
                         status_code=status.HTTP_409_CONFLICT,
                         detail="Login is already registered in the system!",
                     )
 
-        self.database.update_account(
+        await self.database.update_account(
             account_id=auth_account_id,
             email=request_model.email,
             name=request_model.name,
@@ -143,7 +143,7 @@ class AccountService:
         )
 
     async def get_user_by_id(self, auth_account_id: int) -> User:
-        user = self.database.fetch_account_by_id(account_id=auth_account_id)
+        user = await self.database.fetch_account_by_id(account_id=auth_account_id)
         if not user:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
 
@@ -158,7 +158,7 @@ class AccountService:
         )
 
     async def get_user_by_email(self, email: str) -> User:
-        user = self.database.fetch_account_by_email(email=email)
+        user = await self.database.fetch_account_by_email(email=email)
         if not user:
             self.logger.warning("User not found")
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
@@ -176,12 +176,12 @@ class AccountService:
     async def patch_password(self, request_model: RequestPatchPassword, auth_account_id: int) -> None:
         user = await self.get_user_by_id(auth_account_id=auth_account_id)
 
-        if not self.verify(
+        if not await self.verify(
                 password=request_model.currentPassword,
                 user_hashed_password=user.password,
         ):
             raise HTTPException(status_code=400, detail="Incorrect current password")
 
-        hashed_new_password = self.hash_password(request_model.newPassword)
-        self.database.update_account_password(account_id=auth_account_id, password=hashed_new_password)
+        hashed_new_password = await self.hash_password(request_model.newPassword)
+        await self.database.update_account_password(account_id=auth_account_id, password=hashed_new_password)
         return
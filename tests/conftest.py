@@ -2,16 +2,23 @@ import asyncio
 import logging
 import os
 from sqlite3 import Cursor, Connection
-from typing import Generator
+from typing import Callable, Generator
 
 import pytest
 from fastapi import FastAPI, Request
 from fastapi.testclient import TestClient
 
 from src.api.routes.routers import router as account_router
+from src.db.async_db import AsyncDatabase
 from src.db.db import Database
+from src.db.reference_data import ReferenceDataCache
+from src.db.risk_matrix import RiskMatrixCache
 from src.internal.config.config import Settings
+from src.internal.executor.executor import BoundedExecutor
 from src.internal.log.log import logger as _logger
+from src.internal.security.password_hasher import PasswordHasher
+from src.internal.security.token_cache import TokenCache
+from src.internal.simulation.monte_carlo import RiskSimulator
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -42,12 +49,61 @@ def logger() -> logging.Logger:
 
 @pytest.fixture(scope="session")
 def database(settings, logger) -> Database:
-    db = Database(path=settings.db.path, logger=logger)
+    db = Database(
+        path=settings.db.path,
+        logger=logger,
+        pool_size=settings.db.pool_size,
+        pragmas=settings.db.pragmas.model_dump(),
+    )
     db.drop_tables_with_dynamic_data()
     db.create_tables_and_fill_data()
     return db
 
 
+@pytest.fixture(scope="session")
+def executor(settings) -> Generator:
+    executor = BoundedExecutor(max_workers=settings.executor.max_workers, thread_name_prefix="db")
+    yield executor
+    executor.shutdown(wait=True)
+
+
+@pytest.fixture(scope="session")
+def async_database(database, executor) -> AsyncDatabase:
+    return AsyncDatabase(db=database, executor=executor)
+
+
+@pytest.fixture(scope="session")
+def reference_data(database, logger) -> ReferenceDataCache:
+    return ReferenceDataCache(db=database, logger=logger)
+
+
+@pytest.fixture(scope="session")
+def risk_matrix(database, logger) -> RiskMatrixCache:
+    return RiskMatrixCache(db=database, logger=logger)
+
+
+@pytest.fixture(scope="session")
+def password_hasher(settings) -> Generator:
+    password_hasher = PasswordHasher(
+        max_workers=settings.security.password_hash_workers,
+        max_concurrency=settings.security.password_hash_max_concurrency,
+    )
+    yield password_hasher
+    password_hasher.close()
+
+
+@pytest.fixture(scope="session")
+def token_cache(settings) -> TokenCache:
+    return TokenCache(max_size=settings.security.token_cache_size, ttl=settings.security.token_cache_ttl)
+
+
+@pytest.fixture(scope="session")
+def simulator(settings) -> Generator:
+    simulator = RiskSimulator(max_workers=settings.simulation.max_workers, cache_size=settings.simulation.cache_size)
+    yield simulator
+    simulator.close()
+
+
 @pytest.fixture(scope="session")
 def cursor(database) -> Cursor:
     return database.cursor
@@ -59,7 +115,8 @@ def connection(database) -> Connection:
 
 
 @pytest.fixture(scope="session")
-def app(settings, database, logger) -> FastAPI:
+def app(settings, database, async_database, executor, reference_data, risk_matrix, password_hasher, token_cache,
+        simulator, logger) -> FastAPI:
     app = FastAPI(
         title=settings.server.title,
         docs_url=settings.server.docs_url,
@@ -68,6 +125,13 @@ def app(settings, database, logger) -> FastAPI:
     @app.middleware("http")
     async def http_middleware(request: Request, call_next):
         request.state.db = database
+        request.state.async_db = async_database
+        request.state.executor = executor
+        request.state.reference_data = reference_data
+        request.state.risk_matrix = risk_matrix
+        request.state.password_hasher = password_hasher
+        request.state.token_cache = token_cache
+        request.state.simulator = simulator
         request.state.settings = settings
         request.state.logger = logger
 
@@ -84,3 +148,24 @@ def client(app, database) -> Generator:
     with TestClient(app) as client:
         yield client
         database.drop_tables_with_dynamic_data()
+
+
+@pytest.fixture
+def signed_up(client) -> Callable[[str], dict[str, str]]:
+    """
+    Sign up a fresh account for `project_id`, email "<project_id in lower case>@risks.com", and return its
+    Authorization header.
+    """
+    def sign_up(project_id: str) -> dict[str, str]:
+        response = client.post("/api/auth/sign-up", json={
+            "email": f"{project_id.lower()}@risks.com",
+            "password": "123446",
+            "name": "12345",
+            "projectName": "Name",
+            "projectDescription": "Desc",
+            "projectId": project_id,
+        })
+        assert response.status_code == 200
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    return sign_up
@@ -0,0 +1,47 @@
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import pytest
+
+from src.db.group_commit import GroupCommitter
+
+
+def test_group_commit_keeps_units_atomic(tmp_path, logger):
+    connection = sqlite3.connect(tmp_path / "group_commit.db", check_same_thread=False)
+    connection.execute("CREATE TABLE items (id INTEGER PRIMARY KEY)")
+
+    commits = []
+
+    @contextmanager
+    def transaction():
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection.cursor()
+        except BaseException:
+            connection.rollback()
+            raise
+        else:
+            connection.commit()
+            commits.append(1)
+
+    def insert(*ids):
+        def work(cursor):
+            for id_ in ids:
+                cursor.execute("INSERT INTO items (id) VALUES (?)", (id_,))
+        return work
+
+    committer = GroupCommitter(transaction=transaction, logger=logger, window=0.2)
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        ok = executor.submit(committer.submit, insert(1))
+        duplicate = executor.submit(committer.submit, insert(2, 2))
+        other = executor.submit(committer.submit, insert(3))
+
+        ok.result()
+        other.result()
+        with pytest.raises(sqlite3.IntegrityError):
+            duplicate.result()
+    committer.close()
+
+    assert [row[0] for row in connection.execute("SELECT id FROM items ORDER BY id")] == [1, 3]
+    assert len(commits) == 1
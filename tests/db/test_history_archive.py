@@ -0,0 +1,13 @@
+from src.db.history_archive import decode_history_batch, encode_history_batch
+
+
+def test_history_batch_round_trip():
+    entries = [
+        ("2024-01-01 10:00:00", "описание", "старое " * 200, "новое " * 200, id_, id_ - 1 if id_ > 1 else None)
+        for id_ in range(1, 65)
+    ]
+
+    payload = encode_history_batch(entries)
+
+    assert decode_history_batch(payload) == entries
+    assert len(payload) < sum(len(entry[2].encode()) + len(entry[3].encode()) for entry in entries) / 10
@@ -0,0 +1,71 @@
+import sqlite3
+
+from src.db.migrations import MIGRATIONS, Migrator
+
+
+def test_migrate_applies_every_version_once(tmp_path, logger):
+    connection = sqlite3.connect(tmp_path / "migrations.db")
+    migrator = Migrator(logger=logger)
+
+    assert migrator.migrate(connection) == [migration.version for migration in MIGRATIONS]
+    assert migrator.current_version(connection) == migrator.latest_version
+    assert migrator.migrate(connection) == []
+
+    assert connection.execute("SELECT COUNT(*) FROM probability").fetchone()[0] == 5
+    assert connection.execute("SELECT COUNT(*) FROM risk_types").fetchone()[0] == 7
+
+
+def test_migrate_upserts_seeds_over_legacy_tables(tmp_path, logger):
+    connection = sqlite3.connect(tmp_path / "migrations.db")
+    connection.execute("CREATE TABLE risk_status (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL)")
+    connection.execute("INSERT INTO risk_status (id, name) VALUES (1, 'old name')")
+    connection.commit()
+
+    Migrator(logger=logger).migrate(connection)
+
+    assert connection.execute("SELECT id, name FROM risk_status ORDER BY id").fetchall() == [
+        (1, "Открыто"), (2, "Выполняется"), (3, "Закрыто"),
+    ]
+
+
+def test_migrate_starts_risk_id_sequences_past_used_numbers(tmp_path, logger):
+    connection = sqlite3.connect(tmp_path / "migrations.db")
+    Migrator(logger=logger, migrations=tuple(m for m in MIGRATIONS if m.version < 11)).migrate(connection)
+    connection.execute(
+        "INSERT INTO accounts (id, email, password, name, projectName, projectId) VALUES (1, 'a', 'p', 'n', 'n', 'PRJ')")
+    connection.executemany(
+        "INSERT INTO risks (id, name, account_id, risk_factor_id, risk_type_id, risk_management_method_id)"
+        " VALUES (?, 'name', 1, 1, 1, 1)",
+        [("PRJ-0007",), ("PRJ-99999999999999999999",), ("PRJ-x",)],
+    )
+    connection.commit()
+
+    Migrator(logger=logger).migrate(connection)
+
+    assert connection.execute("SELECT account_id, last_value FROM risk_id_sequences").fetchall() == [(1, 7)]
+
+
+def test_migrate_attributes_legacy_history_only_to_a_single_owner(tmp_path, logger):
+    connection = sqlite3.connect(tmp_path / "migrations.db")
+    Migrator(logger=logger, migrations=tuple(m for m in MIGRATIONS if m.version < 8)).migrate(connection)
+    connection.executemany(
+        "INSERT INTO accounts (id, email, password, name, projectName, projectId) VALUES (?, ?, 'p', 'n', 'n', 'AAA')",
+        [(1, "a"), (2, "b")],
+    )
+    connection.executemany(
+        "INSERT INTO risks (id, name, account_id, risk_factor_id, risk_type_id, risk_management_method_id)"
+        " VALUES (?, 'name', ?, 1, 1, 1)",
+        [("AAA-0001", 1), ("AAA-0001", 2), ("AAA-0002", 2)],
+    )
+    connection.executemany(
+        "INSERT INTO history_log_risks (risk_id, updated_column_name, old_data, new_data) VALUES (?, 'название', 'a', 'b')",
+        [("AAA-0001",), ("AAA-0002",)],
+    )
+    connection.commit()
+
+    Migrator(logger=logger).migrate(connection)
+
+    assert connection.execute(
+        "SELECT risk_id, account_id, change_set_id IS NOT NULL FROM history_log_risks ORDER BY id").fetchall() == [
+        ("AAA-0001", None, 0), ("AAA-0002", 2, 1),
+    ]
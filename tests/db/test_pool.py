@@ -0,0 +1,50 @@
+import threading
+
+from src.db.pool import ConnectionPool, PoolTimeoutError
+
+
+def test_pool_gives_each_thread_its_own_connection(tmp_path, logger):
+    pool = ConnectionPool(path=str(tmp_path / "pool.db"), logger=logger, size=2)
+    main_connection = pool.get().connection
+    assert pool.get().connection is main_connection
+
+    other = {}
+    thread = threading.Thread(target=lambda: other.setdefault("connection", pool.get().connection))
+    thread.start()
+    thread.join()
+
+    assert other["connection"] is not main_connection
+    pool.close()
+
+
+def test_pool_reclaims_connection_of_finished_thread(tmp_path, logger):
+    pool = ConnectionPool(path=str(tmp_path / "pool.db"), logger=logger, size=1, timeout=0.1)
+
+    seen = []
+    for _ in range(2):
+        thread = threading.Thread(target=lambda: seen.append(pool.get().connection))
+        thread.start()
+        thread.join()
+
+    assert seen[0] is seen[1]
+    pool.close()
+
+
+def test_pool_times_out_when_exhausted(tmp_path, logger):
+    pool = ConnectionPool(path=str(tmp_path / "pool.db"), logger=logger, size=1, timeout=0.1)
+    pool.get()
+
+    errors = []
+
+    def checkout():
+        try:
+            pool.get()
+        except PoolTimeoutError as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=checkout)
+    thread.start()
+    thread.join()
+
+    assert len(errors) == 1
+    pool.close()
@@ -0,0 +1,49 @@
+import threading
+
+from src.db.purge import PurgeWorker
+
+
+def test_purge_worker_drains_in_batches(logger):
+    remaining = [1200]
+    calls = []
+
+    def purge(batch_size):
+        removed = min(batch_size, remaining[0])
+        remaining[0] -= removed
+        calls.append(removed)
+        return removed
+
+    worker = PurgeWorker(purge=purge, logger=logger, batch_size=500, interval=60.0, pause=0.0)
+    try:
+        assert worker.drain() == 1200
+        assert calls == [500, 500, 200, 0]
+    finally:
+        worker.close()
+    assert not worker.thread.is_alive()
+
+
+def test_purge_worker_stops_on_error(logger):
+    def purge(batch_size):
+        raise RuntimeError("database is locked")
+
+    worker = PurgeWorker(purge=purge, logger=logger, interval=60.0)
+    try:
+        assert worker.drain() == 0
+    finally:
+        worker.close()
+
+
+def test_purge_worker_releases_connection_after_each_round(logger):
+    rounds = threading.Event()
+    released = []
+
+    def release():
+        released.append(threading.current_thread().name)
+        rounds.set()
+
+    worker = PurgeWorker(purge=lambda batch_size: 0, logger=logger, interval=0.01, release=release)
+    try:
+        assert rounds.wait(timeout=5)
+    finally:
+        worker.close()
+    assert released and set(released) == {"db-purge"}
@@ -0,0 +1,16 @@
+import math
+
+from src.db.scoring import compute_scores
+
+
+def test_compute_scores_multiplies_scale_values():
+    scores = compute_scores(
+        probability_ids=[1, 2, None, 9],
+        impact_ids=[2, 2, 1, 1],
+        probability_values={1: 0.2, 2: 0.4},
+        impact_values={1: 0.5, 2: 1.0},
+    ).tolist()
+
+    assert scores[:2] == [0.2, 0.4]
+    assert math.isnan(scores[2])
+    assert math.isnan(scores[3])
@@ -0,0 +1,18 @@
+import asyncio
+
+from src.internal.executor.executor import BoundedExecutor
+
+
+def test_bounded_executor_runs_and_records_stats():
+    executor = BoundedExecutor(max_workers=2, thread_name_prefix="test")
+
+    async def main():
+        return await asyncio.gather(*[executor.run(pow, i, 2) for i in range(5)])
+
+    assert asyncio.run(main()) == [0, 1, 4, 9, 16]
+
+    stats = executor.stats()
+    assert stats.completed == 5
+    assert stats.queued == 0
+    assert stats.active == 0
+    executor.shutdown(wait=True)
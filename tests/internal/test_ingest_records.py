@@ -0,0 +1,37 @@
+import asyncio
+
+from src.internal.ingest.records import iter_records
+
+
+def parse(chunks: list[bytes], format_: str, max_length: int) -> list[tuple]:
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+
+    async def main():
+        return [(record.line, record.data, record.error) async for record in iter_records(
+            stream(), format_, max_length=max_length)]
+
+    return asyncio.run(main())
+
+
+def test_iter_records_fails_overlong_ndjson_line_and_resumes():
+    chunks = [b'{"id": "a"}\n{"id": "', b"x" * 40, b"x" * 40, b'"}\n{"id": "b"}']
+
+    records = parse(chunks, "ndjson", max_length=32)
+
+    assert records == [
+        (1, {"id": "a"}, None),
+        (2, None, "Line longer than 32 characters"),
+        (3, {"id": "b"}, None),
+    ]
+
+
+def test_iter_records_resynchronises_csv_after_stray_quote():
+    rows = [b"id,name\n", b'a,"broken\n'] + [f"r{i},name {i}\n".encode() for i in range(10)]
+
+    records = parse(rows, "csv", max_length=40)
+
+    assert records[0] == (2, None, "Invalid CSV: record longer than 40 characters")
+    assert [record[1]["id"] for record in records[1:]] == [f"r{i}" for i in range(10)]
+    assert [record[0] for record in records[1:]] == list(range(3, 13))
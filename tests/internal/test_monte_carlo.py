@@ -0,0 +1,16 @@
+import math
+
+from src.internal.simulation.monte_carlo import SimulationParams, simulate
+
+
+def test_simulate_matches_expected_loss():
+    params = SimulationParams(trials=200_000, percentiles=(0, 50, 100), var_level=0.95)
+
+    result = simulate(groups=[(0.5, 1.0, 10)], ranged=[(0.25, 2.0, 6.0)], params=params, seed=1)
+
+    # 10 * 0.5 * 1.0 from the group, 0.25 * (2 + 6) / 2 from the ranged risk
+    assert result.risks == 11
+    assert math.isclose(result.mean, 6.0, rel_tol=0.01)
+    assert result.percentiles[0] == (0, 0.0)
+    assert result.percentiles[-1][1] <= 16.0
+    assert result.expected_shortfall >= result.var
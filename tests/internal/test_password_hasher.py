@@ -0,0 +1,23 @@
+import asyncio
+
+from src.internal.security.password_hasher import PasswordHasher
+
+
+def test_password_hasher_hashes_off_loop_and_records_stats():
+    password_hasher = PasswordHasher(max_workers=1, max_concurrency=2)
+
+    async def main():
+        hashed = await password_hasher.hash("secret")
+        return await asyncio.gather(
+            password_hasher.verify("secret", hashed),
+            password_hasher.verify("wrong", hashed),
+            password_hasher.verify("secret", hashed),
+        )
+
+    assert asyncio.run(main()) == [True, False, True]
+
+    stats = password_hasher.stats()
+    assert stats.completed == 4
+    assert stats.waiting == 0
+    assert stats.running == 0
+    password_hasher.close()
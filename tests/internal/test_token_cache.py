@@ -0,0 +1,17 @@
+import time
+
+from src.internal.security.token_cache import TokenCache
+
+
+def test_token_cache_expires_and_evicts():
+    token_cache = TokenCache(max_size=2, ttl=60)
+
+    token_cache.put("a", 1, exp=time.time() + 30)
+    token_cache.put("expired", 1, exp=time.time() - 1)
+    assert token_cache.get("a") == 1
+    assert token_cache.get("expired") is None
+
+    token_cache.put("b", 2, exp=None)
+    token_cache.put("c", 2, exp=None)
+    assert token_cache.get("a") is None
+    assert len(token_cache) == 2
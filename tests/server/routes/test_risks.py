@@ -1,7 +1,15 @@
+import csv
+import io
+import json
+import math
+from concurrent.futures import ThreadPoolExecutor
+import sqlite3
 from sqlite3 import Cursor, Connection
 
 from starlette.testclient import TestClient
 
+from src.internal.pagination.cursor import encode_cursor
+
 
 def test_types(client: TestClient):
     response = client.get(f"/api/risks/types")
@@ -36,7 +44,7 @@ def test_methods(client: TestClient):
     assert len(response.json()) > 0
 
 
-def test_risks(client: TestClient, cursor: Cursor, connection: Connection):
+def test_risks(client: TestClient, cursor: Cursor, connection: Connection, database):
     ids = list()
     cursor.execute("DELETE FROM accounts;")
     connection.commit()
@@ -133,6 +141,12 @@ def test_risks(client: TestClient, cursor: Cursor, connection: Connection):
     response = client.delete(f"/api/risks/{new_id}", headers=auth)
     assert response.status_code == 200
 
+    count_risk_db = cursor.execute(
+        "SELECT COUNT(*) FROM risks WHERE deleted_at IS NULL"
+    )
+    assert count_risk_db.fetchone()[0] == 1
+
+    assert database.purge_deleted_risks() == 1
     count_risk_db = cursor.execute(
         "SELECT COUNT(*) FROM risks"
     )
@@ -239,6 +253,17 @@ def test_risks(client: TestClient, cursor: Cursor, connection: Connection):
     assert response.status_code == 200
     assert len(response.json()['history']) == 22
 
+    history = []
+    params = {"limit": 10}
+    while True:
+        response = client.get(f"/api/risks/{risk_id}/history", headers=auth, params=params)
+        assert response.status_code == 200
+        history += response.json()['history']
+        if response.json()['next_before_id'] is None:
+            break
+        params["before_id"] = response.json()['next_before_id']
+    assert len(history) == 22
+
     payload = {
         "id": risk_id,
         "name": "asasa"
@@ -343,8 +368,483 @@ def test_risks(client: TestClient, cursor: Cursor, connection: Connection):
     response = client.delete(f"/api/risks/{risk_id}", headers=auth)
     assert response.status_code == 200
 
+    response = client.get(f"/api/risks/{risk_id}/history", headers=auth)
+    assert response.status_code == 404
+
+    assert database.purge_deleted_risks(batch_size=1) == 1
+    assert database.purge_deleted_risks() != 0
+    assert database.purge_deleted_risks() == 0
+
     count_history_risks_db = cursor.execute(f"SELECT COUNT(*) FROM history_log_risks WHERE risk_id = '{risk_id}'").fetchone()[0]
     assert count_history_risks_db == 0
 
     count_risk_db = cursor.execute(f"SELECT COUNT(*) FROM risks WHERE id = '{risk_id}'").fetchone()[0]
     assert count_risk_db == 0
+
+
+def test_risks_cursor_pagination(client: TestClient, signed_up):
+    auth = signed_up("CUR")
+
+    ids = [f"CUR-000{i}" for i in range(1, 6)]
+    for risk_id in ids:
+        payload = {
+            "id": risk_id,
+            "name": "string1",
+            "factor_id": 1,
+            "type_id": 1,
+            "method_id": 1,
+            "probability_id": 1,
+            "impact_id": 1,
+        }
+        response = client.post(f"/api/risks", headers=auth, json=payload)
+        assert response.status_code == 200
+
+    seen = []
+    response = client.get(f"/api/risks", headers=auth, params={"limit": 2})
+    while True:
+        assert response.status_code == 200
+        seen += [r['id'] for r in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        response = client.get(f"/api/risks", headers=auth, params={"limit": 2, "cursor": cursor})
+
+    assert sorted(seen) == ids
+
+    response = client.get(f"/api/risks", headers=auth, params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+    for cursor in (encode_cursor("-created_at", {"a": 1}, "x"), encode_cursor("-created_at", "2024-01-01", 1)):
+        response = client.get(f"/api/risks", headers=auth, params={"cursor": cursor})
+        assert response.status_code == 400
+
+
+def test_risks_bulk(client: TestClient, signed_up):
+    auth = signed_up("BLK")
+
+    body = "\n".join([
+        '{"id": "BLK-0001", "name": "string1", "factor_id": 1, "type_id": 1, "method_id": 1, "probability_id": 1, "impact_id": 1}',
+        '{"id": "BLK-0002", "name": "st", "factor_id": 1, "type_id": 1, "method_id": 1, "probability_id": 1, "impact_id": 1}',
+        'not json',
+        '{"id": "BLK-0001", "name": "string1", "factor_id": 1, "type_id": 1, "method_id": 1, "probability_id": 1, "impact_id": 1}',
+        '{"id": "BLK-0003", "name": "string3", "factor_id": 999, "type_id": 1, "method_id": 1, "probability_id": 1, "impact_id": 1}',
+    ])
+    response = client.post("/api/risks/bulk", headers=auth | {"Content-Type": "application/x-ndjson"}, content=body)
+    assert response.status_code == 200
+    report = response.json()
+    assert report["created"] == 1
+    assert report["failed"] == 4
+    assert [row["created"] for row in report["rows"]] == [True, False, False, False, False]
+    assert [row["line"] for row in report["rows"]] == [1, 2, 3, 4, 5]
+
+    body = (
+        "id,name,description,factor_id,type_id,method_id,probability_id,impact_id\n"
+        'BLK-0001,string1,,1,1,1,1,1\n'
+        'BLK-0004,string4,"multi\nline",1,1,1,1,1\n'
+    )
+    response = client.post("/api/risks/bulk", headers=auth | {"Content-Type": "text/csv"}, content=body)
+    assert response.status_code == 200
+    report = response.json()
+    assert report["created"] == 1
+    assert report["rows"][0]["error"] == "Risk id is already exist"
+
+    response = client.get(f"/api/risks", headers=auth)
+    assert response.status_code == 200
+    risks = {risk["id"]: risk for risk in response.json()}
+    assert sorted(risks) == ["BLK-0001", "BLK-0004"]
+    assert risks["BLK-0004"]["description"] == "multi\nline"
+
+
+def test_risks_export(client: TestClient, signed_up):
+    auth = signed_up("EXP")
+
+    body = "\n".join(
+        json.dumps({"id": f"EXP-000{i}", "name": f"string{i}", "description": "a, \"b\"", "factor_id": 1,
+                    "type_id": 1, "method_id": 1, "probability_id": 2, "impact_id": 1})
+        for i in range(1, 4)
+    )
+    response = client.post("/api/risks/bulk", headers=auth, content=body)
+    assert response.json()["created"] == 3
+
+    response = client.get("/api/risks/export", headers=auth)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(record["id"] for record in records) == ["EXP-0001", "EXP-0002", "EXP-0003"]
+    assert records[0]["probability_id"] == 2
+    assert records[0]["probability"]
+
+    response = client.get("/api/risks/export", headers=auth, params={"format": "csv"})
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 3
+    assert rows[0]["description"] == "a, \"b\""
+
+
+def test_risks_matrix(client: TestClient, database, signed_up):
+    auth = signed_up("MAT")
+
+    body = "\n".join(
+        json.dumps({"id": f"MAT-000{i}", "name": f"string{i}", "factor_id": 1, "type_id": 1 + i % 2,
+                    "method_id": 1, "probability_id": 1 + i % 2, "impact_id": 1})
+        for i in range(1, 4)
+    )
+    response = client.post("/api/risks/bulk", headers=auth, content=body)
+    assert response.json()["created"] == 3
+
+    response = client.get("/api/risks/matrix", headers=auth, params={"with_ids": True})
+    assert response.status_code == 200
+    matrix = response.json()
+    assert matrix["total"] == 3
+    cells = {(cell["probability"]["id"], cell["impact"]["id"]): cell for cell in matrix["cells"]}
+    assert cells[(1, 1)]["count"] == 1
+    assert sorted(cells[(2, 1)]["risk_ids"]) == ["MAT-0001", "MAT-0003"]
+    assert [(group["id"], group["count"]) for group in matrix["by_type"]] == [(1, 1), (2, 2)]
+    assert matrix["by_status"][0]["count"] == 3
+
+    response = client.patch("/api/risks", headers=auth, json={"id": "MAT-0002", "probability_id": 2})
+    assert response.status_code == 200
+
+    response = client.get("/api/risks/matrix", headers=auth)
+    cells = {(cell["probability"]["id"], cell["impact"]["id"]): cell for cell in response.json()["cells"]}
+    assert list(cells) == [(2, 1)]
+    assert cells[(2, 1)]["count"] == 3
+    assert cells[(2, 1)]["risk_ids"] is None
+
+    # a write by another worker's connection, which no in-process listener hears about
+    connection = sqlite3.connect(database.get_path())
+    connection.execute(
+        "UPDATE risks SET impact_id = 2,"
+        " score = (SELECT value FROM probability WHERE id = probability_id) * (SELECT value FROM impact WHERE id = 2)"
+        " WHERE id = 'MAT-0002' AND account_id = (SELECT id FROM accounts WHERE email = ?)",
+        ("mat@risks.com",),
+    )
+    connection.commit()
+    connection.close()
+
+    response = client.get("/api/risks/matrix", headers=auth)
+    cells = {(cell["probability"]["id"], cell["impact"]["id"]): cell["count"] for cell in response.json()["cells"]}
+    assert cells == {(2, 1): 2, (2, 2): 1}
+
+
+def test_risks_score(client: TestClient, database, signed_up):
+    auth = signed_up("SCO")
+
+    body = "\n".join(
+        json.dumps({"id": f"SCO-000{i}", "name": f"string{i}", "factor_id": 1, "type_id": 1, "method_id": 1,
+                    "probability_id": i, "impact_id": 5})
+        for i in range(1, 6)
+    )
+    response = client.post("/api/risks/bulk", headers=auth, content=body)
+    assert response.json()["created"] == 5
+
+    response = client.get("/api/risks", headers=auth, params={"sort": "-score", "min_score": 0.5})
+    assert response.status_code == 200
+    assert [(risk["id"], risk["score"]) for risk in response.json()] == [
+        ("SCO-0005", 1), ("SCO-0004", 0.8), ("SCO-0003", 0.6),
+    ]
+
+    response = client.patch("/api/risks", headers=auth, json={"id": "SCO-0001", "impact_id": 1})
+    assert response.status_code == 200
+    assert math.isclose(response.json()["score"], 0.04)
+
+    seen = []
+    response = client.get("/api/risks", headers=auth, params={"sort": "score", "limit": 2})
+    while True:
+        assert response.status_code == 200
+        seen += [risk["id"] for risk in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        response = client.get("/api/risks", headers=auth, params={"sort": "score", "limit": 2, "cursor": cursor})
+    assert seen == ["SCO-0001", "SCO-0002", "SCO-0003", "SCO-0004", "SCO-0005"]
+
+    response = client.get("/api/risks", headers=auth, params={"sort": "-score", "cursor": cursor or "x"})
+    assert response.status_code == 400
+
+    database.cursor.execute("UPDATE risks SET score = NULL WHERE id = 'SCO-0005'")
+    database.connection.commit()
+    assert database.recompute_scores() == 1
+    response = client.get("/api/risks", headers=auth, params={"sort": "-score", "limit": 1})
+    assert response.json()[0]["id"] == "SCO-0005"
+
+
+def test_risks_simulate(client: TestClient, signed_up):
+    auth = signed_up("SIM")
+
+    body = "\n".join(
+        json.dumps({"id": f"SIM-000{i}", "name": f"string{i}", "factor_id": 1, "type_id": 1, "method_id": 1,
+                    "probability_id": 5, "impact_id": i})
+        for i in range(1, 4)
+    )
+    response = client.post("/api/risks/bulk", headers=auth, content=body)
+    assert response.json()["created"] == 3
+
+    # probability 1: every risk always occurs
+    request = {"trials": 1_000, "cost_ranges": [{"risk_id": "SIM-0003", "low": 10, "high": 10}]}
+    response = client.post("/api/risks/simulate", headers=auth, json=request)
+    assert response.status_code == 200
+    result = response.json()
+    assert result["risks"] == 3
+    assert math.isclose(result["mean"], 0.2 + 0.4 + 10, rel_tol=1e-6)
+    assert [percentile["percentile"] for percentile in result["percentiles"]] == [50, 90, 95, 99]
+
+    assert client.post("/api/risks/simulate", headers=auth, json=request).json() == result
+
+    request = {"cost_ranges": [{"risk_id": "SIM-0009", "low": 1, "high": 2}]}
+    response = client.post("/api/risks/simulate", headers=auth, json=request)
+    assert response.status_code == 422
+
+    request = {"cost_ranges": [{"risk_id": "SIM-0001", "low": 2, "high": 1}]}
+    response = client.post("/api/risks/simulate", headers=auth, json=request)
+    assert response.status_code == 422
+
+
+def test_risks_filters_and_sort(client: TestClient, signed_up):
+    auth = signed_up("FLT")
+
+    body = "\n".join(
+        json.dumps({"id": f"FLT-000{i}", "name": f"risk {chr(ord('e') - i)}", "factor_id": 1, "type_id": i,
+                    "method_id": 1, "probability_id": 1, "impact_id": 1, "status_id": 1 + i % 3})
+        for i in range(1, 5)
+    )
+    response = client.post("/api/risks/bulk", headers=auth, content=body)
+    assert response.json()["created"] == 4
+
+    response = client.get("/api/risks", headers=auth, params={"type_id": [1, 2, 4], "status_id": [1, 2]})
+    assert response.status_code == 200
+    assert sorted(risk["id"] for risk in response.json()) == ["FLT-0001", "FLT-0004"]
+
+    response = client.get("/api/risks", headers=auth, params={"sort": "name"})
+    assert [risk["id"] for risk in response.json()] == ["FLT-0004", "FLT-0003", "FLT-0002", "FLT-0001"]
+
+    seen = []
+    response = client.get("/api/risks", headers=auth, params={"sort": "-name", "limit": 3})
+    while True:
+        seen += [risk["id"] for risk in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        response = client.get("/api/risks", headers=auth, params={"sort": "-name", "limit": 3, "cursor": cursor})
+    assert seen == ["FLT-0001", "FLT-0002", "FLT-0003", "FLT-0004"]
+
+    response = client.patch("/api/risks", headers=auth, json={"id": "FLT-0002"})
+    assert response.status_code == 200
+    response = client.get("/api/risks", headers=auth, params={"sort": "-updated_at", "limit": 1})
+    assert response.status_code == 200
+    assert len(response.json()) == 1
+
+
+def test_risks_search(client: TestClient, database, signed_up):
+    auth = signed_up("SRC")
+
+    risks = [
+        ("SRC-0001", "Пожар на складе", "Возгорание складских помещений", None),
+        ("SRC-0002", "Срыв сроков", "Поставщик не успевает", "возможен пожар у поставщика"),
+        ("SRC-0003", "Утечка данных", None, None),
+    ]
+    body = "\n".join(
+        json.dumps({"id": id_, "name": name, "description": description, "comment": comment, "factor_id": 1,
+                    "type_id": 1, "method_id": 1, "probability_id": 1, "impact_id": 1})
+        for id_, name, description, comment in risks
+    )
+    response = client.post("/api/risks/bulk", headers=auth, content=body)
+    assert response.json()["created"] == 3
+
+    response = client.get("/api/risks/search", headers=auth, params={"q": "пожар"})
+    assert response.status_code == 200
+    hits = response.json()
+    assert [hit["risk"]["id"] for hit in hits] == ["SRC-0001", "SRC-0002"]
+    assert "<mark>Пожар</mark>" in hits[0]["snippet"]
+
+    response = client.get("/api/risks/search", headers=auth, params={"q": "пожар", "limit": 1})
+    cursor = response.headers["X-Next-Cursor"]
+    response = client.get("/api/risks/search", headers=auth, params={"q": "пожар", "limit": 1, "cursor": cursor})
+    assert [hit["risk"]["id"] for hit in response.json()] == ["SRC-0002"]
+
+    for cursor in (encode_cursor("x", {}), encode_cursor(-1.5, None), encode_cursor(None, "SRC-0001")):
+        response = client.get("/api/risks/search", headers=auth, params={"q": "пожар", "cursor": cursor})
+        assert response.status_code == 400
+
+    response = client.patch("/api/risks", headers=auth, json={"id": "SRC-0003", "name": "Пожар в серверной"})
+    assert response.status_code == 200
+    response = client.get("/api/risks/search", headers=auth, params={"q": "серверн"})
+    assert [hit["risk"]["id"] for hit in response.json()] == ["SRC-0003"]
+
+    response = client.get("/api/risks/search", headers=auth, params={"q": "\" OR *"})
+    assert response.status_code == 200
+    assert response.json() == []
+
+    # the account id is indexed for scoping only, user words never match it
+    account_id = database.cursor.execute("SELECT id FROM accounts WHERE email = ?", ("src@risks.com",)).fetchone()[0]
+    response = client.get("/api/risks/search", headers=auth, params={"q": str(account_id)})
+    assert response.json() == []
+
+    other_auth = signed_up("SRD")
+    response = client.get("/api/risks/search", headers=other_auth, params={"q": "пожар"})
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+def test_risks_bulk_patch(client: TestClient, cursor: Cursor, signed_up):
+    auth = signed_up("BPT")
+
+    body = "\n".join(
+        json.dumps({"id": f"BPT-000{i}", "name": f"string{i}", "factor_id": 1, "type_id": 1, "method_id": 1,
+                    "probability_id": 1, "impact_id": 1})
+        for i in range(1, 4)
+    )
+    response = client.post("/api/risks/bulk", headers=auth, content=body)
+    assert response.json()["created"] == 3
+
+    updates = [
+        {"id": "BPT-0003", "status_id": 2},
+        {"id": "BPT-0001", "status_id": 3, "probability_id": 5},
+        {"id": "BPT-0002", "status_id": 2},
+        {"id": "BPT-0009", "status_id": 2},
+    ]
+    response = client.patch("/api/risks/bulk", headers=auth, json=updates)
+    assert response.status_code == 200
+    result = response.json()
+    assert [risk["id"] for risk in result["updated"]] == ["BPT-0003", "BPT-0001", "BPT-0002"]
+    assert [risk["status"]["id"] for risk in result["updated"]] == [2, 3, 2]
+    assert result["updated"][1]["score"] == 0.2
+    assert result["not_found"] == ["BPT-0009"]
+
+    history = cursor.execute(
+        "SELECT COUNT(*) FROM history_log_risks WHERE risk_id IN ('BPT-0001', 'BPT-0002', 'BPT-0003')"
+    ).fetchone()[0]
+    assert history == 4
+
+    change_sets = cursor.execute(
+        "SELECT c.id, c.prev_change_set_id, COUNT(h.id) FROM history_change_sets AS c"
+        " JOIN history_log_risks AS h ON h.change_set_id = c.id"
+        " JOIN accounts AS a ON a.id = c.account_id"
+        " WHERE c.risk_id = 'BPT-0001' AND a.projectId = 'BPT' GROUP BY c.id"
+    ).fetchall()
+    assert len(change_sets) == 1
+    assert change_sets[0][1] is None and change_sets[0][2] == 2
+    last_change_set_id = cursor.execute(
+        "SELECT last_change_set_id FROM risks WHERE id = 'BPT-0001' AND account_id = ("
+        "SELECT id FROM accounts WHERE projectId = 'BPT')"
+    ).fetchone()[0]
+    assert last_change_set_id == change_sets[0][0]
+
+    response = client.patch("/api/risks/bulk", headers=auth, json=[{"id": "BPT-0001"}, {"id": "BPT-0001"}])
+    assert response.status_code == 422
+
+
+def test_risks_history_archive(client: TestClient, cursor: Cursor, database, signed_up):
+    auth = signed_up("ARC")
+
+    risk = {"id": "ARC-0001", "name": "name0", "factor_id": 1, "type_id": 1, "method_id": 1, "probability_id": 1,
+            "impact_id": 1}
+    response = client.post("/api/risks", headers=auth, json=risk)
+    assert response.status_code == 200
+    for i in range(1, 11):
+        response = client.patch("/api/risks", headers=auth, json={"id": "ARC-0001", "name": f"name{i}"})
+        assert response.status_code == 200
+
+    response = client.get("/api/risks/ARC-0001/history", headers=auth, params={"limit": 100})
+    before = response.json()["history"]
+    assert len(before) == 10
+
+    while database.archive_history(batch_size=4, max_age_days=None, keep_rows=2, chunk_rows=3):
+        pass
+
+    hot = cursor.execute("SELECT COUNT(*) FROM history_log_risks WHERE risk_id = 'ARC-0001'").fetchone()[0]
+    assert hot == 2
+    batches = cursor.execute(
+        "SELECT row_count FROM history_log_risks_archive WHERE risk_id = 'ARC-0001' ORDER BY max_history_id"
+    ).fetchall()
+    assert [row[0] for row in batches] == [3, 3, 2]
+
+    response = client.get("/api/risks/ARC-0001/history", headers=auth, params={"limit": 100})
+    assert response.json()["history"] == before
+
+    paged, before_id = [], None
+    while True:
+        params = {"limit": 3} if before_id is None else {"limit": 3, "before_id": before_id}
+        page = client.get("/api/risks/ARC-0001/history", headers=auth, params=params).json()
+        paged.extend(page["history"])
+        before_id = page["next_before_id"]
+        if before_id is None:
+            break
+    assert paged == before
+
+    for offset in (1, 2, 4, 9):
+        response = client.get("/api/risks/ARC-0001/history", headers=auth, params={"limit": 3, "skip": offset})
+        assert response.json()["history"] == before[offset:offset + 3]
+
+    response = client.delete("/api/risks/ARC-0001", headers=auth)
+    assert response.status_code == 200
+    while database.purge_deleted_risks():
+        pass
+    archived = cursor.execute(
+        "SELECT COUNT(*) FROM history_log_risks_archive WHERE risk_id = 'ARC-0001'").fetchone()[0]
+    assert archived == 0
+
+
+def test_risks_new_ids(client: TestClient, database, signed_up):
+    auth = signed_up("SEQ")
+
+    response = client.get("/api/risks/new-ids", headers=auth, params={"count": 3})
+    assert response.status_code == 200
+    assert response.json() == ["SEQ-0001", "SEQ-0002", "SEQ-0003"]
+
+    response = client.get("/api/risks/new-id", headers=auth)
+    assert response.json() == "SEQ-0004"
+
+    risk = {"id": "SEQ-0010", "name": "name", "factor_id": 1, "type_id": 1, "method_id": 1, "probability_id": 1,
+            "impact_id": 1}
+    response = client.post("/api/risks", headers=auth, json=risk)
+    assert response.status_code == 200
+    response = client.post("/api/risks", headers=auth, json=risk)
+    assert response.status_code == 409
+
+    response = client.get("/api/risks/new-id", headers=auth)
+    assert response.json() == "SEQ-0011"
+
+    account_id = database.fetch_account_by_email("seq@risks.com")[0]
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        blocks = list(executor.map(lambda _: database.reserve_risk_ids(account_id, 5), range(8)))
+    reserved = [id_ for block in blocks for id_ in block]
+    assert len(set(reserved)) == 40
+    assert sorted(reserved) == [f"SEQ-{i:04}" for i in range(12, 52)]
+
+    for count in (0, 1_001):
+        response = client.get("/api/risks/new-ids", headers=auth, params={"count": count})
+        assert response.status_code == 422
+
+    # a number too long for the sequence is accepted as an id but does not move the sequence
+    response = client.post("/api/risks", headers=auth, json={**risk, "id": "SEQ-99999999999999999999"})
+    assert response.status_code == 200
+    response = client.get("/api/risks/new-ids", headers=auth, params={"count": 2})
+    assert response.status_code == 200
+    assert response.json() == ["SEQ-0052", "SEQ-0053"]
+
+
+def test_risks_purge_unattributed_history(client: TestClient, database, cursor: Cursor, signed_up):
+    auth = signed_up("UNA")
+    response = client.post("/api/risks", headers=auth, json={
+        "id": "UNA-0001", "name": "name", "factor_id": 1, "type_id": 1, "method_id": 1, "probability_id": 1,
+        "impact_id": 1})
+    assert response.status_code == 200
+
+    # legacy entries no single account could claim: kept while any account holds the risk id
+    cursor.executemany(
+        "INSERT INTO history_log_risks (risk_id, updated_column_name, old_data, new_data)"
+        " VALUES (?, 'название', 'a', 'b')",
+        [("UNA-0001",), ("UNA-0002",)],
+    )
+    database.connection.commit()
+
+    while database.purge_deleted_risks():
+        pass
+
+    assert cursor.execute(
+        "SELECT risk_id FROM history_log_risks WHERE account_id IS NULL AND risk_id LIKE 'UNA-%'").fetchall() == [
+        ("UNA-0001",),
+    ]
+    response = client.get("/api/risks/UNA-0001/history", headers=auth)
+    assert response.json()["history"] == []